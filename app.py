@@ -2,10 +2,18 @@ import streamlit as st
 import os
 from dotenv import load_dotenv
 from chatbot import TalentScoutBot
+from metrics import start_metrics_server_from_env
 
 # Load environment variables
 load_dotenv()
 
+# Expose /metrics when TALENTSCOUT_METRICS_PORT is set (a no-op on reruns)
+start_metrics_server_from_env()
+
+# Messages rendered on every rerun; older ones sit in an expander and load a page at a time
+VISIBLE_MESSAGES = 20
+OLDER_MESSAGES_PAGE = 25
+
 # Page configuration
 st.set_page_config(
     page_title="TalentScout Hiring Assistant",
@@ -14,74 +22,76 @@ st.set_page_config(
 )
 
 def main():
-    # Initialize session state
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
-
-    if "candidate_info" not in st.session_state:
-        st.session_state.candidate_info = {
-            "name": None,
-            "email": None,
-            "phone": None,
-            "experience": None,
-            "position": None,
-            "location": None,
-            "tech_stack": []
-        }
-
-    if "conversation_stage" not in st.session_state:
-        st.session_state.conversation_stage = "greeting"
-
-    # Initialize chatbot
+    # Initialize session state. The bot's SessionState is the only per-session copy of
+    # the conversation; taxonomy, patterns and the Gemini client are shared process-wide.
     if "chatbot" not in st.session_state:
         st.session_state.chatbot = TalentScoutBot()
+        st.session_state.older_pages = 0
+
+    chatbot = st.session_state.chatbot
+    session = chatbot.state
+
+    # Candidates who closed the tab can pick up an unfinished application by email
+    with st.sidebar:
+        st.subheader("Resume an application")
+        resume_email = st.text_input("Email address you applied with")
+        if st.button("Resume") and resume_email:
+            if chatbot.resume_session(resume_email):
+                session.messages.append({"role": "assistant", "content": chatbot.resume_message()})
+                st.session_state.older_pages = 0
+                st.rerun()
+            else:
+                st.warning("No unfinished application was found for that email address.")
 
     # Display header
     st.title("TalentScout Hiring Assistant")
     st.markdown("Welcome to the initial screening process for TalentScout recruitment agency. Let's get to know you better!")
 
-    # Display chat messages
-    for message in st.session_state.messages:
+    # Display the newest chat messages; anything older is only decoded and rendered on request
+    first_visible = max(len(session.messages) - VISIBLE_MESSAGES, 0)
+    if first_visible:
+        with st.expander(f"Older messages ({first_visible})"):
+            shown = min(st.session_state.older_pages * OLDER_MESSAGES_PAGE, first_visible)
+            if shown < first_visible and st.button("Load older messages"):
+                st.session_state.older_pages += 1
+                shown = min(shown + OLDER_MESSAGES_PAGE, first_visible)
+            for message in session.messages[first_visible - shown:first_visible]:
+                with st.chat_message(message["role"]):
+                    st.markdown(message["content"])
+
+    for message in session.messages[first_visible:]:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
     # If this is the first run, initialize with a greeting
-    if len(st.session_state.messages) == 0:
-        initial_greeting = st.session_state.chatbot.get_greeting()
-        st.session_state.messages.append({"role": "assistant", "content": initial_greeting})
+    if len(session.messages) == 0:
+        initial_greeting = chatbot.get_greeting()
+        session.messages.append({"role": "assistant", "content": initial_greeting})
         with st.chat_message("assistant"):
             st.markdown(initial_greeting)
 
     # Get user input
     if user_input := st.chat_input("Type your response here..."):
         # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": user_input})
+        session.messages.append({"role": "user", "content": user_input})
 
         # Display user message
         with st.chat_message("user"):
             st.markdown(user_input)
 
-        # Get bot response
-        bot_response = st.session_state.chatbot.process_message(
-            user_input,
-            st.session_state.messages,
-            st.session_state.candidate_info,
-            st.session_state.conversation_stage
-        )
-
-        # Update conversation stage if needed
-        if st.session_state.chatbot.current_stage != st.session_state.conversation_stage:
-            st.session_state.conversation_stage = st.session_state.chatbot.current_stage
-
-        # Update candidate info
-        st.session_state.candidate_info = st.session_state.chatbot.candidate_info
+        # Stream the bot response so the first tokens show up while Gemini is still generating.
+        # The bot updates session.stage and session.candidate_info in place. session.messages
+        # is a MessageWindow, so the bot reads recent messages without the older ones in memory.
+        with st.chat_message("assistant"):
+            bot_response = st.write_stream(chatbot.process_message_stream(
+                user_input,
+                session.messages,
+                session.candidate_info,
+                session.stage
+            ))
 
         # Add assistant response to chat history
-        st.session_state.messages.append({"role": "assistant", "content": bot_response})
-
-        # Display assistant response
-        with st.chat_message("assistant"):
-            st.markdown(bot_response)
+        session.messages.append({"role": "assistant", "content": bot_response})
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,257 @@
+"""
+Offline batch screening for TalentScout
+
+Replays historical transcripts through TalentScoutBot's stage machine so that
+candidates can be re-screened after a taxonomy or prompt change. Transcripts
+are read from a JSONL file, one candidate per line:
+
+    {"id": "c-001", "messages": [{"role": "user", "content": "Jane Doe"}, ...]}
+
+Only user messages are replayed; assistant turns are regenerated. `messages`
+may also be a plain list of user strings. Work fans out over a process pool,
+Gemini calls are capped across all workers, and results are written to
+CandidateDatabase in chunks. A re-screened candidate's tech stack replaces the
+stored one rather than being merged into it. Finished transcript ids are appended to a
+checkpoint file after each chunk commits, so a restarted job skips them;
+transcripts that failed to replay or save are left out and retried.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from database import CandidateDatabase
+
+logger = logging.getLogger(__name__)
+
+# Set in each worker process by _init_worker
+_worker_bot = None
+
+
+def _init_worker(gemini_slots, db_path: str) -> None:
+    """Create the per-process bot and share the cross-process Gemini slot semaphore with it."""
+    global _worker_bot
+    from chatbot import TalentScoutBot, create_engine
+    from gemini_dispatch import BACKGROUND
+
+    # The screener saves its results itself, so replayed turns aren't written behind it, and
+    # speculative or cache-upgrade calls would spend the job's shared Gemini budget
+    engine = create_engine(db_path, persist_sessions=False, background_generation=False)
+    _worker_bot = TalentScoutBot(engine)
+    _worker_bot.gemini_priority = BACKGROUND
+    if _worker_bot.client is not None:
+        _worker_bot.client.client.limiter = gemini_slots
+
+
+def _user_messages(messages: List[Any]) -> List[str]:
+    """User turns of a stored transcript, accepting message dicts or bare strings."""
+    user_messages = []
+    for message in messages:
+        if isinstance(message, str):
+            user_messages.append(message)
+        elif message.get("role") == "user":
+            user_messages.append(message.get("content", ""))
+    return user_messages
+
+
+def replay_transcript(bot, messages: List[Any]) -> Tuple[Dict[str, Any], List[Dict[str, str]], str]:
+    """
+    Run a transcript's user turns through the bot's stage machine.
+
+    Args:
+        bot: A TalentScoutBot
+        messages: Stored transcript messages
+
+    Returns:
+        Tuple of the extracted candidate_info, the regenerated conversation
+        and the stage the conversation ended in
+    """
+    candidate_info = {
+        "name": None,
+        "email": None,
+        "phone": None,
+        "experience": None,
+        "position": None,
+        "location": None,
+        "tech_stack": []
+    }
+    stage = "greeting"
+    history = [{"role": "assistant", "content": bot.get_greeting()}]
+
+    for user_message in _user_messages(messages):
+        history.append({"role": "user", "content": user_message})
+        response = bot.process_message(user_message, history, candidate_info, stage)
+        candidate_info = bot.candidate_info
+        stage = bot.current_stage
+        history.append({"role": "assistant", "content": response})
+        if stage == "closing":
+            break
+
+    return candidate_info, history, stage
+
+
+def _screen_batch(batch: List[Tuple[str, List[Any]]]) -> List[Dict[str, Any]]:
+    """Worker entry point: replay a batch of (transcript_id, messages) pairs."""
+    results = []
+    for transcript_id, messages in batch:
+        try:
+            candidate_info, history, stage = replay_transcript(_worker_bot, messages)
+            results.append({"id": transcript_id, "candidate": dict(candidate_info, conversation_history=history),
+                            "stage": stage})
+        except Exception as e:
+            logger.error(f"Transcript {transcript_id} failed: {e}")
+            results.append({"id": transcript_id, "error": str(e)})
+    return results
+
+
+def read_transcripts(path: str, done: Set[str]) -> Iterator[Tuple[str, List[Any]]]:
+    """Stream (transcript_id, messages) pairs, skipping ids already in the checkpoint."""
+    with open(path, encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            # Line numbers are a stable fallback id as long as the input file isn't edited
+            transcript_id = str(record.get("id") or f"line-{line_number}")
+            if transcript_id not in done:
+                yield transcript_id, record.get("messages", [])
+
+
+def _batched(iterable, size: int) -> Iterator[list]:
+    """Yield lists of up to `size` items from an iterable."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """Transcript ids already screened and persisted by a previous run."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as handle:
+        return {line.rstrip("\n") for line in handle if line.strip()}
+
+
+class BatchScreener:
+    """
+    Parallel, resumable transcript re-screening job.
+
+    Args:
+        db: Database that receives screened candidates
+        checkpoint_path: File of finished transcript ids, appended after each chunk commits
+        workers: Worker processes
+        max_gemini_calls: Gemini requests allowed in flight across all workers
+        batch_size: Transcripts sent to a worker per task
+        chunk_size: Candidates written per database transaction
+        progress_interval: Seconds between progress log lines
+    """
+
+    def __init__(self, db: CandidateDatabase, checkpoint_path: str, workers: Optional[int] = None,
+                 max_gemini_calls: int = 8, batch_size: int = 25, chunk_size: int = 1000,
+                 progress_interval: float = 10.0):
+        self.db = db
+        self.checkpoint_path = checkpoint_path
+        self.workers = workers or os.cpu_count() or 1
+        self.max_gemini_calls = max_gemini_calls
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.progress_interval = progress_interval
+
+        self.screened = 0
+        self.saved = 0
+        self.failed = 0
+        self._pending_results: List[Dict[str, Any]] = []
+
+    def _flush(self, checkpoint) -> None:
+        """Write buffered results in one bulk upsert, then record their ids as done."""
+        if not self._pending_results:
+            return
+        results, self._pending_results = self._pending_results, []
+
+        screened = [result for result in results if "candidate" in result]
+        committed = []
+        # One outcome per input, in order
+        # A re-screen's stack replaces the stored one, so skills no longer extracted are dropped
+        outcomes = self.db.save_candidates_bulk((result["candidate"] for result in screened),
+                                                chunk_size=self.chunk_size, replace_tech_stack=True)
+        for result, outcome in zip(screened, outcomes):
+            if outcome["success"]:
+                self.saved += 1
+                committed.append(result["id"])
+            else:
+                logger.error(f"Saving transcript {result['id']} failed: {outcome['error']}")
+                self.failed += 1
+        self.failed += len(results) - len(screened)
+
+        # Only ids whose results are committed go into the checkpoint; replay and save
+        # failures are left out so a restarted job tries them again
+        checkpoint.write("".join(f"{transcript_id}\n" for transcript_id in committed))
+        checkpoint.flush()
+        os.fsync(checkpoint.fileno())
+
+    def run(self, transcripts_path: str) -> Dict[str, float]:
+        """
+        Screen every transcript not yet in the checkpoint.
+
+        Returns:
+            Dict with screened/saved/failed counts, elapsed seconds and candidates per second
+        """
+        done = load_checkpoint(self.checkpoint_path)
+        if done:
+            logger.info(f"Resuming: {len(done)} transcripts already screened")
+
+        batches = _batched(read_transcripts(transcripts_path, done), self.batch_size)
+        context = multiprocessing.get_context()
+        gemini_slots = context.BoundedSemaphore(self.max_gemini_calls)
+        # Keep a few batches queued per worker without reading the whole input ahead
+        max_in_flight = self.workers * 2
+
+        started = time.perf_counter()
+        last_report = started
+        with open(self.checkpoint_path, "a", encoding="utf-8") as checkpoint, \
+                ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                    initializer=_init_worker, initargs=(gemini_slots, self.db.db_path)) as pool:
+            in_flight = set()
+            exhausted = False
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < max_in_flight:
+                    batch = next(batches, None)
+                    if batch is None:
+                        exhausted = True
+                    else:
+                        in_flight.add(pool.submit(_screen_batch, batch))
+                if not in_flight:
+                    break
+
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    results = future.result()
+                    self.screened += len(results)
+                    self._pending_results.extend(results)
+                if len(self._pending_results) >= self.chunk_size:
+                    self._flush(checkpoint)
+
+                now = time.perf_counter()
+                if now - last_report >= self.progress_interval:
+                    last_report = now
+                    logger.info(f"{self.screened} screened, {self.saved} saved, {self.failed} failed "
+                                f"({self.screened / (now - started):.1f} candidates/s)")
+
+            self._flush(checkpoint)
+
+        elapsed = time.perf_counter() - started
+        return {
+            "screened": self.screened,
+            "saved": self.saved,
+            "failed": self.failed,
+            "seconds": elapsed,
+            "candidates_per_second": self.screened / elapsed if elapsed else 0.0,
+        }
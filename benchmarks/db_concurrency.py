@@ -0,0 +1,155 @@
+"""
+Concurrent throughput benchmark for CandidateDatabase
+
+Runs N writer threads (save_candidate) and M reader threads
+(get_candidate_by_email / list_recent_candidates) against a fresh database for
+a fixed duration and reports ops/sec. The "before" run reproduces the old
+access pattern (a new connection per call, rollback journal) with the same
+SQL so the two numbers are directly comparable.
+
+Usage:
+    python benchmarks/db_concurrency.py --writers 4 --readers 8 --seconds 5
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import CandidateDatabase, SELECT_BY_EMAIL_SQL, LIST_RECENT_SQL
+
+LEGACY_INSERT_SQL = '''
+INSERT INTO candidates
+(name, email, phone, experience, position, location, tech_stack,
+application_time, conversation_history)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+class ConnectPerCallDatabase(CandidateDatabase):
+    """The pre-pooling access pattern: connect, run one statement, close."""
+
+    def _init_db(self):
+        super()._init_db()
+        self.close()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+
+    def save_candidate(self, candidate_info, conversation_history=None):
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout)
+        try:
+            conn.execute(LEGACY_INSERT_SQL, (
+                candidate_info['name'], candidate_info['email'], candidate_info['phone'],
+                candidate_info['experience'], candidate_info['position'], candidate_info['location'],
+                json.dumps(candidate_info['tech_stack']), datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                json.dumps(conversation_history or [])
+            ))
+            conn.commit()
+        except sqlite3.IntegrityError:
+            pass
+        finally:
+            conn.close()
+
+    def get_candidate_by_email(self, email):
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout)
+        try:
+            return conn.execute(SELECT_BY_EMAIL_SQL, (email,)).fetchone()
+        finally:
+            conn.close()
+
+    def list_recent_candidates(self, limit=50):
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout)
+        try:
+            return conn.execute(LIST_RECENT_SQL, (limit,)).fetchall()
+        finally:
+            conn.close()
+
+
+def make_candidate(n):
+    return {
+        "name": f"Candidate {n}",
+        "email": f"candidate{n}@example.com",
+        "phone": "555-010-%04d" % (n % 10000),
+        "experience": str(n % 15),
+        "position": random.choice(["Backend Engineer", "Data Scientist", "SRE"]),
+        "location": random.choice(["Berlin", "Austin", "Pune"]),
+        "tech_stack": random.sample(["python", "django", "aws", "react", "go", "kubernetes"], 3),
+    }
+
+
+def run(db, writers, readers, seconds, seed_rows):
+    counter = iter(range(10 ** 9))
+    counter_lock = threading.Lock()
+    for _ in range(seed_rows):
+        db.save_candidate(make_candidate(next(counter)))
+
+    counts = {"write": 0, "read": 0}
+    counts_lock = threading.Lock()
+    stop = threading.Event()
+
+    def writer():
+        done = 0
+        while not stop.is_set():
+            with counter_lock:
+                n = next(counter)
+            db.save_candidate(make_candidate(n), [{"role": "user", "content": "hello"}])
+            done += 1
+        with counts_lock:
+            counts["write"] += done
+
+    def reader():
+        done = 0
+        while not stop.is_set():
+            if random.random() < 0.8:
+                db.get_candidate_by_email(f"candidate{random.randrange(seed_rows)}@example.com")
+            else:
+                db.list_recent_candidates(20)
+            done += 1
+        with counts_lock:
+            counts["read"] += done
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    db.close()
+    return {kind: count / elapsed for kind, count in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--seed-rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for label, cls in (("before", ConnectPerCallDatabase), ("after", CandidateDatabase)):
+            db = cls(os.path.join(tmp, f"{label}.db"))
+            results[label] = run(db, args.writers, args.readers, args.seconds, args.seed_rows)
+
+    print(f"{args.writers} writers / {args.readers} readers, {args.seconds:.0f}s each")
+    print(f"{'':8}{'writes/s':>12}{'reads/s':>12}")
+    for label, rates in results.items():
+        print(f"{label:8}{rates['write']:12.0f}{rates['read']:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
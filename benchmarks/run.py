@@ -0,0 +1,230 @@
+"""
+Micro-benchmark suite for the TalentScout conversation and storage hot paths
+
+Covers process_message for every stage, the extraction helpers, tech stack
+categorization, prompt building, and CandidateDatabase insert/lookup/list at
+several table sizes. Results are written as JSON and can be compared against
+a saved baseline; the run fails if any benchmark is slower than the baseline
+by more than the threshold.
+
+Usage:
+    python benchmarks/run.py --output baseline.json
+    python benchmarks/run.py --baseline baseline.json --threshold 0.10
+    python benchmarks/run.py --sizes 1000,100000,1000000 --filter db.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import CandidateGenerator
+
+STAGES = ["greeting", "contact_info", "experience", "position", "location",
+          "tech_stack", "technical_questions", "closing"]
+
+
+def measure(func, repeat=5, target_seconds=0.2):
+    """Time `func` with auto-calibrated loops; returns per-call statistics in microseconds"""
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    # autorange aims at 0.2s; scale to the requested target
+    loops = max(1, int(loops * target_seconds / 0.2))
+    per_call = [t / loops * 1e6 for t in timer.repeat(repeat=repeat, number=loops)]
+    median = statistics.median(per_call)
+    return {
+        "median_us": median,
+        "min_us": min(per_call),
+        "mean_us": statistics.mean(per_call),
+        "ops_per_sec": 1e6 / median if median else float("inf"),
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def make_offline_bot(tmp):
+    """A bot with Gemini disabled and its question cache in a scratch database"""
+    os.environ.pop("GEMINI_API_KEY", None)
+    # The bot opens its shared question cache relative to the working directory
+    os.chdir(tmp)
+    from chatbot import TalentScoutBot, TalentScoutEngine
+    from question_cache import QuestionCache
+
+    engine = TalentScoutEngine(api_key=None, question_cache=QuestionCache(os.path.join(tmp, "question_cache.db")))
+    return TalentScoutBot(engine=engine)
+
+
+def conversation_benchmarks(tmp):
+    gen = CandidateGenerator()
+    bot = make_offline_bot(tmp)
+    messages = gen.stage_messages()
+    history = gen.history()
+    base_info = gen.candidate(0)
+    benches = {}
+
+    for stage in STAGES:
+        # Each call starts from the state the stage expects so it does the same work every time
+        info = dict(base_info, tech_stack=list(base_info["tech_stack"]))
+        if stage in ("greeting", "contact_info"):
+            info.update(name=None if stage == "greeting" else info["name"], email=None, phone=None)
+        message = messages[stage]
+
+        def run(stage=stage, info=info, message=message):
+            bot.process_message(message, history, dict(info), stage)
+        benches[f"process_message.{stage}"] = run
+
+    contact = messages["contact_info"]
+    experience = messages["experience"]
+    tech_message = messages["tech_stack"]
+    tech_list = ", ".join(gen.tech_stack())
+    bot.candidate_info = dict(base_info)
+    benches["extract.contact_info"] = lambda: bot._extract_contact_info(contact)
+    benches["extract.experience"] = lambda: bot._extract_experience(experience)
+    benches["extract.tech_stack.keywords"] = lambda: bot._extract_tech_stack(tech_message)
+    benches["extract.tech_stack.list"] = lambda: bot._extract_tech_stack(tech_list)
+
+    stack = gen.tech_stack(6, 10) + ["Django REST framework", "AWS Lambda"]
+    benches["categorize_tech_stack"] = lambda: bot._categorize_tech_stack(stack)
+
+    bot.current_stage = "technical_questions"
+    long_history = gen.history(40)
+    benches["create_prompt_for_gemini"] = lambda: bot._create_prompt_for_gemini("Could you clarify?", long_history)
+    return benches
+
+
+def populate(db, gen, size, chunk_size=5000):
+    for _ in db.save_candidates_bulk(gen.candidates(size), chunk_size=chunk_size):
+        pass
+
+
+DB_OPERATIONS = ("insert", "lookup", "list_recent", "list_page", "match_top50")
+
+
+def database_benchmarks(tmp, sizes, name_filter=""):
+    from database import CandidateDatabase
+
+    benches = {}
+    for size in sizes:
+        # Populating large tables is slow, so skip sizes the filter excludes entirely
+        if not any(name_filter in f"db.{size}.{operation}" for operation in DB_OPERATIONS):
+            continue
+        gen = CandidateGenerator(seed=size)
+        db = CandidateDatabase(os.path.join(tmp, f"bench_{size}.db"))
+        started = time.perf_counter()
+        populate(db, gen, size)
+        print(f"  populated {size} rows in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+        counter = iter(range(size, 10 ** 12))
+        history = gen.history(12)
+        benches[f"db.{size}.insert"] = lambda db=db, gen=gen, counter=counter: db.save_candidate(
+            gen.candidate(next(counter)), history)
+        benches[f"db.{size}.lookup"] = lambda db=db, gen=gen, size=size: db.get_candidate_by_email(
+            gen.email(gen.rng.randrange(size)))
+        benches[f"db.{size}.list_recent"] = lambda db=db: db.list_recent_candidates(50)
+        benches[f"db.{size}.list_page"] = lambda db=db: db.list_candidates(50, status="new")
+        try:
+            from candidate_matcher import CandidateIndex
+            index = CandidateIndex(db)
+        except RuntimeError as e:
+            print(f"  skipping db.{size}.match_top50: {e}", file=sys.stderr)
+        else:
+            benches[f"db.{size}.match_top50"] = lambda index=index: index.top_matches(
+                ["python", "django", "postgresql"], ["docker", "aws"], k=50, min_experience=3)
+    return benches
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print a comparison table; returns the names that regressed beyond the threshold"""
+    regressions = []
+    print(f"\n{'benchmark':40}{'baseline us':>14}{'current us':>14}{'change':>10}")
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            print(f"{name:40}{'-':>14}{current['median_us']:14.2f}{'new':>10}")
+            continue
+        change = current["median_us"] / previous["median_us"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:40}{previous['median_us']:14.2f}{current['median_us']:14.2f}{change:+10.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,100000",
+                        help="Comma-separated table sizes for database benchmarks (e.g. 1000,100000,1000000)")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="bench_results.json", help="Where to write this run's results")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed slowdown versus baseline as a fraction (default 0.10)")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    cwd = os.getcwd()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        logging.disable(logging.WARNING)
+
+        benches = conversation_benchmarks(tmp)
+        benches.update(database_benchmarks(tmp, sizes, args.filter))
+
+        for name, func in benches.items():
+            if args.filter and args.filter not in name:
+                continue
+            results[name] = measure(func, repeat=args.repeat)
+            print(f"{name:40}{results[name]['median_us']:12.2f} us  ({results[name]['ops_per_sec']:,.0f} ops/s)")
+        os.chdir(cwd)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\nResults written to {output}")
+
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
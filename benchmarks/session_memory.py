@@ -0,0 +1,87 @@
+"""
+Per-session memory benchmark for TalentScoutBot
+
+Creates many bot sessions the way app.py does (one bot plus its
+SessionState per Streamlit session) and reports the bytes each one adds to
+the heap, measured with tracemalloc. Shared resources are allocated by a
+warm-up session first, so only per-session cost is counted. Sessions are
+measured fresh and after a full offline conversation.
+
+Usage:
+    python benchmarks/session_memory.py --sessions 2000
+"""
+
+import argparse
+import gc
+import logging
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import CandidateGenerator
+
+CONVERSATION_STAGES = ("greeting", "contact_info", "experience", "position", "location", "tech_stack",
+                       "technical_questions")
+
+
+def new_session(engine):
+    from chatbot import TalentScoutBot
+
+    bot = TalentScoutBot(engine=engine)
+    bot.state.messages.append({"role": "assistant", "content": bot.get_greeting()})
+    return bot
+
+
+def converse(bot, messages):
+    """Run one candidate through every stage, as app.py would."""
+    session = bot.state
+    for stage in CONVERSATION_STAGES:
+        session.messages.append({"role": "user", "content": messages[stage]})
+        response = bot.process_message(messages[stage], session.messages, session.candidate_info, session.stage)
+        session.messages.append({"role": "assistant", "content": response})
+    return bot
+
+
+def bytes_per_session(factory, count):
+    """Heap growth per object created by `factory`, after a warm-up call."""
+    factory()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    sessions = [factory() for _ in range(count)]
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del sessions
+    return growth / count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    os.environ.pop("GEMINI_API_KEY", None)
+    from chatbot import TalentScoutEngine
+    from question_cache import QuestionCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = TalentScoutEngine(api_key=None, question_cache=QuestionCache(os.path.join(tmp, "cache.db")))
+        messages = CandidateGenerator().stage_messages()
+
+        fresh = bytes_per_session(lambda: new_session(engine), args.sessions)
+        finished = bytes_per_session(lambda: converse(new_session(engine), messages), args.sessions)
+
+    print(f"{args.sessions} sessions")
+    print(f"  fresh session:         {fresh:8.0f} bytes")
+    print(f"  after a conversation:  {finished:8.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Synthetic candidate data for TalentScout benchmarks
+
+Deterministic generators (seeded) so runs are comparable across machines and
+commits.
+"""
+
+import random
+
+FIRST_NAMES = ["Ava", "Liam", "Priya", "Mateo", "Chen", "Fatima", "Noah", "Sofia", "Kwame", "Yuki"]
+LAST_NAMES = ["Smith", "Garcia", "Patel", "Kim", "Okafor", "Rossi", "Novak", "Silva", "Cohen", "Tanaka"]
+POSITIONS = ["Backend Engineer", "Frontend Developer", "Data Scientist", "SRE", "Mobile Developer",
+             "ML Engineer", "QA Engineer", "Full Stack Developer"]
+LOCATIONS = ["Berlin", "Austin", "Pune", "Toronto", "Lagos", "Sao Paulo", "Tokyo", "Warsaw"]
+TECH = ["python", "django", "flask", "react", "typescript", "aws", "docker", "kubernetes", "postgresql",
+        "redis", "go", "java", "spring", "terraform", "pytorch", "kafka", "graphql", "swift", "flutter"]
+FILLER = ("I have mostly worked on internal platforms and led a small team that migrated a legacy "
+          "monolith towards services while keeping latency low").split()
+
+
+class CandidateGenerator:
+    """Seeded source of synthetic candidates and chat messages."""
+
+    def __init__(self, seed=42):
+        self.rng = random.Random(seed)
+
+    def name(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def email(self, n):
+        return f"candidate{n}@example.com"
+
+    def phone(self):
+        return f"+1 ({self.rng.randint(200, 999)}) {self.rng.randint(200, 999)}-{self.rng.randint(0, 9999):04d}"
+
+    def tech_stack(self, low=3, high=7):
+        return self.rng.sample(TECH, self.rng.randint(low, high))
+
+    def candidate(self, n):
+        """A candidate_info dict as the bot would produce it"""
+        return {
+            "name": self.name(),
+            "email": self.email(n),
+            "phone": self.phone(),
+            "experience": str(self.rng.randint(0, 20)),
+            "position": self.rng.choice(POSITIONS),
+            "location": self.rng.choice(LOCATIONS),
+            "tech_stack": self.tech_stack(),
+        }
+
+    def candidates(self, count, start=0):
+        for n in range(start, start + count):
+            yield self.candidate(n)
+
+    def stage_messages(self, n=0):
+        """One user message per conversation stage, keyed by the stage that consumes it"""
+        return {
+            "greeting": f"Hi, my name is {self.name()}",
+            "contact_info": f"Sure, it's {self.email(n)} and {self.phone()}",
+            "experience": f"About {self.rng.randint(1, 15)} years, mostly backend work",
+            "position": self.rng.choice(POSITIONS),
+            "location": self.rng.choice(LOCATIONS),
+            "tech_stack": "I use " + " and ".join(self.tech_stack()) + " " + " ".join(self.rng.sample(FILLER, 8)),
+            "technical_questions": " ".join(self.rng.choices(FILLER, k=80)),
+            "closing": "Thanks, no further questions",
+        }
+
+    def history(self, turns=10):
+        """Alternating assistant/user chat history"""
+        messages = []
+        for turn in range(turns):
+            role = "assistant" if turn % 2 == 0 else "user"
+            messages.append({"role": role, "content": " ".join(self.rng.choices(FILLER, k=20))})
+        return messages
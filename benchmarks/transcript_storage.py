@@ -0,0 +1,143 @@
+"""
+Transcript storage benchmark for CandidateDatabase
+
+Builds a synthetic database of N candidates in the original layout (JSON
+transcript inline in the candidates row), measures file size and contact
+lookup latency, then migrates a copy to compressed side-table transcripts
+and measures again.
+
+Usage:
+    python benchmarks/transcript_storage.py --candidates 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import CandidateDatabase
+
+LEGACY_SCHEMA = '''
+CREATE TABLE candidates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    email TEXT UNIQUE,
+    phone TEXT,
+    experience TEXT,
+    position TEXT,
+    location TEXT,
+    tech_stack TEXT,
+    application_time TIMESTAMP,
+    status TEXT DEFAULT 'new',
+    conversation_history TEXT,
+    notes TEXT
+)
+'''
+
+BOT_LINES = [
+    "Thanks! Could you please provide your email address and phone number so we can contact you?",
+    "Great! Now, how many years of experience do you have in the tech industry?",
+    "Thank you! What position(s) are you interested in applying for at our company?",
+    "Great! Could you please tell me your current location?",
+    "Please list the programming languages, frameworks, databases, and tools that you are proficient in.",
+]
+USER_WORDS = ("python django postgres aws kubernetes react migration latency cache team led built "
+              "designed monolith microservices pipeline kafka terraform testing").split()
+
+
+def synthetic_transcript(rng):
+    messages = []
+    for line in BOT_LINES:
+        messages.append({"role": "assistant", "content": line})
+        messages.append({"role": "user", "content": " ".join(rng.choices(USER_WORDS, k=rng.randint(5, 60)))})
+    return messages
+
+
+def build_legacy(path, count, seed=7):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute(LEGACY_SCHEMA)
+    rows = (
+        (f"Candidate {n}", f"candidate{n}@example.com", "555-010-0000", str(n % 15), "Backend Engineer",
+         "Berlin", json.dumps(rng.sample(USER_WORDS[:6], 3)), "2025-01-01 00:00:00",
+         json.dumps(synthetic_transcript(rng)))
+        for n in range(count)
+    )
+    conn.executemany('''
+    INSERT INTO candidates (name, email, phone, experience, position, location, tech_stack,
+    application_time, conversation_history) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+
+def legacy_lookup(conn, email):
+    # The original get_candidate_by_email: fetch the whole row and decode both JSON fields
+    row = conn.execute("SELECT * FROM candidates WHERE email = ?", (email,)).fetchone()
+    candidate = dict(row)
+    candidate['tech_stack'] = json.loads(candidate['tech_stack'])
+    candidate['conversation_history'] = json.loads(candidate['conversation_history'])
+    return candidate
+
+
+def time_lookups(lookup, count, samples=5000, seed=11):
+    rng = random.Random(seed)
+    emails = [f"candidate{rng.randrange(count)}@example.com" for _ in range(samples)]
+    timings = []
+    for email in emails:
+        started = time.perf_counter()
+        lookup(email)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return statistics.mean(timings) * 1e6, timings[int(len(timings) * 0.99)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.db")
+        build_legacy(legacy_path, args.candidates)
+
+        conn = sqlite3.connect(legacy_path)
+        conn.row_factory = sqlite3.Row
+        legacy_size = os.path.getsize(legacy_path)
+        legacy_mean, legacy_p99 = time_lookups(lambda email: legacy_lookup(conn, email), args.candidates)
+        conn.close()
+
+        compressed_path = os.path.join(tmp, "compressed.db")
+        shutil.copy(legacy_path, compressed_path)
+        started = time.perf_counter()
+        db = CandidateDatabase(compressed_path)
+        migrate_seconds = time.perf_counter() - started
+        db._connection().execute("VACUUM")
+        db._connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        compressed_size = os.path.getsize(compressed_path)
+        new_mean, new_p99 = time_lookups(db.get_candidate_by_email, args.candidates)
+        # Lookups that do read the transcript, for comparison
+        full_mean, full_p99 = time_lookups(lambda email: db.get_candidate_by_email(email)["conversation_history"],
+                                           args.candidates)
+        transcript_bytes = db._connection().execute(
+            "SELECT SUM(LENGTH(data)) FROM candidate_transcripts").fetchone()[0]
+        db.close()
+
+    print(f"{args.candidates} candidates (migration took {migrate_seconds:.1f}s)")
+    print(f"  file size:  {legacy_size / 2**20:8.1f} MB inline JSON -> {compressed_size / 2**20:8.1f} MB "
+          f"(compressed transcripts {transcript_bytes / 2**20:.1f} MB; size includes FTS and skills tables)")
+    print(f"  contact lookup:    {legacy_mean:7.1f} us mean / {legacy_p99:7.1f} us p99 -> "
+          f"{new_mean:7.1f} us mean / {new_p99:7.1f} us p99")
+    print(f"  lookup + history:  {full_mean:7.1f} us mean / {full_p99:7.1f} us p99")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Ranking stored candidates against a job requisition for TalentScout
+
+CandidateIndex keeps every candidate's canonicalized tech stack in memory as
+one packed bitset per taxonomy technology (bit i set if candidate row i has
+it), next to arrays of years of experience and location codes. A
+requisition is scored for all candidates at once: only its own technologies'
+bitsets are unpacked and summed with their weights, filters are boolean
+masks, and the top k come from a partial sort. At a million candidates the
+bitsets take about 13 MB.
+
+The index is loaded once from CandidateDatabase and then kept current from
+the database's change log: each query first reloads just the candidates
+written or deleted since the last one, whichever process wrote them. A new
+candidate whose id is below ones already indexed (a row restored or
+inserted with an explicit id) can't be appended in order, so it triggers a
+full reload instead.
+
+Requires numpy.
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+from database import CandidateDatabase, normalize_skill
+from metrics import REGISTRY
+from tech_matcher import get_tech_matcher
+
+logger = logging.getLogger(__name__)
+
+MATCH_SECONDS = REGISTRY.histogram(
+    "talentscout_match_seconds", "Time to rank every indexed candidate against a requisition")
+INDEX_REFRESHES = REGISTRY.counter(
+    "talentscout_match_index_updates_total", "Candidates reloaded into the match index, by kind", ("kind",))
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def parse_experience(value) -> float:
+    """Years of experience from stored text such as "5" or "About 7 years"; NaN if there is no number."""
+    match = _NUMBER.search(str(value or ""))
+    return float(match.group()) if match else math.nan
+
+
+def location_key(value) -> str:
+    """Locations are compared case- and space-insensitively."""
+    return " ".join(str(value or "").lower().split())
+
+
+class Match(NamedTuple):
+    """
+    One ranked candidate.
+
+    Attributes:
+        candidate_id: Row id in the candidates table
+        score: Matched weight over total requisition weight, from 0 to 1
+        matched: Requisition technologies the candidate has
+        experience: Parsed years of experience, NaN if unknown
+        location: Normalized location
+    """
+    candidate_id: int
+    score: float
+    matched: List[str]
+    experience: float
+    location: str
+
+
+class CandidateIndex:
+    """
+    In-memory bitset index of candidate tech stacks for requisition matching.
+
+    Args:
+        db: Database the index is loaded from and kept in sync with
+        matcher: Tech matcher whose taxonomy defines the technologies indexed
+    """
+
+    def __init__(self, db: CandidateDatabase, matcher=None):
+        if np is None:
+            raise RuntimeError("Candidate matching needs the numpy package")
+        self.db = db
+        self.matcher = matcher or get_tech_matcher()
+        self.technologies: List[str] = list(self.matcher.canonical_category)
+        self._columns: Dict[str, int] = {tech: column for column, tech in enumerate(self.technologies)}
+        self._location_codes: Dict[str, int] = {"": 0}
+        self._locations: List[str] = [""]
+        self._lock = threading.Lock()
+
+        self.size = 0
+        self._allocate(0)
+        self._watermark = 0
+        self.load()
+
+    def _allocate(self, capacity: int) -> None:
+        """(Re)size the arrays to hold `capacity` rows, keeping existing rows."""
+        # Whole bytes of bits, with headroom so single inserts don't reallocate every time
+        capacity = max(1024, -(-capacity // 8) * 8)
+        bits = np.zeros((len(self.technologies), capacity // 8), dtype=np.uint8)
+        ids = np.zeros(capacity, dtype=np.int64)
+        experience = np.full(capacity, np.nan, dtype=np.float32)
+        locations = np.zeros(capacity, dtype=np.int32)
+        active = np.zeros(capacity, dtype=bool)
+        if self.size:
+            used = -(-self.size // 8)
+            bits[:, :used] = self._bits[:, :used]
+            ids[:self.size] = self._ids[:self.size]
+            experience[:self.size] = self._experience[:self.size]
+            locations[:self.size] = self._location[:self.size]
+            active[:self.size] = self._active[:self.size]
+        self.capacity = capacity
+        self._bits, self._ids, self._experience, self._location, self._active = (
+            bits, ids, experience, locations, active)
+
+    def _location_code(self, location) -> int:
+        key = location_key(location)
+        code = self._location_codes.get(key)
+        if code is None:
+            code = self._location_codes[key] = len(self._locations)
+            self._locations.append(key)
+        return code
+
+    def load(self) -> None:
+        """Rebuild the whole index from the database."""
+        started = time.perf_counter()
+        # Taken before reading, so anything written during the load is reloaded by the next refresh
+        watermark, _ = self.db.changed_candidates(since=None)
+        ids: List[int] = []
+        experience: List[float] = []
+        locations: List[int] = []
+        rows: List[List[int]] = [[] for _ in self.technologies]
+        for row, (candidate_id, years, location, skills) in enumerate(self.db.iter_match_rows()):
+            ids.append(candidate_id)
+            experience.append(parse_experience(years))
+            locations.append(self._location_code(location))
+            for skill in skills:
+                column = self._columns.get(skill)
+                if column is not None:
+                    rows[column].append(row)
+
+        with self._lock:
+            self.size = 0
+            self._allocate(len(ids) * 5 // 4)
+            count = len(ids)
+            self._ids[:count] = ids
+            self._experience[:count] = experience
+            self._location[:count] = locations
+            self._active[:count] = True
+            for column, members in enumerate(rows):
+                if members:
+                    dense = np.zeros(self.capacity, dtype=bool)
+                    dense[members] = True
+                    self._bits[column] = np.packbits(dense)
+            self.size = count
+            self._watermark = watermark
+        INDEX_REFRESHES.inc(count, kind="load")
+        logger.info(f"Loaded {count} candidates into the match index in {time.perf_counter() - started:.1f}s")
+
+    def refresh(self) -> int:
+        """
+        Reload candidates changed in the database since the last load or refresh.
+
+        Falls back to a full load() when a new candidate's id is below the
+        last one indexed.
+
+        Returns:
+            int: Candidates reloaded or removed
+        """
+        watermark, changed = self.db.changed_candidates(self._watermark)
+        if not changed:
+            return 0
+        current = {row[0]: row for row in self.db.iter_match_rows(changed)}
+        with self._lock:
+            last = int(self._ids[self.size - 1]) if self.size else 0
+            in_order = all(candidate_id > last or self._row_of(candidate_id) is not None for candidate_id in current)
+            if in_order:
+                # In id order, so candidates new to the index are appended in order
+                for candidate_id in sorted(changed):
+                    row = current.get(candidate_id)
+                    if row is None:
+                        self._remove(candidate_id)
+                    else:
+                        self._upsert(*row)
+                self._watermark = max(self._watermark, watermark)
+        if not in_order:
+            logger.info("Candidates arrived out of id order; reloading the match index")
+            self.load()
+            return len(changed)
+        INDEX_REFRESHES.inc(len(current), kind="upsert")
+        INDEX_REFRESHES.inc(len(changed) - len(current), kind="remove")
+        return len(changed)
+
+    def _row_of(self, candidate_id: int) -> Optional[int]:
+        # Ids only grow (AUTOINCREMENT) and rows are appended in id order, so the id array stays sorted
+        row = int(np.searchsorted(self._ids[:self.size], candidate_id))
+        return row if row < self.size and self._ids[row] == candidate_id else None
+
+    def _upsert(self, candidate_id: int, experience, location, skills: Iterable[str]) -> None:
+        # refresh() only appends ids above the last indexed one
+        row = self._row_of(candidate_id)
+        if row is None:
+            if self.size == self.capacity:
+                self._allocate(self.capacity * 2)
+            row = self.size
+            self.size += 1
+            self._ids[row] = candidate_id
+        byte, mask = row >> 3, np.uint8(0x80 >> (row & 7))
+        self._bits[:, byte] &= ~mask
+        for skill in skills:
+            column = self._columns.get(skill)
+            if column is not None:
+                self._bits[column, byte] |= mask
+        self._experience[row] = parse_experience(experience)
+        self._location[row] = self._location_code(location)
+        self._active[row] = True
+
+    def _remove(self, candidate_id: int) -> None:
+        row = self._row_of(candidate_id)
+        if row is not None:
+            self._active[row] = False
+
+    def _resolve(self, technologies: Iterable[str]) -> List[str]:
+        resolved = []
+        for tech in technologies:
+            skill = normalize_skill(tech)[0]
+            if skill not in resolved:
+                resolved.append(skill)
+        return resolved
+
+    def top_matches(self, required: Sequence[str], nice_to_have: Sequence[str] = (), k: int = 50,
+                    min_experience: Optional[float] = None, max_experience: Optional[float] = None,
+                    locations: Optional[Iterable[str]] = None, require_all: bool = False,
+                    required_weight: float = 2.0, nice_weight: float = 1.0) -> List[Match]:
+        """
+        Rank every indexed candidate against a requisition.
+
+        A candidate's score is the weight of the requisition technologies
+        they have over the requisition's total weight. Technologies outside
+        the taxonomy can't be matched but still count toward the total, so
+        scores stay comparable between requisitions.
+
+        Args:
+            required: Must-have technologies, in any spelling the taxonomy knows
+            nice_to_have: Technologies that add to the score
+            k: Candidates to return
+            min_experience: Minimum years of experience; candidates with unknown experience are excluded
+            max_experience: Maximum years of experience
+            locations: Only candidates in one of these locations
+            require_all: Only candidates who have every required technology
+            required_weight: Weight of each required technology
+            nice_weight: Weight of each nice-to-have technology
+
+        Returns:
+            List[Match]: Up to k candidates with a non-zero score, best first
+                (ties go to the earlier applicant)
+        """
+        started = time.perf_counter()
+        self.refresh()
+        required = self._resolve(required)
+        nice_to_have = [tech for tech in self._resolve(nice_to_have) if tech not in required]
+        weights = [(tech, required_weight) for tech in required] + [(tech, nice_weight) for tech in nice_to_have]
+        total = sum(weight for _, weight in weights)
+        if not total:
+            raise ValueError("A requisition needs at least one technology with a positive weight")
+        unknown = [tech for tech, _ in weights if tech not in self._columns]
+        if unknown:
+            logger.warning(f"Technologies outside the taxonomy can't be matched: {', '.join(unknown)}")
+
+        with self._lock:
+            size = self.size
+            scores = np.zeros(size, dtype=np.float32)
+            for tech, weight in weights:
+                column = self._columns.get(tech)
+                if column is not None and weight:
+                    scores += np.unpackbits(self._bits[column], count=size).astype(np.float32) * weight
+
+            keep = self._active[:size] & (scores > 0)
+            if require_all:
+                for tech in required:
+                    if tech not in self._columns:
+                        keep[:] = False
+                        break
+                    keep &= np.unpackbits(self._bits[self._columns[tech]], count=size).view(bool)
+            if min_experience is not None:
+                keep &= self._experience[:size] >= min_experience
+            if max_experience is not None:
+                keep &= self._experience[:size] <= max_experience
+            if locations is not None:
+                wanted = np.zeros(len(self._locations), dtype=bool)
+                wanted[[self._location_codes[key] for key in map(location_key, locations)
+                        if key in self._location_codes]] = True
+                keep &= wanted[self._location[:size]]
+
+            # Rows are in id order, so taking ties in row order keeps the earliest applicants
+            candidates = np.flatnonzero(keep)
+            if len(candidates) > k:
+                kept = scores[candidates]
+                cutoff = -np.partition(-kept, k - 1)[k - 1]
+                above = candidates[kept > cutoff]
+                candidates = np.concatenate([above, candidates[kept == cutoff][:k - len(above)]])
+            candidates = np.sort(candidates)
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+            matches = []
+            for row in candidates.tolist():
+                byte, mask = row >> 3, 0x80 >> (row & 7)
+                matched = [tech for tech, _ in weights
+                           if tech in self._columns and self._bits[self._columns[tech], byte] & mask]
+                matches.append(Match(int(self._ids[row]), float(scores[row]) / total, matched,
+                                     float(self._experience[row]), self._locations[self._location[row]]))
+        MATCH_SECONDS.observe(time.perf_counter() - started)
+        return matches
+
+
+_shared_indexes: Dict[str, CandidateIndex] = {}
+_shared_lock = threading.Lock()
+
+
+def get_candidate_index(db: CandidateDatabase) -> CandidateIndex:
+    """Return the process-wide match index for a database, loading it on first use."""
+    with _shared_lock:
+        index = _shared_indexes.get(db.db_path)
+        if index is None:
+            index = CandidateIndex(db)
+            _shared_indexes[db.db_path] = index
+        return index
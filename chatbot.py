@@ -8,12 +8,27 @@ a chatbot that helps in the initial screening of tech candidates.
 import os
 import re
 import json
+import time
+import uuid
+import atexit
 import logging
-import requests
-from typing import Dict, List, Any, Optional, Union
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Any, Optional, Sequence, Tuple, Union
 from datetime import datetime
 from dotenv import load_dotenv
 
+from gemini_client import GeminiError, get_client
+from database import CandidateDatabase
+from gemini_dispatch import BACKGROUND, INTERACTIVE, get_dispatcher
+from metrics import REGISTRY, timed
+from prompt_builder import PromptBuilder
+from question_bank import QuestionBank, get_question_bank
+from question_cache import get_question_cache, make_stack_key
+from question_fanout import FanoutResult, QuestionFanout, split_stack
+from session_store import SessionWriter
+from tech_matcher import TECH_CATEGORIES, get_tech_matcher
+from transcripts import MessageWindow
+
 # Load environment variables
 load_dotenv()
 
@@ -22,92 +37,321 @@ logging.basicConfig(level=logging.INFO,
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+TURN_SECONDS = REGISTRY.histogram(
+    "talentscout_turn_seconds", "Time to produce a complete bot reply, by the stage it was sent in",
+    ("stage", "mode"))
+TURN_FIRST_FRAGMENT_SECONDS = REGISTRY.histogram(
+    "talentscout_turn_first_fragment_seconds", "Time until the first fragment of a streamed reply", ("stage",))
+FALLBACKS = REGISTRY.counter(
+    "talentscout_fallbacks_total", "Replies served without Gemini output", ("path", "reason"))
+QUESTION_SETS = REGISTRY.counter(
+    "talentscout_question_sets_total", "Technical question sets served, by source", ("source",))
+SPECULATIONS = REGISTRY.counter(
+    "talentscout_speculations_total",
+    "Speculative question generations by outcome (started, hit, joined, invalidated, failed)", ("outcome",))
+
+# Conversation stages, in order
+STAGES = (
+    "greeting",
+    "name",
+    "contact_info",
+    "experience",
+    "position",
+    "location",
+    "tech_stack",
+    "technical_questions",
+    "closing"
+)
+
+# Patterns are compiled once per process and shared by every session.
+# Exit keywords must be whole words, so "backend" or "stopwatch" don't end the interview.
+EXIT_PATTERN = re.compile(r'\b(?:exit|quit|goodbye|bye|end|stop)\b', re.IGNORECASE)
+NAME_FILLER_PATTERN = re.compile(r'\b(hi|hello|hey|my name is|i am|i\'m)\b', re.IGNORECASE)
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+# This handles various formats like: (123) 456-7890, 123-456-7890, 123.456.7890, etc.
+PHONE_PATTERN = re.compile(r'(?:\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+EXPERIENCE_PATTERN = re.compile(r'\b(\d+)\s*(years?|yrs?)\b', re.IGNORECASE)
+# Splits comma-separated stacks on the word "and" (items are lowercased first); whole word
+# only, so names containing it, such as pandas or android, stay intact
+AND_PATTERN = re.compile(r'\band\b')
+
+# Likely stacks for common roles, used to start question generation before the candidate
+# lists their skills. Matched by substring against the stated position, first match wins.
+POSITION_STACK_DEFAULTS = (
+    ("data scientist", ("python", "sql", "scikit-learn")),
+    ("machine learning", ("python", "pytorch", "tensorflow")),
+    ("frontend", ("javascript", "react", "css")),
+    ("front-end", ("javascript", "react", "css")),
+    ("android", ("kotlin", "android")),
+    ("ios", ("swift", "ios")),
+    ("devops", ("docker", "kubernetes", "terraform")),
+    ("sre", ("kubernetes", "terraform", "aws")),
+)
+
+# Fallback question per category, asked about the first technology listed in it
+FALLBACK_QUESTION_TEMPLATES = (
+    ("languages", "What features or aspects of {tech} do you find most useful in your development work? Please provide specific examples."),
+    ("frontend", "Describe a challenging UI/UX problem you solved using {tech}. What was your approach and what was the outcome?"),
+    ("backend", "How do you handle API security and performance optimization in {tech}? Share some best practices you follow."),
+    ("databases", "What strategies do you use for database optimization in {tech}? How do you handle large datasets?"),
+    ("cloud", "How have you used {tech} in your projects? What services or features do you have the most experience with?"),
+)
+GENERAL_FALLBACK_QUESTIONS = (
+    "Describe a challenging technical project you've worked on recently. What technologies did you use, what problems did you encounter, and how did you solve them?",
+    "How do you stay updated with the latest developments in your technical field? Which resources do you find most valuable?",
+    "What is your approach to debugging complex technical issues? Please walk me through your process with a specific example.",
+)
+
+
+def new_candidate_info() -> Dict[str, Any]:
+    """Empty candidate record for a new conversation."""
+    return {
+        "name": None,
+        "email": None,
+        "phone": None,
+        "experience": None,
+        "position": None,
+        "location": None,
+        "tech_stack": []
+    }
+
+
+class TalentScoutEngine:
+    """
+    Process-wide resources shared by every bot session.
+
+    Holds the Gemini dispatcher, the question cache and bank, and the tech
+    taxonomy and matcher. Nothing here changes per candidate, so one instance
+    serves all sessions.
+
+    Args:
+        api_key: Gemini API key, or None to run on fallback responses only
+        question_cache: Question cache to use, defaults to the shared one
+        candidate_db: Stored candidates, used to predict a re-applicant's stack
+        speculation_workers: Threads for speculative question generation
+        question_bank: Precomputed question bank, or None to rely on Gemini and templates
+        question_source: "bank" serves banked questions when the bank covers the stack,
+            "upgrade" does the same and also generates a Gemini set in the background
+            for the next candidate with that stack, and "llm" asks Gemini first
+        fanout_min_technologies: Stacks with at least this many technologies get one
+            concurrent Gemini call per category instead of one call for the whole
+            stack; 0 disables fan-out
+        fanout_deadline: Seconds to wait for the per-category calls before filling
+            the missing categories from the bank or templates
+        session_writer: Saves sessions in the background as they change stage, or None
+            to keep them in memory only
+        speculation: Whether to generate questions for a predicted stack before the
+            candidate states it
+    """
+
+    stages = STAGES
+
+    QUESTION_SOURCES = ("bank", "upgrade", "llm")
+
+    def __init__(self, api_key: Optional[str] = None, question_cache=None,
+                 candidate_db: Optional[CandidateDatabase] = None, speculation_workers: int = 4,
+                 question_bank: Optional[QuestionBank] = None, question_source: str = "upgrade",
+                 fanout_min_technologies: int = 6, fanout_deadline: float = 8.0,
+                 session_writer: Optional[SessionWriter] = None, speculation: bool = True):
+        if question_source not in self.QUESTION_SOURCES:
+            raise ValueError(f"question_source must be one of {self.QUESTION_SOURCES}, not {question_source!r}")
+        self.api_key = api_key
+        if not api_key:
+            logger.warning("No Gemini API key found in environment variables")
+            self.client = None
+        else:
+            # Calls from every session go through one dispatcher that coalesces and rate-limits them
+            self.client = get_dispatcher(api_key)
+            logger.info("Gemini API initialized")
+
+        # Shared cache of generated question sets, keyed by normalized tech stack
+        self.question_cache = question_cache or get_question_cache()
+
+        # Tech stack categories and the matcher compiled from them
+        self.tech_categories = TECH_CATEGORIES
+        self.tech_matcher = get_tech_matcher()
+
+        # Stored candidates, consulted to predict a re-applicant's tech stack
+        self.candidate_db = candidate_db
+
+        # Precomputed questions, served without a network call
+        self.question_bank = question_bank
+        self.question_source = question_source
+
+        # Background pool for speculative question generation
+        self.speculation = speculation
+        self.speculation_pool = ThreadPoolExecutor(max_workers=speculation_workers,
+                                                   thread_name_prefix="question-speculation")
+
+        # Per-category question generation for long stacks, bounded by a deadline
+        self.fanout_min_technologies = fanout_min_technologies
+        self.fanout_deadline = fanout_deadline
+        self.fanout_pool = ThreadPoolExecutor(max_workers=len(TECH_CATEGORIES) + 1,
+                                              thread_name_prefix="question-fanout")
+
+        # Write-behind persistence of in-progress sessions
+        self.session_writer = session_writer
+
+        # Contextual prompts are kept within this many estimated tokens
+        self.prompt_builder = PromptBuilder(token_budget=int(os.getenv("GEMINI_PROMPT_TOKEN_BUDGET", "1000")))
+
+
+_engine: Optional[TalentScoutEngine] = None
+
+
+def get_engine() -> TalentScoutEngine:
+    """
+    Return the process-wide engine, configured from the environment on first use.
+
+    GEMINI_API_KEY enables Gemini. TALENTSCOUT_QUESTION_BANK points at a
+    question bank database (default question_bank.db, used if it exists) and
+    TALENTSCOUT_QUESTION_SOURCE picks how it is used (bank, upgrade or llm).
+    TALENTSCOUT_FANOUT_MIN_TECHNOLOGIES and TALENTSCOUT_FANOUT_DEADLINE tune
+    per-category question generation for long stacks. Sessions are saved to
+    the candidate database as they progress unless TALENTSCOUT_PERSIST_SESSIONS
+    is 0; pending saves are written at interpreter exit.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_engine(persist_sessions=os.getenv("TALENTSCOUT_PERSIST_SESSIONS", "1") != "0")
+    return _engine
+
+
+def create_engine(db_path: str = "candidates.db", persist_sessions: bool = True,
+                  background_generation: bool = True) -> TalentScoutEngine:
+    """
+    Build an engine from the environment (see get_engine) for a candidate database.
+
+    Args:
+        db_path: Candidate database, also holding the question cache
+        persist_sessions: Save sessions write-behind as they change stage
+        background_generation: Allow speculative and "upgrade" Gemini calls; jobs
+            that share a Gemini budget, such as batch screening, turn this off
+
+    Returns:
+        TalentScoutEngine: A new engine
+    """
+    bank_path = os.getenv("TALENTSCOUT_QUESTION_BANK", "question_bank.db")
+    question_source = os.getenv("TALENTSCOUT_QUESTION_SOURCE", "upgrade")
+    if not background_generation and question_source == "upgrade":
+        # The same, minus the background Gemini call after serving banked questions
+        question_source = "bank"
+    candidate_db = CandidateDatabase(db_path)
+    session_writer = None
+    if persist_sessions:
+        session_writer = SessionWriter(candidate_db)
+        atexit.register(session_writer.close)
+    return TalentScoutEngine(
+        os.getenv("GEMINI_API_KEY"),
+        question_cache=get_question_cache(db_path, candidate_db),
+        candidate_db=candidate_db,
+        question_bank=get_question_bank(bank_path) if os.path.exists(bank_path) else None,
+        question_source=question_source,
+        fanout_min_technologies=int(os.getenv("TALENTSCOUT_FANOUT_MIN_TECHNOLOGIES", "6")),
+        fanout_deadline=float(os.getenv("TALENTSCOUT_FANOUT_DEADLINE", "8")),
+        session_writer=session_writer,
+        speculation=background_generation
+    )
+
+
+class SessionState:
+    """
+    Everything that belongs to one candidate's conversation.
+
+    Uses __slots__ so each of the many concurrent sessions holds just its
+    fields' references, with no per-instance __dict__.
+    """
+
+    __slots__ = ("session_id", "stage", "candidate_info", "messages", "summary", "speculation")
+
+    def __init__(self, stage: str = "greeting", candidate_info: Optional[Dict[str, Any]] = None,
+                 messages: Optional[Sequence[Dict[str, str]]] = None, session_id: Optional[str] = None):
+        # Identifies the conversation in the session store
+        self.session_id = session_id or uuid.uuid4().hex
+        self.stage = stage
+        self.candidate_info = candidate_info if candidate_info is not None else new_candidate_info()
+        # Only the newest messages stay in memory; older ones are compressed until read
+        self.messages = messages if messages is not None else MessageWindow()
+        # Rolling summary of older messages, created the first time a Gemini prompt is built
+        self.summary = None
+        # (stack key, Future) of questions being generated ahead of the tech stack stage
+        self.speculation = None
+
+
 class TalentScoutBot:
     """
     Hiring Assistant chatbot for TalentScout recruitment agency.
 
     This class handles the conversation flow, information gathering,
-    and technical question generation for candidate screening.
+    and technical question generation for candidate screening. Per-candidate
+    data lives in a SessionState; shared resources come from the engine.
     """
 
-    def __init__(self):
-        """Initialize the TalentScout bot with default settings."""
-        # Set up Gemini API
-        self.api_key = os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
-            logger.warning("No Gemini API key found in environment variables")
-            self.api_working = False
-        else:
-            self.api_working = True
-            logger.info("Gemini API initialized")
+    __slots__ = ("engine", "state", "gemini_priority")
 
-        # Initialize conversation state
-        self.current_stage = "greeting"
-        self.candidate_info = {
-            "name": None,
-            "email": None,
-            "phone": None,
-            "experience": None,
-            "position": None,
-            "location": None,
-            "tech_stack": []
-        }
+    def __init__(self, engine: Optional[TalentScoutEngine] = None, state: Optional[SessionState] = None):
+        """
+        Initialize a bot session.
 
-        # Define conversation stages
-        self.stages = [
-            "greeting",
-            "name",
-            "contact_info",
-            "experience",
-            "position",
-            "location",
-            "tech_stack",
-            "technical_questions",
-            "closing"
-        ]
-
-        # Tech stack categories for better question generation
-        self.tech_categories = {
-            "languages": [
-                "python", "java", "javascript", "typescript", "c#", "c++", "ruby",
-                "go", "rust", "php", "swift", "kotlin", "scala", "perl", "haskell"
-            ],
-            "frontend": [
-                "react", "angular", "vue", "svelte", "html", "css", "sass", "less",
-                "bootstrap", "tailwind", "jquery", "webpack", "next.js", "gatsby"
-            ],
-            "backend": [
-                "node", "express", "django", "flask", "spring", "asp.net", "laravel",
-                "ruby on rails", "fastapi", "nestjs", "graphql", "rest", "soap"
-            ],
-            "databases": [
-                "sql", "mysql", "postgresql", "mongodb", "firebase", "oracle", "sqlite",
-                "redis", "elasticsearch", "dynamodb", "cassandra", "neo4j", "couchdb"
-            ],
-            "cloud": [
-                "aws", "azure", "gcp", "cloud", "docker", "kubernetes", "serverless",
-                "lambda", "ec2", "s3", "heroku", "netlify", "vercel"
-            ],
-            "mobile": [
-                "android", "ios", "react native", "flutter", "xamarin", "swift", "kotlin",
-                "objective-c", "mobile development"
-            ],
-            "devops": [
-                "jenkins", "github actions", "gitlab ci", "travis", "docker", "kubernetes",
-                "terraform", "ansible", "puppet", "chef", "ci/cd", "devops"
-            ],
-            "ai_ml": [
-                "machine learning", "deep learning", "ai", "tensorflow", "pytorch", "keras",
-                "scikit-learn", "nlp", "computer vision", "data science"
-            ],
-            "testing": [
-                "junit", "pytest", "jest", "mocha", "cypress", "selenium", "testing",
-                "tdd", "bdd", "qa"
-            ]
-        }
+        Args:
+            engine: Shared engine, defaults to the process-wide one
+            state: Conversation state to resume, defaults to a new conversation
+        """
+        self.engine = engine or get_engine()
+        self.state = state or SessionState()
+
+        # Batch and speculative work lower this so interactive turns are served first
+        self.gemini_priority = INTERACTIVE
 
         logger.info("TalentScoutBot initialized")
 
+    @property
+    def current_stage(self) -> str:
+        """Stage of this session's conversation."""
+        return self.state.stage
+
+    @current_stage.setter
+    def current_stage(self, stage: str) -> None:
+        self.state.stage = stage
+
+    @property
+    def candidate_info(self) -> Dict[str, Any]:
+        """Information collected from this session's candidate."""
+        return self.state.candidate_info
+
+    @candidate_info.setter
+    def candidate_info(self, candidate_info: Dict[str, Any]) -> None:
+        self.state.candidate_info = candidate_info
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return self.engine.api_key
+
+    @property
+    def client(self):
+        return self.engine.client
+
+    @property
+    def question_cache(self):
+        return self.engine.question_cache
+
+    @property
+    def tech_matcher(self):
+        return self.engine.tech_matcher
+
+    @property
+    def tech_categories(self) -> Dict[str, List[str]]:
+        return self.engine.tech_categories
+
+    @property
+    def stages(self):
+        return self.engine.stages
+
+    @property
+    def api_working(self) -> bool:
+        """Whether Gemini calls are currently allowed (key configured and circuit not open)."""
+        return self.client is not None and self.client.available
+
     def get_greeting(self) -> str:
         """Generate initial greeting message."""
         return "Hello! I'm the TalentScout Hiring Assistant. 👋\n\nI'm here to help with your initial screening process for tech positions.\nI'll ask you a few questions about your background and technical skills.\n\nLet's start with your name. What is your full name?"
@@ -126,6 +370,113 @@ class TalentScoutBot:
         Returns:
             str: Response from the bot
         """
+        with TURN_SECONDS.time(stage=conversation_stage, mode="blocking"):
+            response = self._route_message(user_message, message_history, candidate_info,
+                                           conversation_stage, stream=False)
+        self._persist_turn(conversation_stage, message_history, response)
+        return response
+
+    def process_message_stream(self, user_message: str, message_history: List[Dict[str, str]],
+                               candidate_info: Dict[str, Any], conversation_stage: str) -> Iterator[str]:
+        """
+        Streaming variant of process_message.
+
+        Stage handling is identical, but Gemini-backed replies are yielded
+        fragment by fragment as they arrive, so the first text can be shown
+        long before the full response is complete. Canned replies are yielded
+        as a single fragment.
+
+        Args:
+            user_message: The message from the user
+            message_history: Previous messages in the conversation
+            candidate_info: Dictionary containing candidate information
+            conversation_stage: Current stage of the conversation
+
+        Yields:
+            str: Fragments of the bot response
+        """
+        started = time.perf_counter()
+        first_fragment = True
+        fragments = []
+        try:
+            response = self._route_message(user_message, message_history, candidate_info,
+                                           conversation_stage, stream=True)
+            for fragment in ([response] if isinstance(response, str) else response):
+                if first_fragment:
+                    first_fragment = False
+                    TURN_FIRST_FRAGMENT_SECONDS.observe(time.perf_counter() - started, stage=conversation_stage)
+                fragments.append(fragment)
+                yield fragment
+        finally:
+            TURN_SECONDS.observe(time.perf_counter() - started, stage=conversation_stage, mode="stream")
+            self._persist_turn(conversation_stage, message_history, "".join(fragments))
+
+    def _persist_turn(self, previous_stage: str, message_history: List[Dict[str, str]], response: str) -> None:
+        """
+        Queue the session for saving if this turn moved it to a new stage.
+
+        Only the candidate's details and stage are saved along the way; the
+        transcript, including the closing reply, is saved once the
+        conversation reaches its closing stage.
+        """
+        writer = self.engine.session_writer
+        if writer is None or self.current_stage == previous_stage:
+            return
+        transcript = None
+        if self.current_stage == "closing":
+            transcript = list(message_history) + [{"role": "assistant", "content": response}]
+        writer.enqueue(self.state.session_id, self.current_stage, self.candidate_info, transcript)
+
+    def resume_session(self, email: str) -> bool:
+        """
+        Restore an unfinished conversation saved under an email address.
+
+        Args:
+            email: Email the candidate gave in the earlier session
+
+        Returns:
+            bool: True if a session was found; its details and stage replace this one's
+        """
+        db = self.engine.candidate_db
+        if db is None or not email.strip():
+            return False
+        if self.engine.session_writer is not None:
+            # The session may have changed stage moments ago and not been written yet
+            self.engine.session_writer.flush()
+        stored = db.get_open_session(email)
+        if stored is None:
+            return False
+        candidate_info = new_candidate_info()
+        candidate_info.update(stored["candidate_info"])
+        self.state.session_id = stored["session_id"]
+        self.state.candidate_info = candidate_info
+        self.state.stage = stored["stage"]
+        self.state.messages = MessageWindow()
+        self.state.summary = None
+        self.state.speculation = None
+        logger.info(f"Resumed session {stored['session_id']} at stage {stored['stage']}")
+        return True
+
+    def resume_message(self) -> str:
+        """Welcome-back message that repeats the question for the restored stage."""
+        prompts = {
+            "contact_info": self._generate_contact_request_message,
+            "experience": self._generate_experience_request_message,
+            "position": self._generate_position_request_message,
+            "location": self._generate_location_request_message,
+            "tech_stack": self._generate_tech_stack_request_message,
+            "technical_questions": self._resume_technical_questions,
+        }
+        prompt = prompts.get(self.current_stage)
+        if prompt is None:
+            return self.get_greeting()
+        name = self.candidate_info.get("name") or "there"
+        return f"Welcome back, {name}! Let's pick up where we left off.\n\n" + prompt()
+
+    def _route_message(self, user_message: str, message_history: List[Dict[str, str]],
+                       candidate_info: Dict[str, Any], conversation_stage: str,
+                       stream: bool) -> Union[str, Iterator[str]]:
+        """Advance the stage machine and build the reply, as a generator when streaming."""
         # Update internal state
         self.candidate_info = candidate_info
         self.current_stage = conversation_stage
@@ -167,6 +518,8 @@ class TalentScoutBot:
         elif self.current_stage == "position":
             self._extract_position(user_message)
             self.current_stage = "location"
+            # Two turns remain before the stack is asked for; use them to generate likely questions
+            self._speculate_predicted_stack()
             return self._generate_location_request_message()
 
         elif self.current_stage == "location":
@@ -177,6 +530,8 @@ class TalentScoutBot:
         elif self.current_stage == "tech_stack":
             self._extract_tech_stack(user_message)
             self.current_stage = "technical_questions"
+            if stream:
+                return self._generate_technical_questions_stream()
             return self._generate_technical_questions()
 
         elif self.current_stage == "technical_questions":
@@ -185,19 +540,20 @@ class TalentScoutBot:
             return self._generate_closing_message()
 
         # Default response using LLM
+        if stream:
+            return self._generate_llm_response_stream(user_message, message_history)
         return self._generate_llm_response(user_message, message_history)
 
     def _is_exit_request(self, message: str) -> bool:
         """Check if user wants to end the conversation."""
-        exit_keywords = ["exit", "quit", "goodbye", "bye", "end", "stop"]
-        message_lower = message.lower()
-        return any(keyword in message_lower for keyword in exit_keywords)
+        return EXIT_PATTERN.search(message) is not None
 
+    @timed()
     def _extract_name(self, message: str) -> None:
         """Extract name from user message."""
         # Simple implementation - in a real app, use LLM or better NLP
         # Filter out common bot-addressing terms
-        filtered_message = re.sub(r'\b(hi|hello|hey|my name is|i am|i\'m)\b', '', message, flags=re.IGNORECASE)
+        filtered_message = NAME_FILLER_PATTERN.sub('', message)
         name = filtered_message.strip()
 
         # Only update if we got something meaningful
@@ -205,28 +561,26 @@ class TalentScoutBot:
             self.candidate_info["name"] = name
             logger.info(f"Extracted name: {name}")
 
+    @timed()
     def _extract_contact_info(self, message: str) -> None:
         """Extract email and phone from user message."""
         # Email extraction with regex
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        email_match = re.search(email_pattern, message)
+        email_match = EMAIL_PATTERN.search(message)
         if email_match:
             self.candidate_info["email"] = email_match.group()
             logger.info(f"Extracted email: {email_match.group()}")
 
         # Phone extraction with regex
-        # This handles various formats like: (123) 456-7890, 123-456-7890, 123.456.7890, etc.
-        phone_pattern = r'(?:\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phone_match = re.search(phone_pattern, message)
+        phone_match = PHONE_PATTERN.search(message)
         if phone_match:
             self.candidate_info["phone"] = phone_match.group()
             logger.info(f"Extracted phone: {phone_match.group()}")
 
+    @timed()
     def _extract_experience(self, message: str) -> None:
         """Extract years of experience from user message."""
         # Try to find a number followed by years/yrs
-        experience_pattern = r'\b(\d+)\s*(years?|yrs?)\b'
-        experience_match = re.search(experience_pattern, message, re.IGNORECASE)
+        experience_match = EXPERIENCE_PATTERN.search(message)
 
         if experience_match:
             self.candidate_info["experience"] = experience_match.group(1)
@@ -236,40 +590,33 @@ class TalentScoutBot:
             self.candidate_info["experience"] = message.strip()
             logger.info(f"Saved experience response: {message.strip()}")
 
+    @timed()
     def _extract_position(self, message: str) -> None:
         """Extract desired position from user message."""
         self.candidate_info["position"] = message.strip()
         logger.info(f"Saved position: {message.strip()}")
 
+    @timed()
     def _extract_location(self, message: str) -> None:
         """Extract location from user message."""
         self.candidate_info["location"] = message.strip()
         logger.info(f"Saved location: {message.strip()}")
 
+    @timed()
     def _extract_tech_stack(self, message: str) -> None:
         """Extract tech stack from user message."""
-        # Common technologies to look for - combined from tech_categories
-        tech_keywords = []
-        for category in self.tech_categories.values():
-            tech_keywords.extend(category)
-
         # First try to split by commas if the format seems to be a comma-separated list
         if "," in message:
             tech_list = [item.strip().lower() for item in message.split(',')]
             # Add other common separators
             tech_list = [item for sublist in [item.split('/') for item in tech_list] for item in sublist]
-            tech_list = [item for sublist in [item.split('and') for item in tech_list] for item in sublist]
+            tech_list = [item for sublist in [AND_PATTERN.split(item) for item in tech_list] for item in sublist]
             tech_list = [item.strip() for item in tech_list if item.strip()]
             self.candidate_info["tech_stack"] = tech_list
             logger.info(f"Extracted tech stack (split method): {tech_list}")
         else:
-            # If no commas, try to identify tech keywords
-            message_lower = message.lower()
-            found_tech = []
-
-            for tech in tech_keywords:
-                if tech in message_lower:
-                    found_tech.append(tech)
+            # If no commas, try to identify tech keywords in a single pass over the message
+            found_tech = self.tech_matcher.extract(message)
 
             # If automated extraction found technologies, use them
             if found_tech:
@@ -295,44 +642,23 @@ class TalentScoutBot:
         prompt = "Extract technology keywords from this text: " + message + "\n\nOutput ONLY a JSON array of technology names, with no other text or explanation.\nFor example: [\"Python\", \"React\", \"AWS\", \"PostgreSQL\"]\n\nDo not include explanations, notes, or anything except the JSON array."
 
         try:
-            # Call Gemini API
-            response = requests.post(
-                f"https://generativelanguage.googleapis.com/v1/models/gemini-1.5-pro:generateContent?key={self.api_key}",
-                json={
-                    "contents": [{
-                        "parts": [{
-                            "text": prompt
-                        }]
-                    }]
-                },
-                timeout=30
-            )
-
-            # Check for successful response
-            if response.status_code == 200:
-                response_data = response.json()
-
-                # Extract text from Gemini response
-                tech_text = response_data.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "[]")
-
-                # Try to parse the response as a JSON array
-                try:
-                    tech_list = json.loads(tech_text)
-                    if isinstance(tech_list, list):
-                        return tech_list
-                    else:
-                        return [message.strip()]
-                except:
-                    # If parsing fails, fall back to basic comma splitting
-                    return [item.strip() for item in message.split(',') if item.strip()]
-            else:
-                logger.error(f"Gemini API error: {response.status_code} - {response.text}")
-                return [message.strip()]
-
-        except Exception as e:
+            tech_text = self.client.generate_content(prompt, priority=self.gemini_priority) or "[]"
+        except GeminiError as e:
             logger.error(f"Error extracting tech stack with Gemini: {e}")
+            FALLBACKS.inc(path="tech_stack_extraction", reason="gemini_error")
             return [message.strip()]
 
+        # Try to parse the response as a JSON array
+        try:
+            tech_list = json.loads(tech_text)
+            if isinstance(tech_list, list):
+                return tech_list
+            else:
+                return [message.strip()]
+        except ValueError:
+            # If parsing fails, fall back to basic comma splitting
+            return [item.strip() for item in message.split(',') if item.strip()]
+
     def _generate_contact_request_message(self) -> str:
         """Generate message asking for contact information."""
         return f"Thanks, {self.candidate_info['name']}! Could you please provide your email address and phone number so we can contact you?"
@@ -353,19 +679,10 @@ class TalentScoutBot:
         """Generate message asking about tech stack."""
         return f"Thank you for that information! Now, I'd like to know about your technical skills.\n\nPlease list the programming languages, frameworks, databases, and tools that you are proficient in.\nFor example: Python, React, AWS, SQL, etc."
 
+    @timed()
     def _categorize_tech_stack(self, tech_stack: List[str]) -> Dict[str, List[str]]:
         """Categorize technologies in the tech stack by type."""
-        categorized = {category: [] for category in self.tech_categories.keys()}
-
-        for tech in tech_stack:
-            tech_lower = tech.lower()
-            for category, items in self.tech_categories.items():
-                if any(item == tech_lower or item in tech_lower for item in items):
-                    categorized[category].append(tech)
-                    break
-
-        # Remove empty categories
-        return {k: v for k, v in categorized.items() if v}
+        return self.tech_matcher.categorize(tech_stack)
 
     def _generate_technical_questions(self) -> str:
         """Generate technical questions based on the candidate's tech stack using Gemini API."""
@@ -376,93 +693,401 @@ class TalentScoutBot:
 
         tech_stack_str = ", ".join(tech_stack)
 
+        # Serve a cached question set for this stack without touching the network
+        cached_questions = self.question_cache.get(tech_stack)
+        if cached_questions:
+            logger.info(f"Question cache hit for tech stack: {tech_stack_str}")
+            QUESTION_SETS.inc(source="cache")
+            return self._format_technical_questions(cached_questions, tech_stack_str)
+
+        speculated_questions = self._take_speculation(tech_stack)
+        if speculated_questions:
+            QUESTION_SETS.inc(source="speculation")
+            return self._format_technical_questions(speculated_questions, tech_stack_str)
+
+        banked_questions = self._serve_bank_questions(tech_stack)
+        if banked_questions:
+            return self._format_technical_questions(banked_questions, tech_stack_str)
+
         # Check if API is working before attempting to generate questions
         if not self.api_working or not self.api_key:
             # If API is not working, use fallback questions
+            FALLBACKS.inc(path="technical_questions", reason="api_unavailable")
             categorized_tech = self._categorize_tech_stack(tech_stack)
             return self._generate_fallback_technical_questions(categorized_tech, tech_stack_str)
 
-        # Direct, simple prompt for generating tech-specific questions
-        prompt = "Generate 4-5 technical interview questions for a candidate with experience in: " + tech_stack_str + "\n\nRequirements for questions:\n1. Each question must specifically mention one of the technologies in their tech stack\n2. Questions should range from medium to hard difficulty\n3. Include at least one scenario-based question where they explain how they'd solve a problem\n4. Questions should test deep knowledge, not just basics\n5. Questions should not be answerable with just yes/no\n\nFormat your response as a clean numbered list with no indentation. Do not include any introductory text or explanations."
+        if self._should_fan_out(tech_stack):
+            return self._format_technical_questions(self.fan_out_questions(tech_stack).text(), tech_stack_str)
 
         try:
-            # Call Gemini API
-            response = requests.post(
-                f"https://generativelanguage.googleapis.com/v1/models/gemini-1.5-pro:generateContent?key={self.api_key}",
-                json={
-                    "contents": [{
-                        "parts": [{
-                            "text": prompt
-                        }]
-                    }]
-                },
-                timeout=30
-            )
-
-            # Check for successful response
-            if response.status_code == 200:
-                response_data = response.json()
-
-                # Extract text from Gemini response
-                questions = response_data.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
-
-                # Remove any indentation from the response to prevent alignment issues
-                questions = "\n\n".join(line.strip() for line in questions.split("\n"))
-
-                return f"Based on your tech stack ({tech_stack_str}), I'd like to ask you a few technical questions:\n\n{questions}\n\nPlease answer these questions to help us assess your technical proficiency."
-            else:
-                logger.error(f"Gemini API error: {response.status_code} - {response.text}")
-                self.api_working = False  # Mark API as not working for future calls
-                # Provide more specific fallback questions based on tech categories
-                categorized_tech = self._categorize_tech_stack(tech_stack)
-                return self._generate_fallback_technical_questions(categorized_tech, tech_stack_str)
-
-        except Exception as e:
+            questions = self._fetch_technical_questions(tech_stack, self.gemini_priority)
+        except GeminiError as e:
             logger.error(f"Error generating technical questions: {e}")
-            self.api_working = False  # Mark API as not working for future calls
+            FALLBACKS.inc(path="technical_questions", reason="gemini_error")
             # Provide more specific fallback questions based on tech categories
             categorized_tech = self._categorize_tech_stack(tech_stack)
             return self._generate_fallback_technical_questions(categorized_tech, tech_stack_str)
 
-    def _generate_fallback_technical_questions(self, categorized_tech: Dict[str, List[str]], tech_stack_str: str) -> str:
-        """Generate fallback technical questions if the LLM call fails."""
-        fallback_questions = []
+        QUESTION_SETS.inc(source="llm")
+        return self._format_technical_questions(questions, tech_stack_str)
 
-        # Generate language-specific questions
-        if "languages" in categorized_tech and categorized_tech["languages"]:
-            primary_language = categorized_tech["languages"][0]
-            fallback_questions.append(f"1. What features or aspects of {primary_language} do you find most useful in your development work? Please provide specific examples.")
+    def _resume_technical_questions(self) -> str:
+        """
+        Repeat the technical questions for a resumed session without waiting on Gemini.
 
-        # Generate frontend-specific questions
-        if "frontend" in categorized_tech and categorized_tech["frontend"]:
-            frontend_tech = categorized_tech["frontend"][0]
-            fallback_questions.append(f"2. Describe a challenging UI/UX problem you solved using {frontend_tech}. What was your approach and what was the outcome?")
+        The resume message is built on the page load, so it is served from
+        the question cache, then the bank, then the fallback templates. If
+        none of the first two had a set, a Gemini set is generated in the
+        background so the cache can serve the next candidate with this stack.
+        """
+        tech_stack = self.candidate_info["tech_stack"]
+        if not tech_stack:
+            return "I don't have information about your technical skills. Could you please share your tech stack with me?"
+        tech_stack_str = ", ".join(tech_stack)
 
-        # Generate backend-specific questions
-        if "backend" in categorized_tech and categorized_tech["backend"]:
-            backend_tech = categorized_tech["backend"][0]
-            fallback_questions.append(f"3. How do you handle API security and performance optimization in {backend_tech}? Share some best practices you follow.")
+        cached_questions = self.question_cache.get(tech_stack)
+        if cached_questions:
+            QUESTION_SETS.inc(source="cache")
+            return self._format_technical_questions(cached_questions, tech_stack_str)
+
+        categorized_tech = self._categorize_tech_stack(tech_stack)
+        if self.api_working and self.engine.speculation:
+            self.engine.speculation_pool.submit(self._upgrade_cached_questions, list(tech_stack))
+        banked_questions = self._sample_bank_questions(categorized_tech)
+        if banked_questions:
+            QUESTION_SETS.inc(source="bank")
+            return self._format_technical_questions(banked_questions, tech_stack_str)
+        FALLBACKS.inc(path="technical_questions", reason="resume")
+        return self._generate_fallback_technical_questions(categorized_tech, tech_stack_str)
+
+    def _should_fan_out(self, tech_stack: List[str]) -> bool:
+        """Whether a stack is long enough to split into per-category Gemini calls."""
+        threshold = self.engine.fanout_min_technologies
+        return bool(threshold) and len(tech_stack) >= threshold
+
+    def fan_out_questions(self, tech_stack: List[str]) -> FanoutResult:
+        """
+        Generate questions with one concurrent Gemini call per category.
+
+        Waits at most the engine's fanout_deadline. Categories that fail or
+        miss the deadline are filled from the question bank, then the
+        fallback templates. The merged set is cached for the whole stack
+        only if every category was answered by Gemini or the cache.
+
+        Args:
+            tech_stack: The candidate's technologies
+
+        Returns:
+            FanoutResult: The merged questions, each with its category and source
+        """
+        fanout = QuestionFanout(
+            lambda prompt, timeout: self.client.generate_content(prompt, timeout=timeout,
+                                                                 priority=self.gemini_priority),
+            self.engine.fanout_pool,
+            question_cache=self.question_cache,
+            fill=self._fill_category_questions,
+            deadline=self.engine.fanout_deadline
+        )
+        result = fanout.run(split_stack(self._categorize_tech_stack(tech_stack), tech_stack))
+        logger.info(f"Fanned out questions for {len(tech_stack)} technologies in {result.seconds:.2f}s: "
+                    f"{result.provenance()}")
+        if result.complete:
+            QUESTION_SETS.inc(source="llm")
+            self.question_cache.put(tech_stack, result.text(), latency=result.seconds)
+        else:
+            QUESTION_SETS.inc(source="fanout_partial")
+        return result
+
+    def _fill_category_questions(self, category: str, technologies: List[str],
+                                 count: int) -> List[Tuple[str, str]]:
+        """Up to `count` (question, source) pairs for one category, from the bank, then the templates."""
+        if category == "general":
+            return [(question, "template") for question in GENERAL_FALLBACK_QUESTIONS[:count]]
+        bank = self.engine.question_bank
+        questions = []
+        if bank is not None:
+            questions = [(question, "bank") for _, question in bank.sample({category: technologies}, count=count)]
+        templates = dict(FALLBACK_QUESTION_TEMPLATES)
+        if len(questions) < count and category in templates:
+            questions.extend((templates[category].format(tech=tech), "template")
+                             for tech in technologies[:count - len(questions)])
+        return questions
+
+    def _sample_bank_questions(self, categorized_tech: Dict[str, List[str]]) -> Optional[str]:
+        """A numbered question list from the question bank, or None if it can't cover the stack."""
+        bank = self.engine.question_bank
+        if bank is None:
+            return None
+        sampled = bank.sample(categorized_tech, count=5)
+        if len(sampled) < 4:
+            return None
+        return "\n\n".join(f"{n}. {question}" for n, (_, question) in enumerate(sampled, 1))
+
+    def _serve_bank_questions(self, tech_stack: List[str]) -> Optional[str]:
+        """
+        Banked questions for the stack when the bank is the preferred source.
 
-        # Generate database-specific questions
-        if "databases" in categorized_tech and categorized_tech["databases"]:
-            db_tech = categorized_tech["databases"][0]
-            fallback_questions.append(f"4. What strategies do you use for database optimization in {db_tech}? How do you handle large datasets?")
+        In "upgrade" mode a Gemini set for the same stack is generated in the
+        background, so the question cache serves it to the next candidate.
+        """
+        if self.engine.question_source == "llm":
+            return None
+        questions = self._sample_bank_questions(self._categorize_tech_stack(tech_stack))
+        if questions is None:
+            return None
+        QUESTION_SETS.inc(source="bank")
+        if self.engine.question_source == "upgrade" and self.api_working:
+            self.engine.speculation_pool.submit(self._upgrade_cached_questions, list(tech_stack))
+        return questions
+
+    def _upgrade_cached_questions(self, tech_stack: List[str]) -> None:
+        """Background task: generate a Gemini question set so the cache can serve it next time."""
+        try:
+            self._fetch_technical_questions(tech_stack, BACKGROUND)
+        except GeminiError as e:
+            logger.warning(f"Background question upgrade failed: {e}")
+
+    def _fetch_technical_questions(self, tech_stack: List[str], priority: int) -> str:
+        """
+        Generate a question list for a stack with Gemini and cache it.
+
+        Reads no session state, so it is safe to run on the speculation pool.
 
-        # Add cloud/deployment question if applicable
-        if "cloud" in categorized_tech and categorized_tech["cloud"]:
-            cloud_tech = categorized_tech["cloud"][0]
-            fallback_questions.append(f"5. How have you used {cloud_tech} in your projects? What services or features do you have the most experience with?")
+        Args:
+            tech_stack: Technologies to ask about
+            priority: Dispatcher priority of the Gemini call
+
+        Returns:
+            str: Question list with indentation stripped
+
+        Raises:
+            GeminiError: If the Gemini call fails
+        """
+        prompt = self._build_technical_questions_prompt(", ".join(tech_stack))
+        started = time.perf_counter()
+        questions = self.client.generate_content(prompt, priority=priority)
+        latency = time.perf_counter() - started
+
+        # Remove any indentation from the response to prevent alignment issues
+        questions = "\n\n".join(line.strip() for line in questions.split("\n"))
+        self.question_cache.put(tech_stack, questions, latency=latency)
+        return questions
+
+    def _speculate_predicted_stack(self) -> Optional[Future]:
+        """
+        Predict the candidate's stack and speculate on it, all on the speculation pool.
+
+        The prediction reads the candidate database, so it stays off the
+        request path along with the generation it starts.
+
+        Returns:
+            Optional[Future]: The pending prediction, or None if speculation is off
+        """
+        if not self.api_working or not self.engine.speculation:
+            return None
+        email, position = self.candidate_info.get("email"), self.candidate_info.get("position")
+        return self.engine.speculation_pool.submit(self._speculate_on_prediction, email, position)
+
+    def _speculate_on_prediction(self, email: Optional[str], position: Optional[str]) -> None:
+        """Background task: predict the stack, then start speculating on it unless it has already been given."""
+        predicted_stack = self._predict_tech_stack(email, position)
+        # A prediction that lands after the stack turn is useless; speculation is started only before it
+        if predicted_stack and self.current_stage in ("location", "tech_stack"):
+            self.speculate_questions(predicted_stack)
+
+    def _predict_tech_stack(self, email: Optional[str], position: Optional[str]) -> Optional[List[str]]:
+        """Best guess at the candidate's stack before they state it: their stored record, else a role default."""
+        if email and self.engine.candidate_db is not None:
+            try:
+                record = self.engine.candidate_db.get_candidate_by_email(email)
+            except Exception as e:
+                logger.warning(f"Could not look up stored candidate for stack prediction: {e}")
+                record = None
+            if record and record.get("tech_stack"):
+                return list(record["tech_stack"])
+
+        position = (position or "").lower()
+        for keyword, stack in POSITION_STACK_DEFAULTS:
+            if keyword in position:
+                return list(stack)
+        return None
+
+    def speculate_questions(self, tech_stack: List[str]) -> Optional[Future]:
+        """
+        Start generating questions for a likely tech stack in the background.
+
+        The result is held for this session and used at the tech stack stage
+        if the candidate's stated stack turns out to be the same (in any
+        order); otherwise it is discarded. Callers with better information,
+        such as a parsed resume, can call this directly.
+
+        Args:
+            tech_stack: Predicted technologies
+
+        Returns:
+            Optional[Future]: The pending generation, or None if nothing was started
+        """
+        if not tech_stack or not self.api_working or not self.engine.speculation:
+            return None
+        key = make_stack_key(tech_stack)
+        if self.state.speculation is not None:
+            if self.state.speculation[0] == key:
+                return self.state.speculation[1]
+            self.state.speculation[1].cancel()
+        if self.question_cache.contains(tech_stack):
+            # Already cached; the tech stack turn will be instant without help
+            self.state.speculation = None
+            return None
+        if (self.engine.question_source == "bank"
+                and self._sample_bank_questions(self._categorize_tech_stack(tech_stack))):
+            # The bank will answer the tech stack turn without a Gemini call
+            self.state.speculation = None
+            return None
+
+        future = self.engine.speculation_pool.submit(self._fetch_technical_questions, list(tech_stack), BACKGROUND)
+        self.state.speculation = (key, future)
+        SPECULATIONS.inc(outcome="started")
+        logger.info(f"Speculatively generating questions for: {', '.join(tech_stack)}")
+        return future
+
+    def _take_speculation(self, tech_stack: List[str]) -> Optional[str]:
+        """Questions from this session's speculative generation, if it was for this stack."""
+        speculation, self.state.speculation = self.state.speculation, None
+        if speculation is None:
+            return None
+
+        key, future = speculation
+        if key != make_stack_key(tech_stack):
+            future.cancel()
+            SPECULATIONS.inc(outcome="invalidated")
+            return None
+
+        # A generation still in flight is already ahead of a fresh call, so wait for it
+        outcome = "hit" if future.done() else "joined"
+        try:
+            questions = future.result()
+        except (GeminiError, CancelledError) as e:
+            logger.warning(f"Speculative question generation failed: {e}")
+            SPECULATIONS.inc(outcome="failed")
+            return None
+        SPECULATIONS.inc(outcome=outcome)
+        return questions
+
+    def _generate_technical_questions_stream(self) -> Iterator[str]:
+        """Streaming variant of _generate_technical_questions using streamGenerateContent."""
+        tech_stack = self.candidate_info["tech_stack"]
+
+        if not tech_stack or len(tech_stack) == 0:
+            yield "I don't have information about your technical skills. Could you please share your tech stack with me?"
+            return
+
+        tech_stack_str = ", ".join(tech_stack)
+
+        cached_questions = self.question_cache.get(tech_stack)
+        if cached_questions:
+            logger.info(f"Question cache hit for tech stack: {tech_stack_str}")
+            QUESTION_SETS.inc(source="cache")
+            yield self._format_technical_questions(cached_questions, tech_stack_str)
+            return
+
+        speculated_questions = self._take_speculation(tech_stack)
+        if speculated_questions:
+            QUESTION_SETS.inc(source="speculation")
+            yield self._format_technical_questions(speculated_questions, tech_stack_str)
+            return
+
+        banked_questions = self._serve_bank_questions(tech_stack)
+        if banked_questions:
+            yield self._format_technical_questions(banked_questions, tech_stack_str)
+            return
+
+        categorized_tech = self._categorize_tech_stack(tech_stack)
+        if not self.api_working or not self.api_key:
+            FALLBACKS.inc(path="technical_questions", reason="api_unavailable")
+            yield self._generate_fallback_technical_questions(categorized_tech, tech_stack_str)
+            return
+
+        # The intro doesn't depend on Gemini, so it goes out before the first token arrives
+        yield self._technical_questions_intro(tech_stack_str)
+
+        if self._should_fan_out(tech_stack):
+            yield self.fan_out_questions(tech_stack).text()
+            yield self._technical_questions_outro()
+            return
+
+        prompt = self._build_technical_questions_prompt(tech_stack_str)
+        lines = []
+        pending = ""
+        interrupted = False
+        started = time.perf_counter()
+        try:
+            for chunk in self.client.stream_generate_content(prompt, priority=self.gemini_priority):
+                pending += chunk
+                # Emit only complete lines so indentation can be stripped the same way as the blocking path
+                *complete, pending = pending.split("\n")
+                for line in complete:
+                    yield ("\n\n" if lines else "") + line.strip()
+                    lines.append(line.strip())
+        except GeminiError as e:
+            logger.error(f"Error streaming technical questions: {e}")
+            interrupted = True
+            if not lines and not pending:
+                FALLBACKS.inc(path="technical_questions", reason="gemini_error")
+                yield self._build_fallback_questions(categorized_tech)
+                yield self._technical_questions_outro()
+                return
+
+        if pending or not lines:
+            yield ("\n\n" if lines else "") + pending.strip()
+            lines.append(pending.strip())
+
+        QUESTION_SETS.inc(source="llm")
+        # A truncated set is shown to the candidate but never cached
+        if not interrupted:
+            self.question_cache.put(tech_stack, "\n\n".join(lines), latency=time.perf_counter() - started)
+        yield self._technical_questions_outro()
+
+    @timed()
+    def _build_technical_questions_prompt(self, tech_stack_str: str) -> str:
+        """Direct, simple prompt for generating tech-specific questions."""
+        return "Generate 4-5 technical interview questions for a candidate with experience in: " + tech_stack_str + "\n\nRequirements for questions:\n1. Each question must specifically mention one of the technologies in their tech stack\n2. Questions should range from medium to hard difficulty\n3. Include at least one scenario-based question where they explain how they'd solve a problem\n4. Questions should test deep knowledge, not just basics\n5. Questions should not be answerable with just yes/no\n\nFormat your response as a clean numbered list with no indentation. Do not include any introductory text or explanations."
+
+    def _technical_questions_intro(self, tech_stack_str: str) -> str:
+        """Opening line of the technical questions message."""
+        return f"Based on your tech stack ({tech_stack_str}), I'd like to ask you a few technical questions:\n\n"
+
+    def _technical_questions_outro(self) -> str:
+        """Closing line of the technical questions message."""
+        return "\n\nPlease answer these questions to help us assess your technical proficiency."
+
+    def _format_technical_questions(self, questions: str, tech_stack_str: str) -> str:
+        """Wrap a question list in the technical questions message."""
+        return self._technical_questions_intro(tech_stack_str) + questions + self._technical_questions_outro()
+
+    def _generate_fallback_technical_questions(self, categorized_tech: Dict[str, List[str]], tech_stack_str: str) -> str:
+        """Generate fallback technical questions if the LLM call fails."""
+        return self._format_technical_questions(self._build_fallback_questions(categorized_tech), tech_stack_str)
+
+    def _build_fallback_questions(self, categorized_tech: Dict[str, List[str]]) -> str:
+        """Build the numbered fallback question list from categorized technologies."""
+        # The question bank is far more varied than the templates below, so it goes first
+        banked_questions = self._sample_bank_questions(categorized_tech)
+        if banked_questions:
+            QUESTION_SETS.inc(source="bank")
+            return banked_questions
+        QUESTION_SETS.inc(source="fallback")
+
+        fallback_questions = [f"{number}. " + template.format(tech=categorized_tech[category][0])
+                              for number, (category, template) in enumerate(FALLBACK_QUESTION_TEMPLATES, 1)
+                              if categorized_tech.get(category)]
 
         # Ensure we have at least 3 questions
         if len(fallback_questions) < 3:
-            fallback_questions.append("6. Describe a challenging technical project you've worked on recently. What technologies did you use, what problems did you encounter, and how did you solve them?")
-            fallback_questions.append("7. How do you stay updated with the latest developments in your technical field? Which resources do you find most valuable?")
-            fallback_questions.append("8. What is your approach to debugging complex technical issues? Please walk me through your process with a specific example.")
+            fallback_questions.extend(f"{number}. {question}" for number, question in
+                                      enumerate(GENERAL_FALLBACK_QUESTIONS, len(FALLBACK_QUESTION_TEMPLATES) + 1))
 
         # Format and return the questions
-        questions_text = "\n\n".join(fallback_questions[:5])  # Limit to 5 questions
-
-        return f"Based on your tech stack ({tech_stack_str}), I'd like to ask you a few technical questions:\n\n{questions_text}\n\nPlease answer these questions to help us assess your technical proficiency."
+        return "\n\n".join(fallback_questions[:5])  # Limit to 5 questions
 
     def _generate_closing_message(self) -> str:
         """Generate closing message."""
@@ -474,58 +1099,52 @@ class TalentScoutBot:
     def _generate_llm_response(self, user_message: str, message_history: List[Dict[str, str]]) -> str:
         """Generate response using Gemini API when a more contextual response is needed."""
         if not self.api_working or not self.api_key:
+            FALLBACKS.inc(path="llm_response", reason="api_unavailable")
             return "I'm not sure how to respond to that. Let's continue with the screening process."
 
         # Create a conversation prompt based on history and stage
         prompt = self._create_prompt_for_gemini(user_message, message_history)
 
         try:
-            # Call Gemini API
-            response = requests.post(
-                f"https://generativelanguage.googleapis.com/v1/models/gemini-1.5-pro:generateContent?key={self.api_key}",
-                json={
-                    "contents": [{
-                        "parts": [{
-                            "text": prompt
-                        }]
-                    }]
-                },
-                timeout=30
-            )
-
-            # Check for successful response
-            if response.status_code == 200:
-                response_data = response.json()
-
-                # Extract text from Gemini response
-                response_text = response_data.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
-
-                return response_text
-            else:
-                logger.error(f"Gemini API error: {response.status_code} - {response.text}")
-                self.api_working = False
-                return "I'm not sure how to respond to that. Let's continue with the screening process."
-
-        except Exception as e:
+            return self.client.generate_content(prompt, priority=self.gemini_priority)
+        except GeminiError as e:
             logger.error(f"Error calling Gemini API: {e}")
-            self.api_working = False
+            FALLBACKS.inc(path="llm_response", reason="gemini_error")
             return "I'm not sure how to respond to that. Let's continue with the screening process."
 
-    def _create_prompt_for_gemini(self, user_message: str, message_history: List[Dict[str, str]]) -> str:
-        """Create a prompt for Gemini based on current conversation stage."""
-        # Create system context
-        system_context = f"You are a hiring assistant for TalentScout, a recruitment agency specializing in technology placements.\nYour task is to conduct an initial screening of candidates by gathering information and asking relevant technical questions.\n\nCurrent conversation stage: {self.current_stage}\nCurrent candidate information: {json.dumps(self.candidate_info, indent=2)}\n\nFocus on gathering the information needed for the current stage and then move to the next stage.\nBe professional, friendly, and concise in your responses.\nMaintain the conversation in the context of a job application process."
+    def _generate_llm_response_stream(self, user_message: str, message_history: List[Dict[str, str]]) -> Iterator[str]:
+        """Streaming variant of _generate_llm_response using streamGenerateContent."""
+        fallback = "I'm not sure how to respond to that. Let's continue with the screening process."
+        if not self.api_working or not self.api_key:
+            FALLBACKS.inc(path="llm_response", reason="api_unavailable")
+            yield fallback
+            return
 
-        # Add conversation history
-        conversation_history = "\n\n--- Previous Messages ---\n"
-        for message in message_history[-5:]:  # Use last 5 messages to avoid token limits
-            role = "User" if message["role"] == "user" else "Assistant"
-            conversation_history += f"{role}: {message['content']}\n"
+        prompt = self._create_prompt_for_gemini(user_message, message_history)
 
-        # Combine everything into a final prompt
-        final_prompt = f"{system_context}\n\n{conversation_history}\n\nUser: {user_message}\n\nYour response:"
+        streamed = False
+        try:
+            for chunk in self.client.stream_generate_content(prompt, priority=self.gemini_priority):
+                streamed = True
+                yield chunk
+        except GeminiError as e:
+            logger.error(f"Error streaming Gemini response: {e}")
+            if not streamed:
+                FALLBACKS.inc(path="llm_response", reason="gemini_error")
+                yield fallback
+
+    @timed()
+    def _create_prompt_for_gemini(self, user_message: str, message_history: List[Dict[str, str]]) -> str:
+        """Create a prompt for Gemini based on current conversation stage, within the token budget."""
+        builder = self.engine.prompt_builder
+        if self.state.summary is None:
+            self.state.summary = builder.new_summary()
 
-        return final_prompt
+        prompt = builder.build(self.current_stage, self.candidate_info, message_history, user_message,
+                               self.state.summary)
+        logger.info(f"Built Gemini prompt: ~{prompt.tokens} tokens, {prompt.recent_messages} recent messages, "
+                    f"{prompt.summarized_messages} summarized")
+        return prompt.text
 
 
 def test_gemini_api():
@@ -536,26 +1155,11 @@ def test_gemini_api():
         return False
 
     try:
-        # Simple test request
-        response = requests.post(
-            f"https://generativelanguage.googleapis.com/v1/models/gemini-1.5-pro:generateContent?key={api_key}",
-            json={
-                "contents": [{
-                    "parts": [{
-                        "text": "Hello, please respond with the text 'API working properly'"
-                    }]
-                }]
-            },
-            timeout=10
-        )
-
-        if response.status_code == 200:
-            print("✅ Gemini API connection successful!")
-            return True
-        else:
-            print(f"❌ Gemini API error: {response.status_code} - {response.text}")
-            return False
-    except Exception as e:
+        # Simple test request; this also warms the pooled connection the bot will reuse
+        get_client(api_key).generate_content("Hello, please respond with the text 'API working properly'", timeout=10)
+        print("✅ Gemini API connection successful!")
+        return True
+    except GeminiError as e:
         print(f"❌ Gemini API connection failed: {e}")
         return False
 
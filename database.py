@@ -1,116 +1,1140 @@
 """Database utilities for TalentScout chatbot"""
 import sqlite3
+import base64
+import binascii
 import json
 import os
+import re
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+
+from metrics import REGISTRY, timed
+from tech_matcher import get_tech_matcher
+from transcripts import CandidateRecord, decode_transcript, encode_transcript, iter_transcript, transcript_text
+
+# Connection tuning applied to every pooled connection. WAL lets readers run
+# alongside a writer; synchronous=NORMAL is durable across application crashes
+# in WAL mode and avoids an fsync per commit.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",      # 16 MB page cache per connection
+    "PRAGMA mmap_size=268435456",    # 256 MB memory-mapped I/O
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+)
+
+# Statement texts are kept constant so sqlite3's per-connection statement
+# cache can reuse the prepared statements
+INSERT_CANDIDATE_SQL = '''
+INSERT INTO candidates
+(name, email, phone, experience, position, location, tech_stack,
+application_time)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+# Re-applications merge into the existing row: new non-empty values win,
+# tech stacks are unioned and the original status and notes are kept. A new
+# transcript, if any, replaces the stored one (see _store_transcript).
+_UPSERT_CANDIDATE_TEMPLATE = '''
+INSERT INTO candidates
+(name, email, phone, experience, position, location, tech_stack,
+application_time)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(email) DO UPDATE SET
+    name = COALESCE(NULLIF(excluded.name, ''), candidates.name),
+    phone = COALESCE(NULLIF(excluded.phone, ''), candidates.phone),
+    experience = COALESCE(NULLIF(excluded.experience, ''), candidates.experience),
+    position = COALESCE(NULLIF(excluded.position, ''), candidates.position),
+    location = COALESCE(NULLIF(excluded.location, ''), candidates.location),
+    tech_stack = {tech_stack},
+    application_time = {application_time}
+'''
+_MERGED_TECH_STACK_SQL = '''(
+        SELECT json_group_array(value) FROM (
+            SELECT value FROM json_each(candidates.tech_stack)
+            UNION SELECT value FROM json_each(excluded.tech_stack)
+        )
+    )'''
+UPSERT_CANDIDATE_SQL = _UPSERT_CANDIDATE_TEMPLATE.format(
+    tech_stack=_MERGED_TECH_STACK_SQL, application_time="excluded.application_time")
+# Re-screening variant: the new tech stack replaces the stored one, so skills
+# that are no longer extracted are dropped
+REPLACE_STACK_CANDIDATE_SQL = _UPSERT_CANDIDATE_TEMPLATE.format(
+    tech_stack="excluded.tech_stack", application_time="excluded.application_time")
+# Write-behind variant for sessions still in progress: the application time
+# is set when the row is first inserted and not moved by later stages, so
+# listings and weekly analytics don't shift as the candidate answers
+UPSERT_PARTIAL_CANDIDATE_SQL = _UPSERT_CANDIDATE_TEMPLATE.format(
+    tech_stack=_MERGED_TECH_STACK_SQL, application_time="candidates.application_time")
+SELECT_BY_EMAIL_SQL = "SELECT * FROM candidates WHERE email = ?"
+LIST_RECENT_SQL = '''
+SELECT id, name, email, position, application_time, status
+FROM candidates ORDER BY application_time DESC, id DESC LIMIT ?
+'''
+LIST_COLUMNS = "id, name, email, position, location, application_time, status"
+EXPORT_COLUMNS = ("id", "name", "email", "phone", "experience", "position", "location", "tech_stack",
+                  "application_time", "status", "notes")
+# Text indexed for full-text search, as SQL over a candidates row aliased
+# {row}. Only message contents and tech names are indexed, not JSON syntax.
+FTS_COLUMNS = "name, position, tech_stack, conversation_history"
+FTS_VALUES_SQL = '''
+{row}.name,
+{row}.position,
+CASE WHEN json_valid({row}.tech_stack) THEN
+    (SELECT group_concat(value, ', ') FROM json_each({row}.tech_stack))
+END,
+CASE WHEN json_valid({row}.conversation_history) THEN
+    (SELECT group_concat(json_extract(value, '$.content'), char(10)) FROM json_each({row}.conversation_history))
+END
+'''
+# Rebuild variant: transcripts live compressed in candidate_transcripts and are
+# decoded by the transcript_text() function registered on every connection
+FTS_REBUILD_VALUES_SQL = '''
+c.name,
+c.position,
+CASE WHEN json_valid(c.tech_stack) THEN
+    (SELECT group_concat(value, ', ') FROM json_each(c.tech_stack))
+END,
+(SELECT transcript_text(t.codec, t.data) FROM candidate_transcripts t WHERE t.candidate_id = c.id)
+'''
+UPSERT_TRANSCRIPT_SQL = '''
+INSERT OR REPLACE INTO candidate_transcripts (candidate_id, codec, message_count, data)
+VALUES (?, ?, ?, ?)
+'''
+SELECT_TRANSCRIPT_SQL = "SELECT codec, data FROM candidate_transcripts WHERE candidate_id = ?"
+UPDATE_FTS_TRANSCRIPT_SQL = "UPDATE candidates_fts SET conversation_history = ? WHERE rowid = ?"
+DELETE_SKILLS_SQL = "DELETE FROM candidate_skills WHERE candidate_id = ?"
+INSERT_SKILL_SQL = "INSERT OR IGNORE INTO candidate_skills (skill, candidate_id, category) VALUES (?, ?, ?)"
+UPSERT_SESSION_SQL = '''
+INSERT INTO candidate_sessions (session_id, email, stage, candidate_info, updated_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(session_id) DO UPDATE SET
+    email = COALESCE(excluded.email, candidate_sessions.email),
+    stage = excluded.stage,
+    candidate_info = excluded.candidate_info,
+    updated_at = excluded.updated_at
+'''
+# Analytics summary keys, as SQL over a candidates row aliased {row}. Positions
+# and locations are free text, so they are grouped case- and space-insensitively;
+# weeks are keyed by their Monday.
+ANALYTICS_DIMENSIONS = {
+    "position": "COALESCE(lower(trim({row}.position)), '')",
+    "status": "COALESCE({row}.status, '')",
+    "week": "COALESCE(date({row}.application_time, '-6 days', 'weekday 1'), '')",
+    "location": "COALESCE(lower(trim({row}.location)), '')",
+}
+LOCATION_KEY_SQL = ANALYTICS_DIMENSIONS["location"]
+INCREMENT_COUNT_SQL = '''
+INSERT INTO candidate_counts (dimension, value, count) VALUES ('{dimension}', {key}, 1)
+ON CONFLICT(dimension, value) DO UPDATE SET count = count + 1;
+'''
+DECREMENT_COUNT_SQL = "UPDATE candidate_counts SET count = count - 1 WHERE dimension = '{dimension}' AND value = {key};"
+COUNT_CANDIDATES_SQL = '''
+SELECT '{dimension}' AS dimension, {key} AS value, COUNT(*) AS count FROM candidates c GROUP BY 2
+'''
+COUNT_SKILL_LOCATIONS_SQL = f'''
+SELECT {LOCATION_KEY_SQL.format(row="c")} AS location, s.skill, COUNT(*) AS count
+FROM candidate_skills s JOIN candidates c ON c.id = s.candidate_id GROUP BY 1, 2
+'''
+LOG_CHANGE_SQL = '''
+INSERT INTO candidate_changes (candidate_id, seq)
+VALUES ({row}, (SELECT COALESCE(MAX(seq), 0) + 1 FROM candidate_changes))
+ON CONFLICT(candidate_id) DO UPDATE SET seq = excluded.seq;
+'''
+MATCH_ROWS_SQL = '''
+SELECT c.id, c.experience, c.location, group_concat(s.skill, char(31)) AS skills
+FROM candidates c LEFT JOIN candidate_skills s ON s.candidate_id = c.id AND s.category IS NOT NULL
+{where} GROUP BY c.id ORDER BY c.id
+'''
+SELECT_OPEN_SESSION_SQL = '''
+SELECT session_id, stage, candidate_info, updated_at FROM candidate_sessions
+WHERE email = ? AND stage != 'closing' ORDER BY updated_at DESC LIMIT 1
+'''
+
+
+DB_OPERATION_SECONDS = REGISTRY.histogram(
+    "talentscout_db_operation_seconds", "Wall time of CandidateDatabase operations", ("operation",))
+DB_OPERATION_ERRORS = REGISTRY.counter(
+    "talentscout_db_operation_errors_total", "CandidateDatabase operations that raised", ("operation",))
+
+
+def _instrumented(operation):
+    """Time a CandidateDatabase method under the given operation label"""
+    return timed(DB_OPERATION_SECONDS, DB_OPERATION_ERRORS, operation=operation)
+
+
+@lru_cache(maxsize=8192)
+def normalize_skill(tech):
+    """Canonical (skill, category) for a tech stack item
+
+    Items in the tech taxonomy resolve to their canonical name and category;
+    anything else is kept as lowercased text with no category.
+    """
+    resolved = get_tech_matcher().classify(tech)
+    if resolved:
+        return resolved
+    return " ".join(str(tech).lower().split()), None
+
+
+def encode_cursor(application_time, candidate_id):
+    """Opaque pagination cursor for the last row of a page"""
+    token = json.dumps([application_time, candidate_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(token.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        application_time, candidate_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor!r}") from e
+    return application_time, int(candidate_id)
+
 
 class CandidateDatabase:
-    def __init__(self, db_path="candidates.db"):
+    # Schema migrations, applied in order to bring any existing database file
+    # up to date. PRAGMA user_version records how many have been applied, so
+    # append new steps to the end and never reorder them.
+    MIGRATIONS = (
+        "_migrate_listing_indexes",
+        "_migrate_candidate_skills",
+        "_migrate_search_index",
+        "_migrate_compressed_transcripts",
+        "_migrate_candidate_sessions",
+        "_migrate_analytics",
+        "_migrate_candidate_changes",
+        "_migrate_export_changes",
+        "_migrate_question_cache",
+    )
+
+    def __init__(self, db_path="candidates.db", busy_timeout=30.0, cached_statements=256):
         self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
         self._init_db()
 
+    def _connection(self):
+        """Return this thread's long-lived connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly by transaction()
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+                cached_statements=self.cached_statements,
+                check_same_thread=False,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.create_function("transcript_text", 2, transcript_text, deterministic=True)
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self, immediate=True):
+        """Run a block in a single transaction on this thread's connection.
+
+        Commits on success and rolls back on error. Writers take the write
+        lock up front (BEGIN IMMEDIATE) so they queue on busy_timeout instead
+        of failing with a lock upgrade error. Nested calls join the outer
+        transaction.
+        """
+        conn = self._connection()
+        if conn.in_transaction:
+            yield conn.cursor()
+            return
+
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn.cursor()
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def close(self):
+        """Close every pooled connection"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
     def _init_db(self):
         """Initialize the database schema if it doesn't exist"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.transaction() as cursor:
+            # Create candidates table
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS candidates (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT,
+                email TEXT UNIQUE,
+                phone TEXT,
+                experience TEXT,
+                position TEXT,
+                location TEXT,
+                tech_stack TEXT,
+                application_time TIMESTAMP,
+                status TEXT DEFAULT 'new',
+                conversation_history TEXT,
+                notes TEXT
+            )
+            ''')
+
+        self._migrate()
+
+    @property
+    def schema_version(self):
+        """Number of migrations applied to this database file"""
+        return self._connection().execute("PRAGMA user_version").fetchone()[0]
+
+    def _migrate(self):
+        """Apply any pending schema migrations, each in its own transaction"""
+        for version, name in enumerate(self.MIGRATIONS, 1):
+            with self.transaction() as cursor:
+                # Re-check under the write lock in case another process migrated first
+                if cursor.execute("PRAGMA user_version").fetchone()[0] >= version:
+                    continue
+                getattr(self, name)(cursor)
+                cursor.execute(f"PRAGMA user_version = {version}")
 
-        # Create candidates table
+    def _migrate_listing_indexes(self, cursor):
+        """Indexes backing recency listing and status/position filters"""
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidates_time ON candidates (application_time, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidates_status_time ON candidates (status, application_time, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidates_position_time ON candidates (position, application_time, id)")
+
+    def _migrate_candidate_skills(self, cursor):
+        """Normalized one-row-per-skill table, backfilled from the tech_stack JSON"""
+        # Keyed by skill first so each skill filter is a single index range
         cursor.execute('''
-        CREATE TABLE IF NOT EXISTS candidates (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            email TEXT UNIQUE,
-            phone TEXT,
-            experience TEXT,
-            position TEXT,
-            location TEXT,
-            tech_stack TEXT,
-            application_time TIMESTAMP,
-            status TEXT DEFAULT 'new',
-            conversation_history TEXT,
-            notes TEXT
-        )
+        CREATE TABLE IF NOT EXISTS candidate_skills (
+            skill TEXT NOT NULL,
+            candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+            category TEXT,
+            PRIMARY KEY (skill, candidate_id)
+        ) WITHOUT ROWID
         ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidate_skills_candidate ON candidate_skills (candidate_id)")
 
-        conn.commit()
-        conn.close()
+        rows = self._connection().execute("SELECT id, tech_stack FROM candidates")
+        while True:
+            batch = rows.fetchmany(1000)
+            if not batch:
+                break
+            for candidate_id, tech_stack_json in batch:
+                self._replace_skills(cursor, candidate_id, tech_stack_json)
 
-    def save_candidate(self, candidate_info, conversation_history=None):
-        """Save candidate information to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _migrate_search_index(self, cursor):
+        """FTS5 index over names, positions, tech stacks and transcripts
+
+        The index keeps its own copy of the text so that rows can be dropped by
+        rowid alone, which keeps the triggers and rebuild_search_index safe
+        even when the index is behind. Existing rows are not indexed here;
+        run `python manage.py search-index` once after upgrading.
+        """
+        cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+            {FTS_COLUMNS}, tokenize='porter unicode61'
+        )
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS candidates_fts_insert AFTER INSERT ON candidates BEGIN
+            INSERT INTO candidates_fts (rowid, {FTS_COLUMNS})
+            VALUES (new.id, {FTS_VALUES_SQL.format(row="new")});
+        END
+        """)
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS candidates_fts_delete AFTER DELETE ON candidates BEGIN
+            DELETE FROM candidates_fts WHERE rowid = old.id;
+        END
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS candidates_fts_update
+        AFTER UPDATE OF {FTS_COLUMNS} ON candidates BEGIN
+            DELETE FROM candidates_fts WHERE rowid = old.id;
+            INSERT INTO candidates_fts (rowid, {FTS_COLUMNS})
+            VALUES (new.id, {FTS_VALUES_SQL.format(row="new")});
+        END
+        """)
+
+    def _migrate_compressed_transcripts(self, cursor):
+        """Move transcripts out of the candidates row into compressed blobs
+
+        The full-text index keeps its transcript text; from here on it is
+        written by _store_transcript, and the update trigger only refreshes
+        the name/position/tech_stack columns. The moved JSON leaves free pages
+        behind, so run VACUUM afterwards to shrink the file.
+        """
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS candidate_transcripts (
+            candidate_id INTEGER PRIMARY KEY REFERENCES candidates(id) ON DELETE CASCADE,
+            codec TEXT NOT NULL,
+            message_count INTEGER NOT NULL,
+            data BLOB NOT NULL
+        )
+        """)
+        cursor.execute("DROP TRIGGER IF EXISTS candidates_fts_update")
+        cursor.execute("""
+        CREATE TRIGGER candidates_fts_update AFTER UPDATE OF name, position, tech_stack ON candidates BEGIN
+            UPDATE candidates_fts SET
+                name = new.name,
+                position = new.position,
+                tech_stack = CASE WHEN json_valid(new.tech_stack) THEN
+                    (SELECT group_concat(value, ', ') FROM json_each(new.tech_stack))
+                END
+            WHERE rowid = new.id;
+        END
+        """)
+
+        rows = self._connection().execute(
+            "SELECT id, conversation_history FROM candidates WHERE conversation_history IS NOT NULL")
+        while True:
+            batch = rows.fetchmany(1000)
+            if not batch:
+                break
+            transcripts = []
+            for candidate_id, history_json in batch:
+                try:
+                    history = json.loads(history_json)
+                except ValueError:
+                    continue
+                if history:
+                    codec, blob, count = encode_transcript(history)
+                    transcripts.append((candidate_id, codec, count, blob))
+            cursor.executemany(UPSERT_TRANSCRIPT_SQL, transcripts)
+        cursor.execute("UPDATE candidates SET conversation_history = NULL WHERE conversation_history IS NOT NULL")
+
+    def _migrate_candidate_sessions(self, cursor):
+        """In-progress conversations, saved as they advance so they can be resumed by email"""
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS candidate_sessions (
+            session_id TEXT PRIMARY KEY,
+            email TEXT,
+            stage TEXT NOT NULL,
+            candidate_info TEXT NOT NULL,
+            updated_at TIMESTAMP NOT NULL
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidate_sessions_email ON candidate_sessions (email, updated_at)")
+
+    def _migrate_analytics(self, cursor):
+        """Summary tables for recruiter dashboards, kept current by triggers
+
+        candidate_counts holds the number of candidates per position, status,
+        week and location; skill_location_counts the number per skill within
+        each location. Every insert, update and delete of a candidate or skill
+        row adjusts the affected counts, so dashboards read a handful of rows
+        however large the table grows. Counts that reach zero are kept (and
+        filtered on read) to avoid churn.
+        """
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS candidate_counts (
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, value)
+        ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS skill_location_counts (
+            location TEXT NOT NULL,
+            skill TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (location, skill)
+        ) WITHOUT ROWID
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidate_counts_top ON candidate_counts (dimension, count)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_skill_location_top ON skill_location_counts (location, count)")
+
+        increments = "".join(INCREMENT_COUNT_SQL.format(dimension=dimension, key=key.format(row="new"))
+                             for dimension, key in ANALYTICS_DIMENSIONS.items())
+        decrements = "".join(DECREMENT_COUNT_SQL.format(dimension=dimension, key=key.format(row="old"))
+                             for dimension, key in ANALYTICS_DIMENSIONS.items())
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS analytics_insert AFTER INSERT ON candidates BEGIN {increments} END")
+        # Skills go first, while the candidate's location can still be looked up
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS analytics_delete BEFORE DELETE ON candidates BEGIN
+            DELETE FROM candidate_skills WHERE candidate_id = old.id;
+            {decrements}
+        END
+        """)
+        for dimension, key in ANALYTICS_DIMENSIONS.items():
+            column = "application_time" if dimension == "week" else dimension
+            cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS analytics_update_{dimension} AFTER UPDATE OF {column} ON candidates
+            WHEN {key.format(row="old")} IS NOT {key.format(row="new")} BEGIN
+                {DECREMENT_COUNT_SQL.format(dimension=dimension, key=key.format(row="old"))}
+                {INCREMENT_COUNT_SQL.format(dimension=dimension, key=key.format(row="new"))}
+            END
+            """)
 
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS analytics_skill_insert AFTER INSERT ON candidate_skills BEGIN
+            INSERT INTO skill_location_counts (location, skill, count)
+            SELECT {LOCATION_KEY_SQL.format(row="c")}, new.skill, 1 FROM candidates c WHERE c.id = new.candidate_id
+            ON CONFLICT(location, skill) DO UPDATE SET count = count + 1;
+        END
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS analytics_skill_delete AFTER DELETE ON candidate_skills BEGIN
+            UPDATE skill_location_counts SET count = count - 1
+            WHERE skill = old.skill
+              AND location = (SELECT {LOCATION_KEY_SQL.format(row="c")} FROM candidates c WHERE c.id = old.candidate_id);
+        END
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS analytics_skill_move AFTER UPDATE OF location ON candidates
+        WHEN {LOCATION_KEY_SQL.format(row="old")} IS NOT {LOCATION_KEY_SQL.format(row="new")} BEGIN
+            UPDATE skill_location_counts SET count = count - 1
+            WHERE location = {LOCATION_KEY_SQL.format(row="old")}
+              AND skill IN (SELECT skill FROM candidate_skills WHERE candidate_id = new.id);
+            INSERT INTO skill_location_counts (location, skill, count)
+            SELECT {LOCATION_KEY_SQL.format(row="new")}, skill, 1 FROM candidate_skills WHERE candidate_id = new.id
+            ON CONFLICT(location, skill) DO UPDATE SET count = count + 1;
+        END
+        """)
+        self._rebuild_analytics(cursor)
+
+    def _migrate_candidate_changes(self, cursor):
+        """Change log of candidates whose match data was written or deleted
+
+        One row per candidate holding the sequence number of its latest
+        change, so the log never grows past the number of candidates. In-memory
+        indexes (see candidate_matcher.py) remember the last number they saw
+        and reload only candidates changed since, including changes made by
+        other processes.
+        """
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS candidate_changes (
+            candidate_id INTEGER PRIMARY KEY,
+            seq INTEGER NOT NULL
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_candidate_changes_seq ON candidate_changes (seq)")
+        # Skills are only rewritten in the same transaction as a tech_stack write, so
+        # logging the candidate row covers them without a trigger per skill row
+        for name, event, row in (
+            ("changes_insert", "AFTER INSERT ON candidates", "new.id"),
+            ("changes_update", "AFTER UPDATE OF experience, location, tech_stack ON candidates", "new.id"),
+            ("changes_delete", "AFTER DELETE ON candidates", "old.id"),
+        ):
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {LOG_CHANGE_SQL.format(row=row)} END")
+
+    def _migrate_export_changes(self, cursor):
+        """Log updates to any candidate column, not just the matching ones
+
+        Incremental exports (see exporter.py) read the change log too and
+        must pick up status, contact and note edits.
+        """
+        cursor.execute("DROP TRIGGER IF EXISTS changes_update")
+        cursor.execute(f"CREATE TRIGGER changes_update AFTER UPDATE ON candidates BEGIN "
+                       f"{LOG_CHANGE_SQL.format(row='new.id')} END")
+
+    def _migrate_question_cache(self, cursor):
+        """Generated question sets, up to a few variants per tech stack (see question_cache.py)"""
+        # Older files may already have it, created by the cache itself
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS question_cache (
+            stack_key TEXT NOT NULL,
+            variant INTEGER NOT NULL,
+            questions TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (stack_key, variant)
+        )
+        """)
+
+    def _rebuild_analytics(self, cursor):
+        """Recompute both summary tables from the candidate and skill rows"""
+        cursor.execute("DELETE FROM candidate_counts")
+        cursor.execute("DELETE FROM skill_location_counts")
+        for dimension, key in ANALYTICS_DIMENSIONS.items():
+            cursor.execute("INSERT INTO candidate_counts (dimension, value, count) " +
+                           COUNT_CANDIDATES_SQL.format(dimension=dimension, key=key.format(row="c")))
+        cursor.execute("INSERT INTO skill_location_counts (location, skill, count) " + COUNT_SKILL_LOCATIONS_SQL)
+
+    def _store_transcript(self, cursor, candidate_id, conversation_history):
+        """Write a candidate's compressed transcript and its search text"""
+        codec, blob, count = encode_transcript(conversation_history)
+        cursor.execute(UPSERT_TRANSCRIPT_SQL, (candidate_id, codec, count, blob))
+        cursor.execute(UPDATE_FTS_TRANSCRIPT_SQL, (
+            "\n".join(str(message.get("content", "")) for message in conversation_history),
+            candidate_id
+        ))
+
+    def _replace_skills(self, cursor, candidate_id, tech_stack):
+        """Rewrite a candidate's candidate_skills rows from their tech stack (list or JSON text)"""
+        if isinstance(tech_stack, str):
+            try:
+                tech_stack = json.loads(tech_stack)
+            except ValueError:
+                tech_stack = []
+        cursor.execute(DELETE_SKILLS_SQL, (candidate_id,))
+        skills = [normalize_skill(str(tech)) for tech in tech_stack or [] if str(tech).strip()]
+        cursor.executemany(INSERT_SKILL_SQL, [(skill, candidate_id, category) for skill, category in skills])
+
+    def _candidate_row(self, candidate_info):
+        """Build the parameter tuple for INSERT_CANDIDATE_SQL and the upserts"""
         # Convert tech_stack list to JSON string
         if isinstance(candidate_info.get('tech_stack', []), list):
             tech_stack_json = json.dumps(candidate_info.get('tech_stack', []))
         else:
             tech_stack_json = json.dumps([])
 
-        # Convert conversation history to JSON string
-        if conversation_history:
-            conv_history_json = json.dumps(conversation_history)
-        else:
-            conv_history_json = json.dumps([])
+        return (
+            candidate_info.get('name', ''),
+            candidate_info.get('email', ''),
+            candidate_info.get('phone', ''),
+            candidate_info.get('experience', ''),
+            candidate_info.get('position', ''),
+            candidate_info.get('location', ''),
+            tech_stack_json,
+            candidate_info.get('application_time') or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        )
 
+    @_instrumented("save_candidate")
+    def save_candidate(self, candidate_info, conversation_history=None):
+        """Save candidate information to database"""
         try:
-            cursor.execute('''
-            INSERT INTO candidates
-            (name, email, phone, experience, position, location, tech_stack,
-            application_time, conversation_history)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                candidate_info.get('name', ''),
-                candidate_info.get('email', ''),
-                candidate_info.get('phone', ''),
-                candidate_info.get('experience', ''),
-                candidate_info.get('position', ''),
-                candidate_info.get('location', ''),
-                tech_stack_json,
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                conv_history_json
-            ))
-
-            conn.commit()
-            result = {"success": True, "candidate_id": cursor.lastrowid}
+            with self.transaction() as cursor:
+                row = self._candidate_row(candidate_info)
+                cursor.execute(INSERT_CANDIDATE_SQL, row)
+                candidate_id = cursor.lastrowid
+                self._replace_skills(cursor, candidate_id, row[6])
+                if conversation_history:
+                    self._store_transcript(cursor, candidate_id, conversation_history)
+            result = {"success": True, "candidate_id": candidate_id}
         except sqlite3.IntegrityError:
             # Handle duplicate email
             result = {"success": False, "error": "Candidate with this email already exists"}
-        finally:
-            conn.close()
 
         return result
 
-    def get_candidate_by_email(self, email):
-        """Retrieve candidate by email"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
-        cursor = conn.cursor()
+    def save_candidates_bulk(self, candidates, chunk_size=1000, replace_tech_stack=False):
+        """Insert or merge many candidates, yielding one outcome per input row
+
+        `candidates` may be any iterable (including a generator) of candidate
+        dicts; a `conversation_history` key, if present, is stored as the
+        transcript. Rows are consumed `chunk_size` at a time and each chunk is
+        written with executemany in its own transaction, so memory stays flat
+        however large the input is. Existing emails are merged with upsert
+        semantics (see UPSERT_CANDIDATE_SQL). With `replace_tech_stack=True`
+        the new tech stack replaces the stored one instead of being unioned
+        with it, and the candidate's skill rows are rewritten to match; use it
+        when re-extracting stacks, e.g. after a taxonomy change.
 
-        cursor.execute("SELECT * FROM candidates WHERE email = ?", (email,))
-        result = cursor.fetchone()
+        Each outcome is a dict with `email`, `success` and either `action`
+        ("inserted" or "updated") plus `candidate_id`, or `error`.
+        """
+        iterator = iter(candidates)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            yield from self._save_chunk(chunk, REPLACE_STACK_CANDIDATE_SQL if replace_tech_stack
+                                        else UPSERT_CANDIDATE_SQL)
 
-        conn.close()
+    @_instrumented("save_chunk")
+    def _save_chunk(self, chunk, upsert_sql=UPSERT_CANDIDATE_SQL):
+        """Upsert one chunk of candidates in a single transaction, with one of the upsert statements
+
+        Database errors become failed outcomes, except when called inside an
+        outer transaction: the error is raised so the caller rolls back the
+        whole transaction instead of committing around a failed chunk.
+        """
+        outcomes = []
+        rows = []
+        transcripts = {}
+        for candidate_info in chunk:
+            email = (candidate_info.get('email') or '').strip()
+            if not email:
+                outcomes.append({"email": None, "success": False, "error": "Candidate has no email"})
+                continue
+            candidate_info = dict(candidate_info, email=email)
+            rows.append(self._candidate_row(candidate_info))
+            if candidate_info.get('conversation_history'):
+                transcripts[email] = candidate_info['conversation_history']
+            outcomes.append({"email": email, "success": True})
+
+        emails = list({row[1] for row in rows})
+        placeholders = ",".join("?" * len(emails))
+        nested = self._connection().in_transaction
+        try:
+            with self.transaction() as cursor:
+                existing = set()
+                if emails:
+                    existing = {row[0] for row in cursor.execute(
+                        f"SELECT email FROM candidates WHERE email IN ({placeholders})", emails)}
+                cursor.executemany(upsert_sql, rows)
+                ids = {}
+                if emails:
+                    # Upserts may have merged tech stacks, so resync skills from the stored rows
+                    for email, candidate_id, tech_stack_json in cursor.execute(
+                            f"SELECT email, id, tech_stack FROM candidates WHERE email IN ({placeholders})",
+                            emails).fetchall():
+                        ids[email] = candidate_id
+                        self._replace_skills(cursor, candidate_id, tech_stack_json)
+                        if email in transcripts:
+                            self._store_transcript(cursor, candidate_id, transcripts[email])
+        except sqlite3.Error as e:
+            if nested:
+                raise
+            return [dict(outcome, success=False, error=str(e)) if outcome["success"] else outcome
+                    for outcome in outcomes]
+
+        for outcome in outcomes:
+            if outcome["success"]:
+                email = outcome["email"]
+                # A repeated email later in the same chunk merges into the row inserted earlier
+                outcome["action"] = "updated" if email in existing else "inserted"
+                outcome["candidate_id"] = ids[email]
+                existing.add(email)
+        return outcomes
+
+    @_instrumented("save_sessions")
+    def save_sessions(self, sessions):
+        """Save a batch of in-progress sessions in one transaction
+
+        Each session is a dict with `session_id`, `stage`, `candidate_info`
+        and optionally `conversation_history`. Sessions whose candidate has
+        given an email are also merged into the candidates table, so partial
+        applications show up in listings. The application time is set when
+        the candidate row is inserted and again when the session reaches
+        closing, not at the stages in between (see UPSERT_PARTIAL_CANDIDATE_SQL).
+        Returns the candidate outcomes in session order, as from save_candidates_bulk.
+        """
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        rows = []
+        candidates = []
+        for session in sessions:
+            candidate_info = session["candidate_info"]
+            email = (candidate_info.get('email') or '').strip() or None
+            rows.append((session["session_id"], email, session["stage"], json.dumps(candidate_info), now))
+            if email:
+                candidates.append((session["stage"] == "closing",
+                                   dict(candidate_info, conversation_history=session.get("conversation_history"))))
+        outcomes = [None] * len(candidates)
+        with self.transaction() as cursor:
+            cursor.executemany(UPSERT_SESSION_SQL, rows)
+            for completed in (False, True):
+                picked = [(index, candidate) for index, (done, candidate) in enumerate(candidates)
+                          if done == completed]
+                if not picked:
+                    continue
+                # Joins this transaction, so sessions and candidate rows commit (or roll back) together
+                chunk_outcomes = self._save_chunk([candidate for _, candidate in picked],
+                                                  UPSERT_CANDIDATE_SQL if completed else UPSERT_PARTIAL_CANDIDATE_SQL)
+                for (index, _), outcome in zip(picked, chunk_outcomes):
+                    outcomes[index] = outcome
+        return outcomes
+
+    @_instrumented("get_open_session")
+    def get_open_session(self, email):
+        """Most recent unfinished session for an email, or None"""
+        row = self._connection().execute(SELECT_OPEN_SESSION_SQL, ((email or '').strip(),)).fetchone()
+        if row is None:
+            return None
+        session = dict(row)
+        session['candidate_info'] = json.loads(session['candidate_info'])
+        return session
+
+    @_instrumented("get_candidate_by_email")
+    def get_candidate_by_email(self, email):
+        """Retrieve candidate by email"""
+        result = self._connection().execute(SELECT_BY_EMAIL_SQL, (email,)).fetchone()
 
         if result:
-            # Parse JSON fields
+            # Parse JSON fields; the transcript is only decompressed if the caller reads it
             candidate = dict(result)
             candidate['tech_stack'] = json.loads(candidate['tech_stack'])
-            candidate['conversation_history'] = json.loads(candidate['conversation_history'])
-            return candidate
+            del candidate['conversation_history']
+            candidate_id = candidate['id']
+            return CandidateRecord(candidate, lambda: self.get_conversation_history(candidate_id))
         return None
 
+    @_instrumented("get_conversation_history")
+    def get_conversation_history(self, candidate_id):
+        """Decompress and return a candidate's full transcript"""
+        row = self._connection().execute(SELECT_TRANSCRIPT_SQL, (candidate_id,)).fetchone()
+        if row is None:
+            return []
+        return decode_transcript(row["codec"], row["data"])
+
+    @_instrumented("iter_conversation")
+    def iter_conversation(self, candidate_id, chunk_size=65536):
+        """Yield a candidate's messages one at a time without loading the whole transcript
+
+        The compressed blob is read incrementally with sqlite's blob I/O and
+        decompressed as it streams, so memory use doesn't grow with the
+        transcript length.
+        """
+        row = self._connection().execute(
+            "SELECT codec FROM candidate_transcripts WHERE candidate_id = ?", (candidate_id,)).fetchone()
+        if row is None:
+            return
+
+        def chunks():
+            with self._connection().blobopen("candidate_transcripts", "data", candidate_id, readonly=True) as blob:
+                while True:
+                    chunk = blob.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+
+        yield from iter_transcript(row["codec"], chunks())
+
+    @_instrumented("get_candidates")
+    def get_candidates(self, candidate_ids):
+        """List columns of the given candidates, as a dict keyed by id (missing ids are left out)"""
+        ids = list(dict.fromkeys(candidate_ids))
+        found = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = self._connection().execute(
+                f"SELECT {LIST_COLUMNS}, experience FROM candidates WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk).fetchall()
+            found.update((row["id"], dict(row)) for row in rows)
+        return found
+
+    def iter_candidates(self, since_change=None, applied_after=None, applied_before=None, status=None,
+                        batch_size=1000):
+        """Yield candidates one at a time for export, without loading the table
+
+        Rows are read from a single statement `batch_size` at a time, so
+        memory stays flat and the whole run sees one consistent snapshot.
+        With `since_change` (a change number from changed_candidates), only
+        candidates written since then are returned, in change order; otherwise
+        every candidate in id order. `applied_after` (inclusive),
+        `applied_before` (exclusive) and `status` narrow either kind of run.
+
+        Each candidate is a dict of EXPORT_COLUMNS with tech_stack decoded.
+        """
+        columns = ", ".join(f"c.{column}" for column in EXPORT_COLUMNS)
+        conditions = []
+        params = []
+        if since_change is not None:
+            source = "candidate_changes ch JOIN candidates c ON c.id = ch.candidate_id"
+            conditions.append("ch.seq > ?")
+            params.append(since_change)
+            order = "ch.seq"
+        else:
+            source = "candidates c"
+            order = "c.id"
+        if applied_after is not None:
+            conditions.append("c.application_time >= ?")
+            params.append(applied_after)
+        if applied_before is not None:
+            conditions.append("c.application_time < ?")
+            params.append(applied_before)
+        if status is not None:
+            conditions.append("c.status = ?")
+            params.append(status)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._connection().execute(f"SELECT {columns} FROM {source} {where} ORDER BY {order}", params)
+        while True:
+            batch = rows.fetchmany(batch_size)
+            if not batch:
+                break
+            for row in batch:
+                candidate = dict(row)
+                candidate["tech_stack"] = json.loads(candidate["tech_stack"] or "[]")
+                yield candidate
+
+    @_instrumented("list_recent_candidates")
     def list_recent_candidates(self, limit=50):
         """List recent candidates"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        rows = self._connection().execute(LIST_RECENT_SQL, (limit,)).fetchall()
+        return [dict(row) for row in rows]
 
-        cursor.execute('''
-        SELECT id, name, email, position, application_time, status
-        FROM candidates ORDER BY application_time DESC LIMIT ?
-        ''', (limit,))
+    @_instrumented("list_candidates")
+    def list_candidates(self, limit=50, cursor=None, status=None, position=None):
+        """List candidates newest first, one page at a time
+
+        Uses keyset pagination on (application_time, id): pass the returned
+        `next_cursor` to get the following page. Each page is a bounded index
+        range scan, so page 10,000 costs the same as page 1. Filtering by
+        `status` and/or `position` uses the matching composite index.
+
+        Returns a dict with `candidates` and `next_cursor` (None on the last page).
+        """
+        conditions = []
+        params = []
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if position is not None:
+            conditions.append("position = ?")
+            params.append(position)
+        if cursor is not None:
+            conditions.append("(application_time, id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._connection().execute(
+            f"SELECT {LIST_COLUMNS} FROM candidates {where} "
+            "ORDER BY application_time DESC, id DESC LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+
+        candidates = [dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = candidates[-1]
+            next_cursor = encode_cursor(last["application_time"], last["id"])
+        return {"candidates": candidates, "next_cursor": next_cursor}
+
+    def _skill_filter_sql(self, all_of, any_of):
+        """Compound SELECT of candidate ids matching every `all_of` skill and at least one `any_of` skill"""
+        per_skill = "SELECT candidate_id FROM candidate_skills WHERE skill = ?"
+        parts = []
+        params = []
+        if all_of:
+            parts.append(" INTERSECT ".join([per_skill] * len(all_of)))
+            params.extend(all_of)
+        if any_of:
+            placeholders = ",".join("?" * len(any_of))
+            parts.append(f"SELECT candidate_id FROM candidate_skills WHERE skill IN ({placeholders})")
+            params.extend(any_of)
+        return " INTERSECT ".join(parts), params
+
+    @_instrumented("find_candidates_by_skills")
+    def find_candidates_by_skills(self, all_of=(), any_of=(), limit=50):
+        """Find candidates by skill with AND (`all_of`) and OR (`any_of`) filters
+
+        Skill names are canonicalized the same way as stored stacks, so
+        "Postgres" finds candidates who listed "postgresql". Matching runs as
+        index lookups on candidate_skills rather than scanning tech_stack JSON.
+
+        Returns a dict with the `total` number of matches and the newest
+        `limit` matching `candidates`.
+        """
+        all_of = list(dict.fromkeys(normalize_skill(skill)[0] for skill in all_of))
+        any_of = list(dict.fromkeys(normalize_skill(skill)[0] for skill in any_of))
+        if not all_of and not any_of:
+            raise ValueError("At least one skill filter is required")
+
+        matches, params = self._skill_filter_sql(all_of, any_of)
+        conn = self._connection()
+        total = conn.execute(f"SELECT COUNT(*) FROM ({matches})", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT {LIST_COLUMNS} FROM candidates WHERE id IN ({matches}) "
+            "ORDER BY application_time DESC, id DESC LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        return {"total": total, "candidates": [dict(row) for row in rows]}
+
+    @_instrumented("skill_counts")
+    def skill_counts(self, skills=None, category=None, limit=50):
+        """Number of candidates per skill, most common first
+
+        Optionally restricted to specific `skills` or a taxonomy `category`.
+        """
+        conditions = []
+        params = []
+        if skills:
+            skills = list(dict.fromkeys(normalize_skill(skill)[0] for skill in skills))
+            conditions.append(f"skill IN ({','.join('?' * len(skills))})")
+            params.extend(skills)
+        if category is not None:
+            conditions.append("category = ?")
+            params.append(category)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._connection().execute(
+            f"SELECT skill, category, COUNT(*) AS candidates FROM candidate_skills {where} "
+            "GROUP BY skill ORDER BY candidates DESC, skill LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    @_instrumented("candidate_counts")
+    def candidate_counts(self, dimension, limit=50):
+        """Number of candidates per position, status, week or location
+
+        Read from the trigger-maintained summary table, so the cost depends
+        on `limit`, not on how many candidates there are. Weeks are listed
+        newest first (keyed by their Monday), the rest most common first.
+        """
+        if dimension not in ANALYTICS_DIMENSIONS:
+            raise ValueError(f"Unknown dimension {dimension!r}; expected one of {', '.join(ANALYTICS_DIMENSIONS)}")
+        order = "value DESC" if dimension == "week" else "count DESC, value"
+        rows = self._connection().execute(
+            f"SELECT value, count AS candidates FROM candidate_counts WHERE dimension = ? AND count > 0 "
+            f"ORDER BY {order} LIMIT ?", (dimension, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    @_instrumented("top_skills_by_location")
+    def top_skills_by_location(self, location=None, limit=10, locations=5):
+        """Most common skills within a location, from the summary tables
+
+        With `location` given, returns that location's top `limit` skills.
+        Otherwise returns a dict of the top skills for each of the
+        `locations` locations with the most candidates.
+        """
+        if location is None:
+            return {row["value"]: self.top_skills_by_location(row["value"], limit)
+                    for row in self.candidate_counts("location", locations)}
+        # Normalized in SQL, exactly as the triggers normalize it
+        rows = self._connection().execute(
+            "SELECT skill, count AS candidates FROM skill_location_counts WHERE location = lower(trim(?)) "
+            "AND count > 0 ORDER BY count DESC, skill LIMIT ?", (location, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    @_instrumented("rebuild_analytics")
+    def rebuild_analytics(self):
+        """Recompute the analytics summary tables from scratch in one transaction"""
+        with self.transaction() as cursor:
+            self._rebuild_analytics(cursor)
+
+    @_instrumented("check_analytics")
+    def check_analytics(self):
+        """Compare the summary tables with counts recomputed from the candidate rows
+
+        Returns a list of mismatches as (table, key, stored, actual); empty if
+        the incrementally maintained counts are consistent.
+        """
+        conn = self._connection()
+        actual = {}
+        for dimension, key in ANALYTICS_DIMENSIONS.items():
+            for row in conn.execute(COUNT_CANDIDATES_SQL.format(dimension=dimension, key=key.format(row="c"))):
+                actual[("candidate_counts", (row[0], row[1]))] = row[2]
+        for row in conn.execute(COUNT_SKILL_LOCATIONS_SQL):
+            actual[("skill_location_counts", (row[0], row[1]))] = row[2]
+
+        stored = {("candidate_counts", (row[0], row[1])): row[2]
+                  for row in conn.execute("SELECT dimension, value, count FROM candidate_counts WHERE count != 0")}
+        stored.update({("skill_location_counts", (row[0], row[1])): row[2]
+                       for row in conn.execute("SELECT location, skill, count FROM skill_location_counts WHERE count != 0")})
+        return [(table, key, stored.get((table, key), 0), actual.get((table, key), 0))
+                for table, key in sorted(set(stored) | set(actual))
+                if stored.get((table, key), 0) != actual.get((table, key), 0)]
+
+    @_instrumented("changed_candidates")
+    def changed_candidates(self, since=0):
+        """Candidates written or deleted after change number `since`
+
+        Returns (latest change number, candidate ids). Pass the number back
+        as `since` to get only later changes. Use since=None to get just the
+        current number, e.g. before a full load with iter_match_rows().
+        """
+        conn = self._connection()
+        if since is None:
+            return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM candidate_changes").fetchone()[0], []
+        rows = conn.execute("SELECT candidate_id, seq FROM candidate_changes WHERE seq > ? ORDER BY seq",
+                            (since,)).fetchall()
+        return (rows[-1][1] if rows else since), [row[0] for row in rows]
+
+    def iter_match_rows(self, candidate_ids=None, batch_size=5000):
+        """Yield (id, experience, location, taxonomy skills) per candidate, in id order
+
+        Covers every candidate, or only `candidate_ids`; ids that no longer
+        exist are skipped. Rows are fetched `batch_size` at a time.
+        """
+        conn = self._connection()
+        if candidate_ids is None:
+            queries = [(MATCH_ROWS_SQL.format(where=""), ())]
+        else:
+            ids = sorted(set(candidate_ids))
+            queries = [(MATCH_ROWS_SQL.format(where=f"WHERE c.id IN ({','.join('?' * len(chunk))})"), chunk)
+                       for chunk in (ids[i:i + 500] for i in range(0, len(ids), 500))]
+        for sql, params in queries:
+            rows = conn.execute(sql, params)
+            while True:
+                batch = rows.fetchmany(batch_size)
+                if not batch:
+                    break
+                for candidate_id, experience, location, skills in batch:
+                    yield candidate_id, experience, location, skills.split("\x1f") if skills else []
+
+    @_instrumented("rebuild_search_index")
+    def rebuild_search_index(self, batch_size=5000, full=False, progress=None):
+        """Bring the full-text index up to date in id-ordered batches
+
+        By default only candidates missing from the index are added, which is
+        what an upgraded database needs and is cheap to re-run. `full=True`
+        re-indexes every row. Each batch commits on its own, so an interrupted
+        run keeps its progress and writers are never blocked for long.
+        `progress`, if given, is called with the running count after each batch.
+
+        Returns the number of candidates indexed.
+        """
+        conn = self._connection()
+        # Rowid probes of the index, so a batch only reads the rows it looks at
+        missing = "NOT EXISTS (SELECT 1 FROM candidates_fts f WHERE f.rowid = c.id)"
+        indexed = 0
+        last_id = 0
+        while True:
+            if full:
+                ids = [row[0] for row in conn.execute(
+                    "SELECT id FROM candidates WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size))]
+            else:
+                ids = [row[0] for row in conn.execute(
+                    f"SELECT c.id FROM candidates c WHERE c.id > ? AND {missing} "
+                    "ORDER BY c.id LIMIT ?", (last_id, batch_size))]
+            if not ids:
+                break
+
+            with self.transaction() as cursor:
+                if full:
+                    cursor.execute("DELETE FROM candidates_fts WHERE rowid BETWEEN ? AND ?", (ids[0], ids[-1]))
+                    condition = "c.id BETWEEN ? AND ?"
+                else:
+                    # Only the missing rows; ones already indexed in the range are left alone
+                    condition = f"c.id BETWEEN ? AND ? AND {missing}"
+                cursor.execute(
+                    f"INSERT INTO candidates_fts (rowid, {FTS_COLUMNS}) "
+                    f"SELECT c.id, {FTS_REBUILD_VALUES_SQL} FROM candidates c "
+                    f"WHERE {condition}",
+                    (ids[0], ids[-1])
+                )
+                indexed += cursor.rowcount
+            last_id = ids[-1]
+            if progress:
+                progress(indexed)
+        return indexed
+
+    @staticmethod
+    def _fts_query(text):
+        """Turn free text into an FTS5 query that matches all of its words"""
+        terms = re.findall(r"\w+", text)
+        return " ".join(f'"{term}"' for term in terms)
+
+    @_instrumented("search_candidates")
+    def search_candidates(self, query, limit=20, raw=False):
+        """Ranked full-text search over names, positions, tech stacks and transcripts
 
-        candidates = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        `query` is free text whose words must all appear (with stemming, so
+        "migrated" finds "migration"). Pass `raw=True` to use FTS5 query
+        syntax directly (phrases, OR, NEAR, column filters).
 
-        return candidates
\ No newline at end of file
+        Returns candidates ordered by relevance, each with a `score` (bm25,
+        higher is more relevant) and a highlighted `snippet`.
+        """
+        match = query if raw else self._fts_query(query)
+        if not match:
+            return []
+        rows = self._connection().execute(
+            """
+            SELECT c.id, c.name, c.email, c.position, c.status, c.application_time,
+                   -bm25(candidates_fts, 4.0, 2.0, 3.0, 1.0) AS score,
+                   snippet(candidates_fts, -1, '[', ']', '...', 12) AS snippet
+            FROM candidates_fts
+            JOIN candidates c ON c.id = candidates_fts.rowid
+            WHERE candidates_fts MATCH ?
+            ORDER BY bm25(candidates_fts, 4.0, 2.0, 3.0, 1.0)
+            LIMIT ?
+            """,
+            (match, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
@@ -0,0 +1,188 @@
+"""
+Streaming candidate export for TalentScout
+
+Writes the candidates table to CSV, JSONL or Parquet (Parquet needs the
+optional pyarrow package) for ATS sync. Rows are streamed from
+CandidateDatabase.iter_candidates and written a batch at a time, so memory
+stays flat however many candidates there are.
+
+Exports can be incremental. A watermark file remembers the database change
+number at the start of the last successful export, and the next run with the
+same watermark file writes only candidates inserted or updated since then.
+Delivery is at least once: a candidate changed while an export is running
+may appear in that export and again in the next one. Deleted candidates
+are not reported.
+
+The output and the watermark are written to temporary files and renamed
+into place only once the export has finished, so a failed run leaves the
+previous export and watermark untouched.
+"""
+
+import csv
+import json
+import logging
+import os
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional dependency
+    pyarrow = None
+
+from database import EXPORT_COLUMNS, CandidateDatabase
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+
+EXPORTED_ROWS = REGISTRY.counter(
+    "talentscout_exported_candidates_total", "Candidates written by exports, by format", ("format",))
+
+
+def format_for_path(path: str) -> str:
+    """Export format implied by a file name, defaulting to JSONL."""
+    extension = os.path.splitext(path)[1].lower()
+    return {".csv": "csv", ".parquet": "parquet", ".pq": "parquet"}.get(extension, "jsonl")
+
+
+def read_watermark(path: str) -> Optional[int]:
+    """Change number recorded by the last successful export, or None if there wasn't one."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as handle:
+        return int(json.load(handle)["change"])
+
+
+def _write_watermark(path: str, change: int, rows: int) -> None:
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        json.dump({"change": change, "rows": rows, "exported_at": time.strftime("%Y-%m-%d %H:%M:%S")}, handle)
+    os.replace(temporary, path)
+
+
+class _CsvWriter:
+    def __init__(self, handle):
+        self.writer = csv.DictWriter(handle, fieldnames=EXPORT_COLUMNS)
+        self.writer.writeheader()
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        # Comma-separated, which `manage.py import` reads back
+        self.writer.writerows(dict(row, tech_stack=", ".join(row["tech_stack"])) for row in rows)
+
+    def close(self) -> None:
+        pass
+
+
+class _JsonlWriter:
+    def __init__(self, handle):
+        self.handle = handle
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self.handle.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+
+    def close(self) -> None:
+        pass
+
+
+class _ParquetWriter:
+    def __init__(self, path: str):
+        if pyarrow is None:
+            raise RuntimeError("Parquet export needs the pyarrow package")
+        self.schema = pyarrow.schema(
+            [(column, pyarrow.int64() if column == "id" else
+              pyarrow.list_(pyarrow.string()) if column == "tech_stack" else pyarrow.string())
+             for column in EXPORT_COLUMNS])
+        # Each batch becomes one row group
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        # Stored values aren't always text (e.g. experience saved as a number); the schema is
+        rows = [{column: value if column in ("id", "tech_stack") or value is None else str(value)
+                 for column, value in row.items()} for row in rows]
+        self.writer.write_table(pyarrow.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def _batches(rows: Iterable[Dict[str, Any]], size: int):
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def export_candidates(db: CandidateDatabase, path: str, file_format: str = "auto",
+                      watermark_path: Optional[str] = None, applied_after: Optional[str] = None,
+                      applied_before: Optional[str] = None, status: Optional[str] = None,
+                      batch_size: int = 5000) -> Dict[str, Any]:
+    """
+    Stream candidates to a CSV, JSONL or Parquet file.
+
+    Args:
+        db: Database to export from
+        path: Output file, replaced only when the export succeeds
+        file_format: "csv", "jsonl", "parquet" or "auto" (from the file extension)
+        watermark_path: If given, export only candidates changed since the
+            watermark it holds (everything if the file doesn't exist yet),
+            then advance it
+        applied_after: Only candidates whose application_time is at or after this
+        applied_before: Only candidates whose application_time is before this
+        status: Only candidates with this status
+        batch_size: Rows read and written at a time (and Parquet row group size)
+
+    Returns:
+        Dict[str, Any]: `rows` written, `seconds` taken, the `watermark` now
+            recorded (or None) and whether the run was `incremental`
+
+    Raises:
+        ValueError: If the format is unknown
+        RuntimeError: If Parquet is requested without pyarrow installed
+    """
+    if file_format == "auto":
+        file_format = format_for_path(path)
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {file_format!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+
+    started = time.perf_counter()
+    since = read_watermark(watermark_path) if watermark_path else None
+    # Taken before reading, so a candidate changed during the export is exported again next time
+    watermark, _ = db.changed_candidates(since=None)
+    rows = db.iter_candidates(since_change=since, applied_after=applied_after, applied_before=applied_before,
+                              status=status, batch_size=batch_size)
+
+    temporary = path + ".tmp"
+    written = 0
+    try:
+        if file_format == "parquet":
+            writer, handle = _ParquetWriter(temporary), None
+        else:
+            handle = open(temporary, "w", newline="", encoding="utf-8")
+            writer = _CsvWriter(handle) if file_format == "csv" else _JsonlWriter(handle)
+        try:
+            for batch in _batches(rows, batch_size):
+                writer.write(batch)
+                written += len(batch)
+        finally:
+            writer.close()
+            if handle is not None:
+                handle.close()
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+    if watermark_path:
+        _write_watermark(watermark_path, watermark, written)
+    EXPORTED_ROWS.inc(written, format=file_format)
+    seconds = time.perf_counter() - started
+    logger.info(f"Exported {written} candidates to {path} in {seconds:.1f}s")
+    return {"rows": written, "seconds": seconds, "watermark": watermark if watermark_path else None,
+            "incremental": since is not None}
@@ -0,0 +1,394 @@
+"""
+Gemini API client for TalentScout
+
+This module provides a shared, connection-pooled client for the Gemini
+generateContent and streamGenerateContent endpoints. Calls are retried with
+jittered exponential backoff, and a circuit breaker stops hammering the API
+during an outage while still probing for recovery.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import logging
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import REGISTRY, SIZE_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1"
+GEMINI_MODEL = "gemini-1.5-pro"
+
+# Upstream statuses that are worth retrying; anything else is a caller error
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# A revoked, invalid or over-quota key: every call will fail until it is fixed
+AUTH_STATUS_CODES = {401, 403}
+
+GEMINI_ATTEMPTS = REGISTRY.counter(
+    "gemini_attempts_total", "HTTP attempts to Gemini by response status", ("method", "status"))
+GEMINI_ATTEMPT_SECONDS = REGISTRY.histogram(
+    "gemini_attempt_seconds", "Time from sending a Gemini request to its response headers", ("method",))
+GEMINI_CALL_SECONDS = REGISTRY.histogram(
+    "gemini_call_seconds", "Gemini call time including retries and reading the body", ("method", "outcome"))
+GEMINI_PROMPT_CHARS = REGISTRY.histogram(
+    "gemini_prompt_chars", "Prompt size of Gemini calls", ("method",), buckets=SIZE_BUCKETS)
+GEMINI_RESPONSE_CHARS = REGISTRY.histogram(
+    "gemini_response_chars", "Response text size of successful Gemini calls", ("method",), buckets=SIZE_BUCKETS)
+
+
+def _call_outcome(error: Optional[Exception]) -> str:
+    if error is None:
+        return "ok"
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    return "error"
+
+
+class GeminiError(Exception):
+    """Raised when a Gemini call fails after all retries."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(GeminiError):
+    """Raised when the circuit breaker rejects a call without sending it."""
+
+
+def extract_text(response_data: Dict[str, Any], allow_empty: bool = False) -> str:
+    """
+    Pull the first candidate's text out of a Gemini response body.
+
+    Args:
+        response_data: Parsed response, or one chunk of a stream
+        allow_empty: Return "" for a candidate without text that is still
+            going or stopped normally, as stream chunks may
+
+    Raises:
+        GeminiError: If the response has no candidates (e.g. the prompt was
+            blocked) or the candidate has no text (e.g. finishReason SAFETY,
+            RECITATION or MAX_TOKENS)
+    """
+    candidates = response_data.get("candidates") or []
+    if not candidates:
+        reason = (response_data.get("promptFeedback") or {}).get("blockReason")
+        raise GeminiError("Gemini returned no candidates" + (f" (prompt blocked: {reason})" if reason else ""))
+    candidate = candidates[0]
+    parts = (candidate.get("content") or {}).get("parts") or [{}]
+    text = parts[0].get("text") or ""
+    finish_reason = candidate.get("finishReason")
+    if text or (allow_empty and finish_reason in (None, "STOP")):
+        return text
+    raise GeminiError(f"Gemini returned no text (finishReason: {finish_reason or 'unknown'})")
+
+
+class CircuitBreaker:
+    """
+    Half-open circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    are rejected. Once `reset_timeout` seconds have passed a single probe call
+    is let through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state, reporting an expired open circuit as half-open."""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def is_available(self) -> bool:
+        """Check, without side effects, whether a call would be allowed right now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                return time.monotonic() - self._opened_at >= self.reset_timeout
+            return not self._probe_in_flight
+
+    def allow_request(self) -> bool:
+        """Decide whether a call may proceed, reserving the probe slot when half-open."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Gemini circuit closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Give back the half-open probe slot of a call that ended without telling us anything."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the circuit when the threshold is hit."""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Gemini circuit opened after {self._failures} consecutive failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class GeminiClient:
+    """
+    Pooled Gemini API client.
+
+    A single `requests.Session` keeps TCP/TLS connections alive across calls,
+    so only the first request of a process pays the handshake.
+    """
+
+    def __init__(self, api_key: str, model: str = GEMINI_MODEL, base_url: str = GEMINI_BASE_URL,
+                 timeout: float = 30, max_retries: int = 2, backoff_base: float = 0.5,
+                 backoff_cap: float = 4.0, pool_size: int = 10,
+                 breaker: Optional[CircuitBreaker] = None, limiter: Optional[ContextManager] = None):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.breaker = breaker or CircuitBreaker()
+        # Optional semaphore-like context manager bounding requests in flight,
+        # e.g. shared across worker processes in batch screening
+        self.limiter = limiter or nullcontext()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @property
+    def available(self) -> bool:
+        """Whether the circuit breaker would currently let a call through."""
+        return self.breaker.is_available()
+
+    def _url(self, method: str) -> str:
+        # alt=sse makes the streaming endpoint emit one JSON chunk per event
+        suffix = "&alt=sse" if method == "streamGenerateContent" else ""
+        return f"{self.base_url}/models/{self.model}:{method}?key={self.api_key}{suffix}"
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for the given retry attempt."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def _post_with_retries(self, method: str, prompt: str, timeout: Optional[float],
+                           stream: bool = False) -> requests.Response:
+        """
+        POST a prompt to a model method, retrying transient failures.
+
+        Returns the first 200 response. The caller must report the outcome to
+        the breaker once it has consumed the body.
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("Gemini circuit is open")
+
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self._backoff(attempt - 1))
+            try:
+                with self.limiter:
+                    started = time.perf_counter()
+                    response = self.session.post(self._url(method), json=payload,
+                                                 timeout=timeout or self.timeout, stream=stream)
+                GEMINI_ATTEMPT_SECONDS.observe(time.perf_counter() - started, method=method)
+                GEMINI_ATTEMPTS.inc(method=method, status=response.status_code)
+            except requests.RequestException as e:
+                GEMINI_ATTEMPTS.inc(method=method, status=type(e).__name__)
+                last_error = GeminiError(f"Gemini request failed: {e}")
+                logger.warning(f"Gemini request attempt {attempt + 1} failed: {e}")
+                continue
+
+            if response.status_code == 200:
+                return response
+
+            last_error = GeminiError(f"Gemini API error: {response.status_code} - {response.text}",
+                                     status_code=response.status_code)
+            response.close()
+            if response.status_code in AUTH_STATUS_CODES:
+                # Retrying won't help, and neither will calling again: let the breaker open
+                self.breaker.record_failure()
+                raise last_error
+            if response.status_code == 400:
+                # Usually the request, though Gemini also reports an invalid key this way;
+                # say nothing about upstream health, but free a half-open probe
+                self.breaker.release()
+                raise last_error
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                # The request itself is bad; upstream is healthy, so don't trip the breaker
+                self.breaker.record_success()
+                raise last_error
+            logger.warning(f"Gemini request attempt {attempt + 1} returned {response.status_code}")
+
+        self.breaker.record_failure()
+        raise last_error
+
+    def generate_content(self, prompt: str, timeout: Optional[float] = None) -> str:
+        """
+        Send a single-turn prompt to Gemini and return the response text.
+
+        Args:
+            prompt: The prompt text
+            timeout: Per-attempt timeout in seconds, defaults to the client timeout
+
+        Returns:
+            str: Text of the first candidate in the response
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            GeminiError: If the call still fails after all retries
+        """
+        started = time.perf_counter()
+        GEMINI_PROMPT_CHARS.observe(len(prompt), method="generateContent")
+        error = None
+        try:
+            response = self._post_with_retries("generateContent", prompt, timeout)
+            try:
+                text = extract_text(response.json())
+            except ValueError as e:
+                self.breaker.record_failure()
+                raise GeminiError(f"Gemini returned an unreadable response: {e}")
+            except GeminiError:
+                # Answered without text (e.g. a blocked prompt); upstream is healthy
+                self.breaker.record_success()
+                raise
+            self.breaker.record_success()
+            GEMINI_RESPONSE_CHARS.observe(len(text), method="generateContent")
+            return text
+        except GeminiError as e:
+            error = e
+            raise
+        finally:
+            GEMINI_CALL_SECONDS.observe(time.perf_counter() - started, method="generateContent",
+                                        outcome=_call_outcome(error))
+
+    def stream_generate_content(self, prompt: str, timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        Stream a single-turn prompt through streamGenerateContent.
+
+        Retries only happen before the first chunk arrives; once text has been
+        yielded a broken stream raises GeminiError to the caller.
+
+        Args:
+            prompt: The prompt text
+            timeout: Per-attempt connect/read timeout in seconds
+
+        Yields:
+            str: Text fragments in the order Gemini produces them
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            GeminiError: If the call fails before or during streaming
+        """
+        started = time.perf_counter()
+        GEMINI_PROMPT_CHARS.observe(len(prompt), method="streamGenerateContent")
+        try:
+            response = self._post_with_retries("streamGenerateContent", prompt, timeout, stream=True)
+        except GeminiError as e:
+            GEMINI_CALL_SECONDS.observe(time.perf_counter() - started, method="streamGenerateContent",
+                                        outcome=_call_outcome(e))
+            raise
+        response.encoding = "utf-8"
+        finished = False
+        error = None
+        received = 0
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                # Server-sent events: payload lines look like "data: {...}"
+                if not line or not line.startswith("data:"):
+                    continue
+                text = extract_text(json.loads(line[5:]), allow_empty=True)
+                if text:
+                    received += len(text)
+                    yield text
+            if not received:
+                raise GeminiError("Gemini stream ended without text")
+            finished = True
+        except (requests.RequestException, ValueError) as e:
+            self.breaker.record_failure()
+            error = GeminiError(f"Gemini stream interrupted: {e}")
+            raise error
+        except GeminiError as e:
+            # Answered without text (e.g. a blocked prompt); upstream is healthy
+            self.breaker.record_success()
+            error = e
+            raise
+        finally:
+            response.close()
+            if finished:
+                self.breaker.record_success()
+                GEMINI_RESPONSE_CHARS.observe(received, method="streamGenerateContent")
+            elif error is None:
+                # Closed early by the consumer, or broken by something other than
+                # Gemini: no verdict on upstream, but don't hold a half-open probe
+                self.breaker.release()
+            GEMINI_CALL_SECONDS.observe(time.perf_counter() - started, method="streamGenerateContent",
+                                        outcome="abandoned" if not finished and error is None
+                                        else _call_outcome(error))
+
+
+_shared_clients: Dict[Tuple[str, str, str], GeminiClient] = {}
+_shared_lock = threading.Lock()
+
+
+def get_client(api_key: str) -> GeminiClient:
+    """
+    Return the process-wide client for an API key, creating it on first use.
+
+    The endpoint and model come from the GEMINI_BASE_URL and GEMINI_MODEL
+    environment variables when set, e.g. to point the bot at the local
+    stand-in server (gemini_standin.py) for load tests.
+    """
+    base_url = os.getenv("GEMINI_BASE_URL") or GEMINI_BASE_URL
+    model = os.getenv("GEMINI_MODEL") or GEMINI_MODEL
+    with _shared_lock:
+        key = (api_key, base_url, model)
+        client = _shared_clients.get(key)
+        if client is None:
+            client = GeminiClient(api_key, model=model, base_url=base_url)
+            _shared_clients[key] = client
+        return client
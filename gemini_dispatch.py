@@ -0,0 +1,363 @@
+"""
+Process-wide Gemini request dispatcher for TalentScout
+
+Every bot session in a process sends its Gemini calls through one
+GeminiDispatcher, which:
+
+- coalesces identical in-flight prompts (single-flight), so a spike of
+  candidates with the same stack costs one upstream call, streamed or not
+- paces calls with a token bucket sized to the API quota, so spikes queue
+  briefly instead of tripping 429s and the circuit breaker
+- dispatches from a priority queue, so interactive turns overtake background
+  work such as batch screening or speculative generation
+
+Quota settings come from GEMINI_REQUESTS_PER_MINUTE, GEMINI_BURST and
+GEMINI_MAX_CONCURRENT when set.
+"""
+
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from gemini_client import GeminiClient, GeminiError, get_client
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Lower values are dispatched first
+INTERACTIVE = 0
+BACKGROUND = 10
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+DISPATCH_QUEUE_SECONDS = REGISTRY.histogram(
+    "gemini_dispatch_queue_seconds", "Time Gemini calls wait in the dispatcher queue", ("priority",))
+DISPATCH_COALESCED = REGISTRY.counter(
+    "gemini_dispatch_coalesced_total", "Calls served by joining an identical in-flight call", ("method",))
+DISPATCH_EXPIRED = REGISTRY.counter(
+    "gemini_dispatch_expired_total", "Calls dropped after waiting longer than max_queue_wait", ("priority",))
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Holds up to `capacity` tokens and refills at `rate` tokens per second.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available, without waiting."""
+        with self.lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        """Take a token, sleeping until one is available."""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def refund(self) -> None:
+        """Return a token taken for a call that was not made."""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after upstream reported the quota exhausted."""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0)
+
+
+class _SharedStream:
+    """Chunks of one streamed response, replayed to every subscriber from the start."""
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._done = False
+        self._error: Optional[GeminiError] = None
+        self._condition = threading.Condition()
+
+    def append(self, chunk: str) -> None:
+        with self._condition:
+            self._chunks.append(chunk)
+            self._condition.notify_all()
+
+    def finish(self, error: Optional[GeminiError] = None) -> None:
+        with self._condition:
+            self._done = True
+            self._error = error
+            self._condition.notify_all()
+
+    def __iter__(self) -> Iterator[str]:
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self._chunks) and not self._done:
+                    self._condition.wait()
+                if index < len(self._chunks):
+                    chunk = self._chunks[index]
+                elif self._error is not None:
+                    raise GeminiError(str(self._error), status_code=self._error.status_code)
+                else:
+                    return
+            index += 1
+            yield chunk
+
+
+class _Job:
+    __slots__ = ("key", "method", "prompt", "timeout", "priority", "enqueued", "deadline", "started",
+                 "dispatched", "future", "stream")
+
+    def __init__(self, key: Tuple[str, str], prompt: str, timeout: Optional[float], priority: int,
+                 max_queue_wait: float):
+        self.key = key
+        self.method = key[0]
+        self.prompt = prompt
+        self.timeout = timeout
+        self.priority = priority
+        self.enqueued = time.monotonic()
+        self.deadline = self.enqueued + max_queue_wait
+        # Set (under the dispatcher lock) once the job is sent upstream or expired
+        self.started = False
+        # Signalled once the outcome of queuing is known: the call was sent upstream, or failed
+        self.dispatched = threading.Event()
+        self.future: Future = Future()
+        self.stream = _SharedStream() if self.method == "streamGenerateContent" else None
+
+    def fail(self, error: GeminiError) -> None:
+        if self.stream is not None:
+            self.stream.finish(error)
+        self.future.set_exception(error)
+        self.dispatched.set()
+
+
+class GeminiDispatcher:
+    """
+    Coalescing, rate-limited, prioritized front end to a GeminiClient.
+
+    Exposes the same calls as GeminiClient (plus a `priority` argument), so a
+    bot can use either.
+
+    Args:
+        client: Client that performs the HTTP calls
+        requests_per_minute: Sustained call rate allowed upstream
+        burst: Calls that may be sent back to back after an idle period
+        max_concurrent: Calls in flight at once
+        max_queue_wait: Seconds a call may wait for dispatch before failing,
+            so callers fall back instead of hanging during a long backlog.
+            Expired calls are dropped without using a slot or a rate token
+    """
+
+    def __init__(self, client: GeminiClient, requests_per_minute: float = 60, burst: int = 10,
+                 max_concurrent: int = 8, max_queue_wait: float = 30.0):
+        self.client = client
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self.max_concurrent = max_concurrent
+        self.max_queue_wait = max_queue_wait
+
+        self._queue: "queue.PriorityQueue[Tuple[int, int, _Job]]" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._inflight: Dict[Tuple[str, str], _Job] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="gemini-call")
+        self._dispatcher: Optional[threading.Thread] = None
+
+    @property
+    def available(self) -> bool:
+        """Whether the underlying client's circuit breaker would let a call through."""
+        return self.client.available
+
+    def _submit(self, method: str, prompt: str, timeout: Optional[float], priority: int) -> _Job:
+        """Join an identical in-flight call or queue a new one."""
+        key = (method, prompt)
+        with self._lock:
+            job = self._inflight.get(key)
+            if job is not None:
+                DISPATCH_COALESCED.inc(method=method)
+                if priority < job.priority and not job.started:
+                    # An interactive caller joined queued background work: queue it again at the
+                    # higher priority; the dispatcher skips whichever entry comes out second
+                    job.priority = priority
+                    self._queue.put((priority, next(self._sequence), job))
+                return job
+
+            job = _Job(key, prompt, timeout, priority, self.max_queue_wait)
+            self._inflight[key] = job
+            self._queue.put((priority, next(self._sequence), job))
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, name="gemini-dispatcher",
+                                                    daemon=True)
+                self._dispatcher.start()
+        return job
+
+    def _expire(self, job: _Job) -> bool:
+        """Fail a job that is still queued past its deadline; False if it was already started."""
+        with self._lock:
+            if job.started:
+                return False
+            job.started = True
+            if self._inflight.get(job.key) is job:
+                del self._inflight[job.key]
+        waited = time.monotonic() - job.enqueued
+        DISPATCH_EXPIRED.inc(priority=PRIORITY_NAMES.get(job.priority, str(job.priority)))
+        job.fail(GeminiError(f"Gemini call waited {waited:.1f}s in the dispatch queue"))
+        return True
+
+    def _next_job(self, block: bool = True) -> Optional[_Job]:
+        """The most urgent live job, dropping stale and expired entries on the way; None if empty and not blocking."""
+        while True:
+            try:
+                _, _, job = self._queue.get(block=block)
+            except queue.Empty:
+                return None
+            if job.started:
+                continue
+            if time.monotonic() > job.deadline:
+                self._expire(job)
+                continue
+            return job
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            job = self._next_job()
+            self._slots.acquire()
+            self.bucket.acquire()
+            # Capacity was just freed; hand it to the most urgent job queued right now, which may
+            # have arrived while we waited for the slot and token. Jobs that expired meanwhile are
+            # dropped here, and the slot and token are given back if none is left.
+            self._queue.put((job.priority, next(self._sequence), job))
+            job = self._next_job(block=False)
+            if job is not None:
+                with self._lock:
+                    # A caller may have expired it between selection and now
+                    claimed = not job.started
+                    job.started = True
+            if job is None or not claimed:
+                self.bucket.refund()
+                self._slots.release()
+                continue
+
+            DISPATCH_QUEUE_SECONDS.observe(time.monotonic() - job.enqueued,
+                                           priority=PRIORITY_NAMES.get(job.priority, str(job.priority)))
+            job.dispatched.set()
+            try:
+                self._executor.submit(self._run, job)
+            except RuntimeError:
+                # The interpreter is exiting; fail the call rather than leave its caller waiting forever
+                with self._lock:
+                    if self._inflight.get(job.key) is job:
+                        del self._inflight[job.key]
+                self._slots.release()
+                job.fail(GeminiError("Gemini dispatcher is shutting down"))
+
+    def _await_dispatch(self, job: _Job) -> None:
+        """Wait until the job is sent upstream, failing it if it is still queued at its deadline."""
+        if not job.dispatched.wait(max(0.0, job.deadline - time.monotonic())):
+            # The call may start in the meantime, in which case it is left to finish
+            self._expire(job)
+
+    def _run(self, job: _Job) -> None:
+        try:
+            if job.stream is not None:
+                for chunk in self.client.stream_generate_content(job.prompt, timeout=job.timeout):
+                    job.stream.append(chunk)
+                job.stream.finish()
+                job.future.set_result(None)
+            else:
+                job.future.set_result(self.client.generate_content(job.prompt, timeout=job.timeout))
+        except GeminiError as e:
+            if e.status_code == 429:
+                # The quota is smaller than configured or shared with another process; back off
+                self.bucket.drain()
+            job.fail(e)
+        except Exception as e:
+            logger.exception("Unexpected error in Gemini dispatcher")
+            job.fail(GeminiError(f"Gemini call failed: {e}"))
+        finally:
+            with self._lock:
+                if self._inflight.get(job.key) is job:
+                    del self._inflight[job.key]
+            self._slots.release()
+
+    def generate_content(self, prompt: str, timeout: Optional[float] = None,
+                         priority: int = INTERACTIVE) -> str:
+        """
+        Queue a generateContent call and wait for its text.
+
+        Args:
+            prompt: The prompt text
+            timeout: Per-attempt HTTP timeout in seconds, defaults to the client timeout
+            priority: INTERACTIVE or BACKGROUND (lower values go first)
+
+        Returns:
+            str: Response text, shared with any identical concurrent call
+
+        Raises:
+            GeminiError: If the call fails or waits longer than max_queue_wait
+        """
+        job = self._submit("generateContent", prompt, timeout, priority)
+        self._await_dispatch(job)
+        return job.future.result()
+
+    def stream_generate_content(self, prompt: str, timeout: Optional[float] = None,
+                                priority: int = INTERACTIVE) -> Iterator[str]:
+        """
+        Queue a streamGenerateContent call and yield its fragments as they arrive.
+
+        A caller joining an identical stream already in progress first receives
+        the fragments produced so far, then follows along live.
+
+        Raises:
+            GeminiError: If the call fails or waits longer than max_queue_wait
+        """
+        job = self._submit("streamGenerateContent", prompt, timeout, priority)
+        self._await_dispatch(job)
+        yield from job.stream
+
+
+_shared_dispatchers: Dict[int, GeminiDispatcher] = {}
+_shared_lock = threading.Lock()
+
+
+def get_dispatcher(api_key: str) -> GeminiDispatcher:
+    """Return the process-wide dispatcher for the shared client of an API key."""
+    client = get_client(api_key)
+    with _shared_lock:
+        dispatcher = _shared_dispatchers.get(id(client))
+        if dispatcher is None:
+            dispatcher = GeminiDispatcher(
+                client,
+                requests_per_minute=float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60")),
+                burst=int(os.getenv("GEMINI_BURST", "10")),
+                max_concurrent=int(os.getenv("GEMINI_MAX_CONCURRENT", "8"))
+            )
+            _shared_dispatchers[id(client)] = dispatcher
+        return dispatcher
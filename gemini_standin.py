@@ -0,0 +1,357 @@
+"""
+Local Gemini stand-in server for TalentScout
+
+Implements the generateContent and streamGenerateContent (alt=sse) endpoints
+closely enough for the bot, so load tests and benchmarks can run offline with
+realistic upstream behaviour:
+
+- replays recorded responses by prompt, or answers with canned text
+- records real responses when proxying to an upstream API
+- injects latency from a configurable distribution, plus optional generation
+  time proportional to the response length
+- fails a configurable share of requests with 429 or 500
+- caps throughput, answering 429 once the request rate is exceeded
+
+Point the bot at it with:
+
+    python gemini_standin.py --port 8089 --latency lognormal:800,0.5 --error-429 0.05
+    GEMINI_BASE_URL=http://127.0.0.1:8089/v1 GEMINI_API_KEY=local streamlit run app.py
+
+Latency specs are in milliseconds: fixed:MS, uniform:LOW,HIGH, normal:MEAN,STDDEV
+or lognormal:MEDIAN,SIGMA.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from gemini_dispatch import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+ROUTE = re.compile(r"^/v1(?:beta)?/models/(?P<model>[^/:]+):(?P<method>generateContent|streamGenerateContent)$")
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Turn a latency spec like "lognormal:800,0.5" into a sampler returning seconds."""
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(",") if value]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "normal" and len(values) == 2:
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1])) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1]) / 1000
+    raise ValueError(f"Invalid latency spec: {spec!r}")
+
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode()).hexdigest()
+
+
+CANNED_QUESTION_TEMPLATES = (
+    "Describe a production issue you debugged in {tech}. How did you find the root cause?",
+    "How would you structure a large {tech} codebase so that several teams can work on it independently?",
+    "What are the most common performance pitfalls in {tech}, and how do you detect them?",
+    "Explain a trade-off you made when choosing {tech} over an alternative. Would you make it again?",
+    "How do you test code that depends heavily on {tech}? What do you mock and what do you not?",
+    "Walk through how you would migrate an existing system to a newer major version of {tech}.",
+    "What security concerns are specific to {tech}, and how do you address them?",
+    "How does {tech} behave under concurrent load, and what limits have you run into?",
+    "Which {tech} feature do you think is most misunderstood, and why?",
+    "How would you explain the internals of {tech} to a junior engineer debugging a subtle bug?",
+)
+
+
+def canned_response(prompt: str) -> str:
+    """Plausible offline answer for the bot's prompt shapes."""
+    if prompt.startswith("Extract technology keywords"):
+        return '["Python", "Django", "PostgreSQL", "AWS"]'
+    bank_request = re.match(r"Generate (\d+) distinct (\w+) technical interview questions about: ([^\n]+)", prompt)
+    if bank_request:
+        count, tech = int(bank_request.group(1)), bank_request.group(3).strip()
+        offset = random.randrange(len(CANNED_QUESTION_TEMPLATES))
+        questions = [
+            f"{n}. " + CANNED_QUESTION_TEMPLATES[(offset + n) % len(CANNED_QUESTION_TEMPLATES)].format(tech=tech)
+            for n in range(1, count + 1)
+        ]
+        return "\n".join(questions)
+    if "technical interview questions" in prompt:
+        match = re.search(r"experience in: ([^\n]+)", prompt)
+        techs = [tech.strip() for tech in (match.group(1) if match else "your stack").split(",")][:5]
+        questions = [
+            f"{n}. Describe a production issue you debugged in {tech}. How did you find the root cause, "
+            f"and what did you change to prevent it from recurring?"
+            for n, tech in enumerate(techs, 1)
+        ]
+        return "\n".join(questions)
+    return "Thanks for sharing that. Let's continue with the screening process."
+
+
+class StandInConfig:
+    """Behaviour knobs for the stand-in server."""
+
+    def __init__(self, latency: str = "fixed:0", error_429: float = 0.0, error_500: float = 0.0,
+                 max_rps: Optional[float] = None, stream_chunk_words: int = 8,
+                 stream_chunk_delay: float = 0.03, recordings: Optional[str] = None,
+                 record_upstream: Optional[str] = None, upstream_key: Optional[str] = None,
+                 seed: Optional[int] = None, ms_per_word: float = 0.0):
+        self.latency = parse_latency(latency)
+        # Models generation time: longer answers take longer, as with the real API
+        self.ms_per_word = ms_per_word
+        self.error_429 = error_429
+        self.error_500 = error_500
+        self.bucket = TokenBucket(max_rps) if max_rps else None
+        self.stream_chunk_words = stream_chunk_words
+        self.stream_chunk_delay = stream_chunk_delay
+        self.recordings_path = recordings
+        self.record_upstream = record_upstream.rstrip("/") if record_upstream else None
+        self.upstream_key = upstream_key
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+
+        self.recordings: Dict[str, str] = {}
+        self.recordings_lock = threading.Lock()
+        if recordings:
+            self._load_recordings(recordings)
+
+        self.stats = {"requests": 0, "ok": 0, "replayed": 0, "recorded": 0, "canned": 0,
+                      "injected_429": 0, "injected_500": 0, "throttled": 0}
+        self.stats_lock = threading.Lock()
+
+    def _load_recordings(self, path: str) -> None:
+        try:
+            with open(path, encoding="utf-8") as handle:
+                for line in handle:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.recordings[entry["key"]] = entry["response"]
+        except FileNotFoundError:
+            pass
+        logger.info(f"Loaded {len(self.recordings)} recorded responses")
+
+    def count(self, name: str) -> None:
+        with self.stats_lock:
+            self.stats[name] += 1
+
+    def sample(self, func):
+        with self.rng_lock:
+            return func(self.rng)
+
+    def response_for(self, model: str, prompt: str) -> str:
+        """Recorded response if there is one, else a live upstream call (record mode) or canned text."""
+        key = prompt_key(prompt)
+        with self.recordings_lock:
+            recorded = self.recordings.get(key)
+        if recorded is not None:
+            self.count("replayed")
+            return recorded
+
+        if not self.record_upstream:
+            self.count("canned")
+            return canned_response(prompt)
+
+        response = requests.post(
+            f"{self.record_upstream}/models/{model}:generateContent?key={self.upstream_key}",
+            json={"contents": [{"parts": [{"text": prompt}]}]},
+            timeout=60
+        )
+        response.raise_for_status()
+        text = response.json()["candidates"][0]["content"]["parts"][0]["text"]
+        with self.recordings_lock:
+            self.recordings[key] = text
+            if self.recordings_path:
+                with open(self.recordings_path, "a", encoding="utf-8") as handle:
+                    handle.write(json.dumps({"key": key, "prompt": prompt[:200], "response": text}) + "\n")
+        self.count("recorded")
+        return text
+
+
+def _chunk_body(text: str) -> bytes:
+    return json.dumps({"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}).encode()
+
+
+def make_handler(config: StandInConfig):
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+        def _send_json(self, status: int, body: dict) -> None:
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _error(self, status: int, message: str) -> None:
+            status_name = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL"}.get(status, "INVALID_ARGUMENT")
+            self._send_json(status, {"error": {"code": status, "message": message, "status": status_name}})
+
+        def do_GET(self):
+            if urlparse(self.path).path == "/stats":
+                with config.stats_lock:
+                    self._send_json(200, dict(config.stats))
+            else:
+                self._error(404, "Not found")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length)
+            route = ROUTE.match(urlparse(self.path).path)
+            if not route:
+                self._error(404, "Unknown method")
+                return
+            config.count("requests")
+
+            try:
+                prompt = "".join(part.get("text", "") for part in json.loads(body)["contents"][0]["parts"])
+            except (ValueError, KeyError, IndexError):
+                self._error(400, "Malformed request body")
+                return
+
+            if config.bucket and not config.bucket.try_acquire():
+                config.count("throttled")
+                self._error(429, "Quota exceeded for requests per second")
+                return
+
+            time.sleep(config.sample(config.latency))
+            roll = config.sample(lambda rng: rng.random())
+            if roll < config.error_429:
+                config.count("injected_429")
+                self._error(429, "Resource has been exhausted (injected)")
+                return
+            if roll < config.error_429 + config.error_500:
+                config.count("injected_500")
+                self._error(500, "Internal error (injected)")
+                return
+
+            try:
+                text = config.response_for(route.group("model"), prompt)
+            except requests.RequestException as e:
+                self._error(500, f"Upstream recording failed: {e}")
+                return
+
+            config.count("ok")
+            if route.group("method") == "generateContent":
+                if config.ms_per_word:
+                    time.sleep(len(text.split()) * config.ms_per_word / 1000)
+                self._send_json(200, json.loads(_chunk_body(text)))
+            else:
+                self._stream(text)
+
+        def _stream(self, text: str) -> None:
+            # Server-sent events with chunked transfer, like the real alt=sse endpoint
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            words = re.split(r"(?<=\s)", text)
+            size = config.stream_chunk_words
+            for start in range(0, len(words), size):
+                if start:
+                    time.sleep(config.stream_chunk_delay)
+                event = b"data: " + _chunk_body("".join(words[start:start + size])) + b"\r\n\r\n"
+                self.wfile.write(f"{len(event):X}\r\n".encode() + event + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+
+    return StandInHandler
+
+
+class _StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that hang up early (timeouts, deadlines) are expected, not errors
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class StandInServer:
+    """
+    Stand-in server that can run in a background thread, for benchmarks and load tests.
+
+    Example:
+        server = StandInServer(StandInConfig(latency="lognormal:500,0.6", error_429=0.05)).start()
+        os.environ["GEMINI_BASE_URL"] = server.base_url
+        ...
+        server.stop()
+    """
+
+    def __init__(self, config: StandInConfig, host: str = "127.0.0.1", port: int = 0):
+        self.config = config
+        self.httpd = _StandInHTTPServer((host, port), make_handler(config))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="fixed:0", help="Latency distribution in ms (see above)")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Share of requests failed with 429")
+    parser.add_argument("--error-500", type=float, default=0.0, help="Share of requests failed with 500")
+    parser.add_argument("--max-rps", type=float, help="Throughput cap; excess requests get 429")
+    parser.add_argument("--stream-chunk-words", type=int, default=8)
+    parser.add_argument("--stream-chunk-delay", type=float, default=0.03, help="Seconds between stream chunks")
+    parser.add_argument("--recordings", help="JSONL file of recorded responses to replay (and append to)")
+    parser.add_argument("--record-upstream", help="Proxy unrecorded prompts to this base URL and record them")
+    parser.add_argument("--upstream-key", help="API key for --record-upstream")
+    parser.add_argument("--seed", type=int, help="Seed for latency and error sampling")
+    parser.add_argument("--ms-per-word", type=float, default=0.0,
+                        help="Extra generateContent latency per response word, in ms")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    config = StandInConfig(
+        latency=args.latency, error_429=args.error_429, error_500=args.error_500, max_rps=args.max_rps,
+        stream_chunk_words=args.stream_chunk_words, stream_chunk_delay=args.stream_chunk_delay,
+        recordings=args.recordings, record_upstream=args.record_upstream, upstream_key=args.upstream_key,
+        seed=args.seed, ms_per_word=args.ms_per_word
+    )
+    server = StandInServer(config, args.host, args.port)
+    logger.info(f"Gemini stand-in listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
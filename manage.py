@@ -0,0 +1,288 @@
+"""
+Command-line maintenance tasks for the TalentScout candidate database.
+
+Usage:
+    python manage.py migrate
+    python manage.py import candidates.jsonl
+    python manage.py search-index
+    python manage.py screen transcripts.jsonl --workers 8
+    python manage.py build-question-bank --per-technology 20 --technologies Python,React
+    python manage.py analytics --check
+    python manage.py match --required python,django --nice docker --min-experience 3 --location Berlin
+    python manage.py export ats/candidates.jsonl --watermark ats/export.watermark
+    python manage.py --db candidates.db import backfill.csv --chunk-size 2000
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+
+from database import ANALYTICS_DIMENSIONS, CandidateDatabase
+
+logger = logging.getLogger(__name__)
+
+CANDIDATE_FIELDS = ("name", "email", "phone", "experience", "position", "location")
+
+
+def _parse_tech_stack(value):
+    """Accept a JSON array or a comma/semicolon separated string"""
+    if isinstance(value, list):
+        return value
+    value = (value or "").strip()
+    if value.startswith("["):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return [item.strip() for item in value.replace(";", ",").split(",") if item.strip()]
+
+
+def read_candidates(path, file_format="auto"):
+    """Stream candidate dicts from a JSONL or CSV file without loading it whole"""
+    if file_format == "auto":
+        file_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+
+    with open(path, newline="", encoding="utf-8") as handle:
+        if file_format == "csv":
+            records = csv.DictReader(handle)
+        else:
+            records = (json.loads(line) for line in handle if line.strip())
+
+        for record in records:
+            candidate = {field: record.get(field) or "" for field in CANDIDATE_FIELDS}
+            candidate["tech_stack"] = _parse_tech_stack(record.get("tech_stack"))
+            if record.get("application_time"):
+                candidate["application_time"] = record["application_time"]
+            history = record.get("conversation_history")
+            if isinstance(history, str) and history:
+                history = json.loads(history)
+            if history:
+                candidate["conversation_history"] = history
+            yield candidate
+
+
+def cmd_import(args):
+    db = CandidateDatabase(args.db)
+    counts = {"inserted": 0, "updated": 0, "failed": 0}
+    started = time.perf_counter()
+
+    for n, outcome in enumerate(db.save_candidates_bulk(read_candidates(args.path, args.format),
+                                                        chunk_size=args.chunk_size), 1):
+        if outcome["success"]:
+            counts[outcome["action"]] += 1
+        else:
+            counts["failed"] += 1
+            logger.warning(f"Row {n} ({outcome['email']}): {outcome['error']}")
+        if n % args.chunk_size == 0:
+            logger.info(f"{n} rows processed")
+
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(f"Imported {total} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/s): "
+          f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['failed']} failed")
+    db.close()
+    return 1 if counts["failed"] else 0
+
+
+def cmd_migrate(args):
+    db = CandidateDatabase(args.db)
+    print(f"{args.db} is at schema version {db.schema_version} of {len(db.MIGRATIONS)}")
+    db.close()
+    return 0
+
+
+def cmd_search_index(args):
+    db = CandidateDatabase(args.db)
+    started = time.perf_counter()
+    indexed = db.rebuild_search_index(batch_size=args.batch_size, full=args.full,
+                                      progress=lambda n: logger.info(f"{n} candidates indexed"))
+    print(f"Indexed {indexed} candidates in {time.perf_counter() - started:.1f}s")
+    db.close()
+    return 0
+
+
+def cmd_screen(args):
+    from batch_screen import BatchScreener
+
+    db = CandidateDatabase(args.db)
+    screener = BatchScreener(db, args.checkpoint or args.path + ".checkpoint", workers=args.workers,
+                             max_gemini_calls=args.max_gemini_calls, batch_size=args.batch_size,
+                             chunk_size=args.chunk_size)
+    stats = screener.run(args.path)
+    print(f"Screened {stats['screened']} transcripts in {stats['seconds']:.1f}s "
+          f"({stats['candidates_per_second']:.1f} candidates/s): "
+          f"{stats['saved']} saved, {stats['failed']} failed")
+    db.close()
+    return 1 if stats["failed"] else 0
+
+
+def cmd_build_question_bank(args):
+    from gemini_dispatch import BACKGROUND, get_dispatcher
+    from question_bank import build_question_bank, get_question_bank
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        print("GEMINI_API_KEY must be set to generate questions", file=sys.stderr)
+        return 2
+    dispatcher = get_dispatcher(api_key)
+    bank = get_question_bank(args.bank)
+    technologies = [tech.strip() for tech in args.technologies.split(",") if tech.strip()] if args.technologies else None
+    difficulties = [level.strip() for level in args.difficulties.split(",") if level.strip()]
+
+    started = time.perf_counter()
+    added = build_question_bank(
+        bank, lambda prompt: dispatcher.generate_content(prompt, priority=BACKGROUND),
+        technologies=technologies, difficulties=difficulties, per_technology=args.per_technology,
+        batch_size=args.batch_size, workers=args.workers,
+        progress=lambda technology, difficulty, n: logger.info(f"{technology} ({difficulty}): {n} questions added")
+    )
+    print(f"Added {added} questions to {args.bank} in {time.perf_counter() - started:.1f}s "
+          f"({sum(bank.counts().values())} in total)")
+    return 0
+
+
+def cmd_analytics(args):
+    db = CandidateDatabase(args.db)
+    if args.rebuild:
+        started = time.perf_counter()
+        db.rebuild_analytics()
+        print(f"Rebuilt analytics summaries in {time.perf_counter() - started:.1f}s")
+    if args.check:
+        mismatches = db.check_analytics()
+        for table, key, stored, actual in mismatches:
+            print(f"{table} {key}: stored {stored}, actual {actual}")
+        print(f"{len(mismatches)} analytics summaries differ from the candidates table")
+        db.close()
+        return 1 if mismatches else 0
+
+    for dimension in ANALYTICS_DIMENSIONS:
+        print(f"Candidates by {dimension}:")
+        for row in db.candidate_counts(dimension, args.limit):
+            print(f"  {row['value'] or '(none)'}: {row['candidates']}")
+    print("Top skills by location:")
+    for location, skills in db.top_skills_by_location(limit=args.limit).items():
+        print(f"  {location or '(none)'}: " + ", ".join(f"{row['skill']} ({row['candidates']})" for row in skills))
+    db.close()
+    return 0
+
+
+def cmd_match(args):
+    from candidate_matcher import CandidateIndex
+
+    db = CandidateDatabase(args.db)
+    index = CandidateIndex(db)
+    split = lambda value: [item.strip() for item in (value or "").split(",") if item.strip()]
+    started = time.perf_counter()
+    matches = index.top_matches(split(args.required), split(args.nice), k=args.top,
+                                min_experience=args.min_experience, max_experience=args.max_experience,
+                                locations=split(args.location) or None, require_all=args.require_all)
+    elapsed = time.perf_counter() - started
+    candidates = db.get_candidates(match.candidate_id for match in matches)
+    for match in matches:
+        candidate = candidates.get(match.candidate_id, {})
+        print(f"{match.score:.2f}  {candidate.get('name', '')} <{candidate.get('email', '')}>  "
+              f"{candidate.get('location') or '-'}, {candidate.get('experience') or '?'}: {', '.join(match.matched)}")
+    print(f"Ranked {index.size} candidates in {elapsed * 1000:.0f} ms")
+    db.close()
+    return 0
+
+
+def cmd_export(args):
+    from exporter import export_candidates
+
+    db = CandidateDatabase(args.db)
+    stats = export_candidates(db, args.path, file_format=args.format, watermark_path=args.watermark,
+                              applied_after=args.since, applied_before=args.until, status=args.status,
+                              batch_size=args.batch_size)
+    kind = "changed" if stats["incremental"] else "all"
+    print(f"Exported {stats['rows']} candidates ({kind}) to {args.path} in {stats['seconds']:.1f}s")
+    db.close()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="TalentScout database maintenance")
+    parser.add_argument("--db", default="candidates.db", help="Path to the SQLite database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Bulk import or merge candidates from JSONL/CSV")
+    import_parser.add_argument("path", help="Input file")
+    import_parser.add_argument("--format", choices=("auto", "jsonl", "csv"), default="auto")
+    import_parser.add_argument("--chunk-size", type=int, default=1000)
+    import_parser.set_defaults(func=cmd_import)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Bring an existing database up to the current schema")
+    migrate_parser.set_defaults(func=cmd_migrate)
+
+    index_parser = subparsers.add_parser("search-index", help="Add missing candidates to the full-text search index")
+    index_parser.add_argument("--full", action="store_true", help="Re-index every candidate, not just missing ones")
+    index_parser.add_argument("--batch-size", type=int, default=5000)
+    index_parser.set_defaults(func=cmd_search_index)
+
+    screen_parser = subparsers.add_parser("screen", help="Re-screen stored JSONL transcripts through the bot")
+    screen_parser.add_argument("path", help="JSONL file of transcripts")
+    screen_parser.add_argument("--checkpoint", help="Checkpoint file (default: <path>.checkpoint)")
+    screen_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    screen_parser.add_argument("--max-gemini-calls", type=int, default=8,
+                               help="Gemini requests in flight across all workers")
+    screen_parser.add_argument("--batch-size", type=int, default=25, help="Transcripts per worker task")
+    screen_parser.add_argument("--chunk-size", type=int, default=1000, help="Candidates per database write")
+    screen_parser.set_defaults(func=cmd_screen)
+
+    bank_parser = subparsers.add_parser("build-question-bank",
+                                        help="Generate or top up the precomputed technical question bank")
+    bank_parser.add_argument("--bank", default="question_bank.db", help="Path to the question bank database")
+    bank_parser.add_argument("--technologies", help="Comma-separated technologies (default: the whole taxonomy)")
+    bank_parser.add_argument("--difficulties", default="medium,hard", help="Comma-separated difficulty levels")
+    bank_parser.add_argument("--per-technology", type=int, default=20,
+                             help="Target questions per technology and difficulty")
+    bank_parser.add_argument("--batch-size", type=int, default=10, help="Questions requested per Gemini call")
+    bank_parser.add_argument("--workers", type=int, default=4, help="Concurrent Gemini calls")
+    bank_parser.set_defaults(func=cmd_build_question_bank)
+
+    analytics_parser = subparsers.add_parser("analytics", help="Print the recruiter summary counts")
+    analytics_parser.add_argument("--limit", type=int, default=10, help="Rows shown per summary")
+    analytics_parser.add_argument("--rebuild", action="store_true",
+                                  help="Recompute the summaries from the candidates table first")
+    analytics_parser.add_argument("--check", action="store_true",
+                                  help="Compare the summaries with the candidates table instead of printing them")
+    analytics_parser.set_defaults(func=cmd_analytics)
+
+    match_parser = subparsers.add_parser("match", help="Rank stored candidates against a job requisition")
+    match_parser.add_argument("--required", required=True, help="Comma-separated must-have technologies")
+    match_parser.add_argument("--nice", help="Comma-separated nice-to-have technologies")
+    match_parser.add_argument("--min-experience", type=float, help="Minimum years of experience")
+    match_parser.add_argument("--max-experience", type=float, help="Maximum years of experience")
+    match_parser.add_argument("--location", help="Comma-separated locations to keep")
+    match_parser.add_argument("--require-all", action="store_true",
+                              help="Only candidates who have every required technology")
+    match_parser.add_argument("--top", type=int, default=50, help="Candidates to show")
+    match_parser.set_defaults(func=cmd_match)
+
+    export_parser = subparsers.add_parser("export", help="Stream candidates to CSV, JSONL or Parquet")
+    export_parser.add_argument("path", help="Output file")
+    export_parser.add_argument("--format", choices=("auto", "csv", "jsonl", "parquet"), default="auto")
+    export_parser.add_argument("--watermark",
+                               help="Watermark file; export only candidates changed since the last run using it")
+    export_parser.add_argument("--since", help="Only candidates who applied at or after this time (YYYY-MM-DD[ HH:MM:SS])")
+    export_parser.add_argument("--until", help="Only candidates who applied before this time")
+    export_parser.add_argument("--status", help="Only candidates with this status")
+    export_parser.add_argument("--batch-size", type=int, default=5000, help="Rows read and written at a time")
+    export_parser.set_defaults(func=cmd_export)
+
+    return parser
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+In-process metrics for TalentScout
+
+Counters and histograms kept in memory and rendered in the Prometheus text
+exposition format. Recording a sample is a dict lookup, a bisect and two
+additions under a per-metric lock, so instrumentation can stay on in
+production. Serve the metrics with start_metrics_server() or set
+TALENTSCOUT_METRICS_PORT before the app starts.
+
+Example:
+    from metrics import REGISTRY, timed
+
+    CACHE_MISSES = REGISTRY.counter("cache_misses_total", "Cache misses", ("cache",))
+    CACHE_MISSES.inc(cache="questions")
+
+    @timed()
+    def expensive(...):
+        ...
+"""
+
+import functools
+import inspect
+import logging
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers sub-millisecond regex work up to slow LLM round trips
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+# Characters, for prompt and response sizes
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, one series per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_label_text(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets, plus their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: [bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, **labels) -> "_Timer":
+        """Context manager observing the elapsed seconds of its block."""
+        return _Timer(self, labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, le)} {cumulative}")
+            labels = _label_text(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class Registry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name: str, *args, **kwargs):
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                if not isinstance(existing, metric_class):
+                    raise ValueError(f"Metric {name} is already registered as a {existing.kind}")
+                return existing
+            metric = self._metrics[name] = metric_class(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create a counter, or return the existing one with that name."""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """Create a histogram, or return the existing one with that name."""
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+FUNCTION_SECONDS = REGISTRY.histogram(
+    "talentscout_function_seconds", "Wall time of functions wrapped with metrics.timed", ("function",))
+FUNCTION_ERRORS = REGISTRY.counter(
+    "talentscout_function_errors_total", "Exceptions raised by functions wrapped with metrics.timed", ("function",))
+
+
+def timed(histogram: Optional[Histogram] = None, errors: Optional[Counter] = None,
+          **labels) -> Callable:
+    """
+    Decorator recording a function's wall time in a histogram.
+
+    Without arguments the time goes to talentscout_function_seconds, labelled
+    with the function's qualified name. Exceptions are counted and re-raised.
+    For generator functions the time until the generator is exhausted or
+    closed is recorded, not just the call that creates it.
+
+    Args:
+        histogram: Histogram to observe into, defaults to FUNCTION_SECONDS
+        errors: Counter incremented when the function raises
+        **labels: Label values for both metrics
+
+    Returns:
+        Callable: The decorator
+    """
+    def decorator(func):
+        target = histogram or FUNCTION_SECONDS
+        error_counter = errors or (FUNCTION_ERRORS if histogram is None else None)
+        series = labels or {"function": func.__qualname__}
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    yield from func(*args, **kwargs)
+                except Exception:
+                    if error_counter is not None:
+                        error_counter.inc(**series)
+                    raise
+                finally:
+                    target.observe(time.perf_counter() - started, **series)
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                if error_counter is not None:
+                    error_counter.inc(**series)
+                raise
+            finally:
+                target.observe(time.perf_counter() - started, **series)
+        return wrapper
+
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        payload = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = 9464, host: str = "127.0.0.1",
+                         registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """
+    Serve /metrics from a daemon thread. Calling it again returns the running server.
+
+    Args:
+        port: Port to listen on, 0 for any free port
+        host: Interface to bind; keep the default unless a scraper runs elsewhere
+        registry: Registry to expose
+
+    Returns:
+        ThreadingHTTPServer: The running server
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+            _server = ThreadingHTTPServer((host, port), handler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            logger.info(f"Serving metrics on http://{host}:{_server.server_address[1]}/metrics")
+        return _server
+
+
+def start_metrics_server_from_env() -> Optional[ThreadingHTTPServer]:
+    """Start the metrics server if TALENTSCOUT_METRICS_PORT is set."""
+    port = os.getenv("TALENTSCOUT_METRICS_PORT")
+    if not port:
+        return None
+    try:
+        return start_metrics_server(int(port), os.getenv("TALENTSCOUT_METRICS_HOST", "127.0.0.1"))
+    except OSError as e:
+        # Another process (e.g. a second Streamlit worker) may already own the port
+        logger.warning(f"Could not start metrics server on port {port}: {e}")
+        return None
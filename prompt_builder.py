@@ -0,0 +1,223 @@
+"""
+Token-budgeted prompt construction for TalentScout
+
+Builds the contextual Gemini prompt within a fixed token budget. Recent
+messages are included verbatim, newest first, as far as the budget allows.
+Older messages are folded into a rolling summary. The summary is updated
+incrementally: each message is condensed once when it leaves the recent
+window, so long sessions keep their early context without re-summarizing
+the whole history every turn. Candidate information is serialized as compact
+JSON with empty fields dropped.
+
+Token counts are estimated at about four characters per token, which is close
+enough for budgeting English prompts and costs nothing to compute.
+"""
+
+import json
+import math
+import re
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from metrics import REGISTRY
+
+CHARS_PER_TOKEN = 4
+
+PROMPT_TOKENS = REGISTRY.histogram(
+    "talentscout_prompt_tokens", "Estimated tokens per contextual Gemini prompt", ("part",),
+    buckets=(50, 100, 250, 500, 1000, 2000, 4000, 8000))
+
+SYSTEM_CONTEXT = (
+    "You are a hiring assistant for TalentScout, a recruitment agency specializing in technology placements.\n"
+    "Your task is to conduct an initial screening of candidates by gathering information and asking relevant "
+    "technical questions.\n\n"
+    "Current conversation stage: {stage}\n"
+    "Current candidate information: {candidate}\n\n"
+    "Focus on gathering the information needed for the current stage and then move to the next stage.\n"
+    "Be professional, friendly, and concise in your responses.\n"
+    "Maintain the conversation in the context of a job application process."
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def clip(text: str, max_chars: int) -> str:
+    """Collapse whitespace and cut text at a word boundary to at most max_chars."""
+    text = _WHITESPACE.sub(" ", text).strip()
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 1]
+    if " " in cut:
+        cut = cut[:cut.rindex(" ")]
+    return cut + "…"
+
+
+def compact_candidate(candidate_info: Dict[str, Any]) -> str:
+    """Candidate information as compact JSON without empty fields."""
+    return json.dumps({key: value for key, value in candidate_info.items() if value not in (None, "", [])},
+                      separators=(",", ":"), ensure_ascii=False)
+
+
+def _role(message: Dict[str, str]) -> str:
+    return "User" if message["role"] == "user" else "Assistant"
+
+
+class ConversationSummary:
+    """
+    Rolling, extractive summary of the messages before the recent window.
+
+    Each folded message becomes one condensed line. When the summary outgrows
+    its budget, the oldest full-length lines are shortened further, and only
+    once every line is short are the oldest dropped (and counted). Each line
+    is condensed at most twice, so upkeep is constant per message however
+    long the conversation runs.
+
+    Attributes:
+        covered: Number of leading history messages folded into the summary
+    """
+
+    __slots__ = ("covered", "lines", "tokens", "shortened", "dropped", "max_tokens", "line_chars",
+                 "short_line_chars")
+
+    def __init__(self, max_tokens: int = 300, line_chars: int = 120, short_line_chars: int = 48):
+        self.max_tokens = max_tokens
+        self.line_chars = line_chars
+        self.short_line_chars = short_line_chars
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything folded so far."""
+        self.covered = 0
+        self.lines: List[str] = []
+        self.tokens = 0
+        # lines[:shortened] have already been cut to short_line_chars
+        self.shortened = 0
+        self.dropped = 0
+
+    def fold(self, messages: List[Dict[str, str]]) -> None:
+        """Append condensed lines for messages leaving the recent window."""
+        for message in messages:
+            line = f"{_role(message)}: {clip(str(message.get('content', '')), self.line_chars)}"
+            self.lines.append(line)
+            self.tokens += estimate_tokens(line) + 1
+        self.covered += len(messages)
+
+        while self.tokens > self.max_tokens and self.shortened < len(self.lines):
+            line = self.lines[self.shortened]
+            short = clip(line, self.short_line_chars)
+            self.tokens += estimate_tokens(short) - estimate_tokens(line)
+            self.lines[self.shortened] = short
+            self.shortened += 1
+        while self.lines and self.tokens > self.max_tokens:
+            self.tokens -= estimate_tokens(self.lines.pop(0)) + 1
+            self.shortened -= 1
+            self.dropped += 1
+
+    def render(self) -> str:
+        if not self.lines:
+            return ""
+        header = f"({self.dropped} earlier messages omitted)\n" if self.dropped else ""
+        return header + "\n".join(self.lines)
+
+
+class BuiltPrompt(NamedTuple):
+    text: str
+    tokens: int
+    recent_messages: int
+    summarized_messages: int
+
+
+class PromptBuilder:
+    """
+    Builds contextual prompts that fit a token budget.
+
+    Args:
+        token_budget: Upper bound on the estimated prompt tokens
+        summary_tokens: Share of the budget reserved for the rolling summary
+        max_recent_messages: Most history messages included verbatim; older ones are summarized
+        max_message_chars: Longest single history message included verbatim
+    """
+
+    def __init__(self, token_budget: int = 1000, summary_tokens: int = 250, max_recent_messages: int = 6,
+                 max_message_chars: int = 1600):
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.max_recent_messages = max_recent_messages
+        self.max_message_chars = max_message_chars
+
+    def new_summary(self) -> ConversationSummary:
+        return ConversationSummary(max_tokens=self.summary_tokens)
+
+    def build(self, stage: str, candidate_info: Dict[str, Any], message_history: List[Dict[str, str]],
+              user_message: str, summary: Optional[ConversationSummary] = None) -> BuiltPrompt:
+        """
+        Assemble the prompt for a free-form reply.
+
+        Args:
+            stage: Current conversation stage
+            candidate_info: Information collected so far
+            message_history: Conversation so far; may already end with user_message
+            user_message: The message being answered
+            summary: The session's rolling summary, updated in place
+
+        Returns:
+            BuiltPrompt: Prompt text, its estimated tokens, and how many history
+            messages went in verbatim and via the summary
+        """
+        if summary is None:
+            summary = self.new_summary()
+
+        history = message_history
+        end = len(history)
+        # Callers usually append the user's message before asking for a reply; don't send it twice
+        if end and history[-1].get("role") == "user" and history[-1].get("content") == user_message:
+            end -= 1
+        if summary.covered > end:
+            # The history was replaced (e.g. a new conversation); start the summary over
+            summary.reset()
+
+        system_context = SYSTEM_CONTEXT.format(stage=stage, candidate=compact_candidate(candidate_info))
+        tail = f"User: {user_message}\n\nYour response:"
+        fixed_tokens = estimate_tokens(system_context) + estimate_tokens(tail) + 20
+        if fixed_tokens > self.token_budget:
+            # Never drop the message being answered, but keep it within the budget
+            room = max(200, (self.token_budget - estimate_tokens(system_context) - 20) * CHARS_PER_TOKEN)
+            tail = f"User: {clip(user_message, room)}\n\nYour response:"
+            fixed_tokens = estimate_tokens(system_context) + estimate_tokens(tail) + 20
+        available = self.token_budget - fixed_tokens - self.summary_tokens
+
+        # Walk back from the newest message until the budget is spent
+        recent: List[str] = []
+        start = end
+        oldest = max(summary.covered, end - self.max_recent_messages)
+        while start > oldest:
+            message = history[start - 1]
+            line = f"{_role(message)}: {clip(str(message.get('content', '')), self.max_message_chars)}"
+            cost = estimate_tokens(line) + 1
+            if cost > available:
+                break
+            available -= cost
+            recent.append(line)
+            start -= 1
+        recent.reverse()
+
+        if start > summary.covered:
+            summary.fold(history[summary.covered:start])
+
+        sections = [system_context]
+        summary_text = summary.render()
+        if summary_text:
+            sections.append("--- Earlier Conversation (summary) ---\n" + summary_text)
+        if recent:
+            sections.append("--- Previous Messages ---\n" + "\n".join(recent))
+        sections.append(tail)
+        text = "\n\n".join(sections)
+
+        tokens = estimate_tokens(text)
+        PROMPT_TOKENS.observe(tokens, part="total")
+        PROMPT_TOKENS.observe(summary.tokens, part="summary")
+        return BuiltPrompt(text, tokens, len(recent), summary.covered)
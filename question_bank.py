@@ -0,0 +1,271 @@
+"""
+Precomputed technical question bank for TalentScout
+
+Questions are generated offline per (technology, difficulty) with Gemini (or
+the local stand-in) and stored in SQLite. At runtime QuestionBank draws a
+varied question set for a categorized tech stack without any network call:
+each (technology, difficulty) pool is read once through an index and kept
+in memory, so later draws are a few random choices. Reads and writes go
+through CandidateDatabase's pooled per-thread connections, so no turn pays
+for opening one.
+
+Build or extend a bank with:
+
+    python manage.py build-question-bank --per-technology 20
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from database import CandidateDatabase
+from tech_matcher import TECH_CATEGORIES, get_tech_matcher
+
+logger = logging.getLogger(__name__)
+
+DIFFICULTIES = ("medium", "hard")
+
+_NUMBERED_LINE = re.compile(r"^\s*(?:\d+[.)]|[-*])\s*(.+?)\s*$")
+
+
+def build_bank_prompt(technology: str, difficulty: str, count: int) -> str:
+    """Prompt asking for a batch of questions about one technology."""
+    return (f"Generate {count} distinct {difficulty} technical interview questions about: {technology}\n\n"
+            "Requirements for questions:\n"
+            f"1. Each question must be specifically about {technology}\n"
+            "2. Mix conceptual, practical and scenario-based questions\n"
+            "3. Questions should not be answerable with just yes/no\n"
+            "4. Each question must stand on its own without referring to the others\n\n"
+            "Format your response as a clean numbered list, one question per line, with no other text.")
+
+
+def parse_questions(text: str) -> List[str]:
+    """Questions from a numbered or bulleted list, one per line."""
+    questions = []
+    for line in text.splitlines():
+        match = _NUMBERED_LINE.match(line)
+        if match and len(match.group(1)) > 15:
+            questions.append(match.group(1))
+    return questions
+
+
+class QuestionBank:
+    """
+    SQLite-backed question bank with in-memory, per-pool sampling.
+
+    Args:
+        db_path: Path of the bank database
+        matcher: Tech matcher used to resolve stack items to bank technologies
+        db: Database to use instead of opening db_path, sharing its connections
+    """
+
+    def __init__(self, db_path: str = "question_bank.db", matcher=None, db: Optional[CandidateDatabase] = None):
+        self.db = db or CandidateDatabase(db_path)
+        self.db_path = self.db.db_path
+        self.matcher = matcher or get_tech_matcher()
+        # (technology, difficulty) -> [(question id, question)], filled on first use
+        self._pools: Dict[Tuple[str, str], List[Tuple[int, str]]] = {}
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _init_db(self):
+        """Create the bank table if it doesn't exist"""
+        with self.db.transaction() as cursor:
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS question_bank (
+                id INTEGER PRIMARY KEY,
+                technology TEXT NOT NULL,
+                category TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                question TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                UNIQUE (technology, difficulty, question)
+            )
+            ''')
+
+    def add(self, technology: str, difficulty: str, questions: Iterable[str]) -> int:
+        """
+        Store questions for a technology, skipping exact duplicates.
+
+        Returns:
+            int: Number of new questions stored
+        """
+        category = self.matcher.canonical_category.get(technology, "other")
+        now = time.time()
+        with self.db.transaction() as cursor:
+            cursor.executemany(
+                "INSERT OR IGNORE INTO question_bank (technology, category, difficulty, question, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(technology, category, difficulty, question, now) for question in questions]
+            )
+            # Summed over the statements; ignored duplicates don't count
+            added = max(cursor.rowcount, 0)
+        with self._lock:
+            self._pools.pop((technology, difficulty), None)
+        return added
+
+    def _pool(self, technology: str, difficulty: str) -> List[Tuple[int, str]]:
+        key = (technology, difficulty)
+        pool = self._pools.get(key)
+        if pool is None:
+            with self.db.transaction(immediate=False) as cursor:
+                pool = [(question_id, question) for question_id, question in cursor.execute(
+                    "SELECT id, question FROM question_bank WHERE technology = ? AND difficulty = ?", key)]
+            with self._lock:
+                self._pools[key] = pool
+        return pool
+
+    def counts(self) -> Dict[Tuple[str, str], int]:
+        """Number of stored questions per (technology, difficulty)."""
+        with self.db.transaction(immediate=False) as cursor:
+            rows = cursor.execute(
+                "SELECT technology, difficulty, COUNT(*) FROM question_bank GROUP BY technology, difficulty"
+            ).fetchall()
+        return {(technology, difficulty): count for technology, difficulty, count in rows}
+
+    def sample(self, categorized_tech: Dict[str, List[str]], count: int = 5,
+               exclude: Optional[Set[int]] = None, rng: Optional[random.Random] = None) -> List[Tuple[int, str]]:
+        """
+        Draw a varied question set for a categorized tech stack.
+
+        Technologies are visited round-robin across categories, so a set
+        covers as many categories and technologies as possible before any
+        repeats; difficulty alternates between medium and hard.
+
+        Args:
+            categorized_tech: Category -> stack items, as from TalentScoutBot._categorize_tech_stack
+            count: Questions wanted
+            exclude: Question ids not to use (e.g. already asked in this session)
+            rng: Random source, for reproducible draws
+
+        Returns:
+            List[Tuple[int, str]]: Up to `count` (question id, question) pairs, never repeating
+        """
+        rng = rng or random
+        chosen: Set[int] = set(exclude or ())
+        # The same text can be banked under both difficulties; never ask it twice
+        chosen_texts: Set[str] = set()
+        rotation = []
+        per_category = []
+        for items in categorized_tech.values():
+            technologies = []
+            for item in items:
+                technology = self.matcher.canonicalize(item)
+                if technology and technology not in technologies:
+                    technologies.append(technology)
+            if technologies:
+                per_category.append(technologies)
+        for depth in range(max((len(technologies) for technologies in per_category), default=0)):
+            rotation.extend(technologies[depth] for technologies in per_category if depth < len(technologies))
+
+        questions: List[Tuple[int, str]] = []
+        slot = 0
+        stalled = 0
+        while rotation and len(questions) < count and stalled < len(rotation):
+            technology = rotation[slot % len(rotation)]
+            preferred = DIFFICULTIES[len(questions) % len(DIFFICULTIES)]
+            picked = None
+            for difficulty in (preferred,) + tuple(d for d in DIFFICULTIES if d != preferred):
+                pool = self._pool(technology, difficulty)
+                # A few random probes find an unused question without scanning the pool
+                for _ in range(4):
+                    if not pool:
+                        break
+                    question_id, question = pool[rng.randrange(len(pool))]
+                    if question_id not in chosen and question not in chosen_texts:
+                        picked = (question_id, question)
+                        break
+                if picked is None:
+                    unused = [entry for entry in pool if entry[0] not in chosen and entry[1] not in chosen_texts]
+                    if unused:
+                        picked = rng.choice(unused)
+                if picked:
+                    break
+            slot += 1
+            if picked is None:
+                stalled += 1
+                continue
+            stalled = 0
+            chosen.add(picked[0])
+            chosen_texts.add(picked[1])
+            questions.append(picked)
+        return questions
+
+
+def build_question_bank(bank: QuestionBank, generate: Callable[[str], str],
+                        technologies: Optional[List[str]] = None, difficulties: Iterable[str] = DIFFICULTIES,
+                        per_technology: int = 20, batch_size: int = 10, workers: int = 4,
+                        progress: Optional[Callable[[str, str, int], None]] = None) -> int:
+    """
+    Fill the bank up to `per_technology` questions per (technology, difficulty).
+
+    Pools that are already full are skipped, so an interrupted build can be
+    re-run to finish. Generation runs on a thread pool; with the Gemini
+    dispatcher as `generate`, calls are still paced to the API quota.
+
+    Args:
+        bank: Bank to fill
+        generate: Callable sending a prompt to Gemini and returning its text
+        technologies: Technologies to cover, defaults to the whole taxonomy
+        difficulties: Difficulty levels to cover
+        per_technology: Target questions per (technology, difficulty)
+        batch_size: Questions requested per Gemini call
+        workers: Concurrent generation calls
+        progress: Called with (technology, difficulty, questions added) as pools finish
+
+    Returns:
+        int: Questions added
+    """
+    if technologies is None:
+        technologies = list(dict.fromkeys(tech for techs in TECH_CATEGORIES.values() for tech in techs))
+    else:
+        # Pools are keyed by canonical name, which is what sample() looks up
+        technologies = list(dict.fromkeys(bank.matcher.canonicalize(tech) or tech for tech in technologies))
+    existing = bank.counts()
+
+    def fill(technology: str, difficulty: str) -> int:
+        added = 0
+        # Stop after a few rounds without new questions rather than looping on duplicates
+        barren_rounds = 0
+        while existing.get((technology, difficulty), 0) + added < per_technology and barren_rounds < 3:
+            wanted = min(batch_size, per_technology - existing.get((technology, difficulty), 0) - added)
+            try:
+                text = generate(build_bank_prompt(technology, difficulty, wanted))
+            except Exception as e:
+                logger.warning(f"Generating {difficulty} questions for {technology} failed: {e}")
+                barren_rounds += 1
+                continue
+            new = bank.add(technology, difficulty, parse_questions(text)[:wanted])
+            barren_rounds = barren_rounds + 1 if new == 0 else 0
+            added += new
+        return added
+
+    total = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="question-bank") as pool:
+        futures = {pool.submit(fill, technology, difficulty): (technology, difficulty)
+                   for technology in technologies for difficulty in difficulties
+                   if existing.get((technology, difficulty), 0) < per_technology}
+        for future in as_completed(futures):
+            added = future.result()
+            total += added
+            if progress:
+                progress(*futures[future], added)
+    return total
+
+
+_shared_banks: Dict[str, QuestionBank] = {}
+_shared_lock = threading.Lock()
+
+
+def get_question_bank(db_path: str = "question_bank.db", db: Optional[CandidateDatabase] = None) -> QuestionBank:
+    """Return the process-wide bank for a database path, created on `db` if given."""
+    with _shared_lock:
+        bank = _shared_banks.get(db_path)
+        if bank is None:
+            bank = QuestionBank(db_path, db=db)
+            _shared_banks[db_path] = bank
+        return bank
@@ -0,0 +1,260 @@
+"""
+Technical question cache for TalentScout
+
+Caches Gemini-generated question sets keyed by the candidate's normalized
+tech stack. A bounded in-memory LRU sits in front of a `question_cache` table
+in the candidates SQLite file, so cached sets survive restarts and are shared
+by every process using the same database. Stacks found to have nothing on
+disk are remembered for a short while too, so repeated misses don't query
+SQLite on the request path.
+"""
+
+import random
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from database import CandidateDatabase
+
+logger = logging.getLogger(__name__)
+
+
+def make_stack_key(tech_stack: List[str], namespace: str = "") -> str:
+    """
+    Canonical cache key for a tech stack: lowercased, de-duplicated and sorted.
+
+    Sets that aren't whole-stack question sets (e.g. one category's part of
+    a fanned-out set) are stored under a namespace, so they are never
+    served for a stack that happens to consist of the same technologies.
+    """
+    items = {" ".join(str(tech).lower().split()) for tech in tech_stack}
+    key = ",".join(sorted(item for item in items if item))
+    return f"{namespace}:{key}" if namespace and key else key
+
+
+class QuestionCache:
+    """
+    Two-tier (memory LRU + SQLite) cache of generated question sets.
+
+    Each key holds up to `variants` question sets. A key only serves hits once
+    it has `min_variants` sets, and hits pick one at random, so candidates with
+    the same stack don't all get identical questions. min_variants defaults to
+    `variants` because a single cached set would go to every candidate with a
+    popular stack, so questions could be passed between candidates; the cost
+    is one Gemini call (or, in "upgrade" mode, one banked set) for each of the
+    first `variants` candidates with a stack. Pass min_variants=1 to trade
+    that variety for an earlier hit.
+
+    Args:
+        db_path: Candidate database holding the question_cache table
+        max_entries: Stacks kept in the memory tier
+        ttl: Seconds a question set stays servable
+        variants: Most question sets kept per stack
+        min_variants: Sets a stack needs before it serves hits
+        negative_ttl: Seconds a stack with nothing on disk is remembered as a miss
+        db: Database to use instead of opening db_path, sharing its connections
+    """
+
+    def __init__(self, db_path: str = "candidates.db", max_entries: int = 256,
+                 ttl: float = 7 * 24 * 3600, variants: int = 3, min_variants: Optional[int] = None,
+                 negative_ttl: float = 30.0, db: Optional[CandidateDatabase] = None):
+        # Opening the database applies its migrations, which create the cache table
+        self.db = db or CandidateDatabase(db_path)
+        self.db_path = self.db.db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.variants = variants
+        self.min_variants = min(min_variants or variants, variants)
+        self.negative_ttl = negative_ttl
+
+        # key -> list of (questions, created_at)
+        self._memory: "OrderedDict[str, List[Tuple[str, float]]]" = OrderedDict()
+        # key -> when the disk was last found to have nothing for it
+        self._absent: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._fill_latency_total = 0.0
+        self._fills = 0
+
+    def _fresh(self, entries: List[Tuple[str, float]]) -> List[Tuple[str, float]]:
+        cutoff = time.time() - self.ttl
+        return [entry for entry in entries if entry[1] >= cutoff]
+
+    def _remember(self, key: str, entries: List[Tuple[str, float]]) -> None:
+        """Store entries in the memory tier, evicting the least recently used key. Caller holds the lock."""
+        self._memory[key] = entries
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _remember_absent(self, key: str) -> None:
+        """Record that the disk has nothing for a key. Caller holds the lock."""
+        self._absent[key] = time.monotonic()
+        self._absent.move_to_end(key)
+        while len(self._absent) > self.max_entries:
+            self._absent.popitem(last=False)
+
+    def _known_absent(self, key: str) -> bool:
+        """Whether the disk had nothing for a key within negative_ttl. Caller holds the lock."""
+        checked_at = self._absent.get(key)
+        if checked_at is None:
+            return False
+        if time.monotonic() - checked_at < self.negative_ttl:
+            return True
+        del self._absent[key]
+        return False
+
+    @staticmethod
+    def _read(cursor, key: str) -> List[Tuple[str, float]]:
+        rows = cursor.execute(
+            "SELECT questions, created_at FROM question_cache WHERE stack_key = ? ORDER BY variant",
+            (key,)
+        ).fetchall()
+        return [(questions, created_at) for questions, created_at in rows]
+
+    def _load(self, key: str) -> List[Tuple[str, float]]:
+        with self.db.transaction(immediate=False) as cursor:
+            return self._read(cursor, key)
+
+    def get(self, tech_stack: List[str], namespace: str = "") -> Optional[str]:
+        """
+        Look up a cached question set for a tech stack.
+
+        Args:
+            tech_stack: The candidate's technologies
+            namespace: Namespace of partial sets (see make_stack_key); these are
+                served from a single variant and don't count in the hit statistics
+
+        Returns:
+            Optional[str]: One of the cached question sets, or None on a miss
+        """
+        return self._lookup(make_stack_key(tech_stack, namespace), namespace, record=not namespace)
+
+    def contains(self, tech_stack: List[str], namespace: str = "") -> bool:
+        """
+        Whether get() would serve a question set for a tech stack, without counting a hit or miss.
+
+        For checks ahead of the real lookup, such as speculation deciding
+        whether to generate, which would otherwise count the lookup twice.
+        """
+        return self._lookup(make_stack_key(tech_stack, namespace), namespace, record=False) is not None
+
+    def _lookup(self, key: str, namespace: str, record: bool) -> Optional[str]:
+        if not key:
+            return None
+
+        with self._lock:
+            entries = self._memory.get(key)
+            from_disk = entries is None
+            if from_disk and self._known_absent(key):
+                entries, from_disk = [], False
+
+        if from_disk:
+            entries = self._load(key)
+
+        entries = self._fresh(entries)
+
+        with self._lock:
+            if entries:
+                self._remember(key, entries)
+            else:
+                self._memory.pop(key, None)
+                self._remember_absent(key)
+
+            if len(entries) < (1 if namespace else self.min_variants):
+                if record:
+                    self.misses += 1
+                return None
+
+            if record:
+                self.hits += 1
+                if from_disk:
+                    self.disk_hits += 1
+                else:
+                    self.memory_hits += 1
+
+        return random.choice(entries)[0]
+
+    def put(self, tech_stack: List[str], questions: str, latency: Optional[float] = None,
+            namespace: str = "") -> None:
+        """
+        Add a freshly generated question set for a tech stack.
+
+        Args:
+            tech_stack: The candidate's technologies
+            questions: The generated questions text
+            latency: Seconds the generation took, used to estimate savings
+            namespace: Namespace of partial sets (see make_stack_key)
+        """
+        key = make_stack_key(tech_stack, namespace)
+        if not key or not questions:
+            return
+
+        now = time.time()
+        with self._lock:
+            if latency is not None and not namespace:
+                self._fill_latency_total += latency
+                self._fills += 1
+
+        # Read and rewrite under the write lock, so sets added at the same time
+        # by other threads or processes are kept rather than overwritten
+        with self.db.transaction() as cursor:
+            entries = self._fresh(self._read(cursor, key)) + [(questions, now)]
+            # Keep the newest sets when the key is full
+            entries = entries[-self.variants:]
+            cursor.execute("DELETE FROM question_cache WHERE stack_key = ?", (key,))
+            cursor.executemany(
+                "INSERT INTO question_cache (stack_key, variant, questions, created_at) VALUES (?, ?, ?, ?)",
+                [(key, variant, text, created_at) for variant, (text, created_at) in enumerate(entries)]
+            )
+
+        with self._lock:
+            self._absent.pop(key, None)
+            self._remember(key, entries)
+
+    def purge_expired(self) -> int:
+        """Delete expired question sets from disk and memory, returning the number of rows removed."""
+        cutoff = time.time() - self.ttl
+        with self.db.transaction() as cursor:
+            removed = cursor.execute("DELETE FROM question_cache WHERE created_at < ?", (cutoff,)).rowcount
+        with self._lock:
+            self._memory.clear()
+            self._absent.clear()
+        return removed
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters plus an estimate of the Gemini time saved by hits."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            avg_latency = self._fill_latency_total / self._fills if self._fills else 0.0
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "avg_generation_seconds": avg_latency,
+                "estimated_seconds_saved": self.hits * avg_latency,
+                "gemini_calls_saved": self.hits,
+            }
+
+
+_shared_caches: Dict[str, QuestionCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_question_cache(db_path: str = "candidates.db", db: Optional[CandidateDatabase] = None) -> QuestionCache:
+    """Return the process-wide question cache for a database file, created on `db` if given."""
+    with _shared_lock:
+        cache = _shared_caches.get(db_path)
+        if cache is None:
+            cache = QuestionCache(db_path, db=db)
+            _shared_caches[db_path] = cache
+        return cache
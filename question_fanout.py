@@ -0,0 +1,246 @@
+"""
+Deadline-bounded, per-category technical question generation for TalentScout
+
+One prompt for a long tech stack is the slowest Gemini call the bot makes
+and the one most likely to time out. QuestionFanout splits the categorized
+stack into one small prompt per category, runs them concurrently, and waits
+no longer than a global deadline. Whatever has returned by then is merged
+round-robin across categories and deduplicated; categories that failed or
+missed the deadline are filled from the bank or the fallback templates. Each
+question keeps a record of the category and source it came from.
+
+Calls still running at the deadline are not wasted: when they finish, their
+questions go into the question cache under that category's technologies, so
+the next candidate with the same category stack gets them without a call.
+These partial sets live in their own cache namespace, so they are never
+served as a whole-stack question set.
+"""
+
+import logging
+import math
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from metrics import REGISTRY
+from question_bank import parse_questions
+
+logger = logging.getLogger(__name__)
+
+FANOUT_PARTS = REGISTRY.counter(
+    "talentscout_question_fanout_parts_total", "Per-category question generations, by outcome", ("outcome",))
+FANOUT_SECONDS = REGISTRY.histogram(
+    "talentscout_question_fanout_seconds", "Time to assemble a fanned-out question set")
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def build_category_prompt(category: str, technologies: List[str], count: int) -> str:
+    """Prompt asking for questions about one category of the candidate's stack."""
+    area = category.replace("_", "/")
+    return (f"Generate {count} technical interview questions about {area} for a candidate with experience in: "
+            f"{', '.join(technologies)}\n\n"
+            "Requirements for questions:\n"
+            "1. Each question must specifically mention one of these technologies\n"
+            "2. Questions should range from medium to hard difficulty\n"
+            "3. Questions should test deep knowledge, not just basics\n"
+            "4. Questions should not be answerable with just yes/no\n\n"
+            "Format your response as a clean numbered list with no indentation. "
+            "Do not include any introductory text or explanations.")
+
+
+def split_stack(categorized_tech: Dict[str, List[str]], tech_stack: List[str]) -> Dict[str, List[str]]:
+    """Category -> technologies, with anything the taxonomy doesn't know under "other"."""
+    parts = {category: list(items) for category, items in categorized_tech.items() if items}
+    known = {item for items in parts.values() for item in items}
+    other = [item for item in tech_stack if item not in known]
+    if other:
+        parts["other"] = other
+    return parts
+
+
+def part_namespace(category: str) -> str:
+    """Question cache namespace of one category's partial sets, kept apart from whole-stack sets."""
+    return f"fanout/{category}"
+
+
+def _dedupe_key(question: str) -> str:
+    return _NON_WORD.sub(" ", question.lower()).strip()
+
+
+class PartReport(NamedTuple):
+    """
+    How one category was answered.
+
+    The outcome is "gemini" or "cache", or one of "timeout", "late" (still
+    running once enough other categories had answered), "error" or "empty"
+    for categories left to the fill.
+    """
+    category: str
+    technologies: List[str]
+    outcome: str
+    seconds: float
+
+
+class FanoutResult(NamedTuple):
+    """
+    A merged question set and where it came from.
+
+    Attributes:
+        questions: (question, category, source) in the order asked; source is
+            "gemini", "cache", "bank" or "template"
+        parts: One report per category
+        seconds: Time taken to assemble the set
+    """
+    questions: List[Tuple[str, str, str]]
+    parts: List[PartReport]
+    seconds: float
+
+    @property
+    def complete(self) -> bool:
+        """True if every category was answered by Gemini or the cache."""
+        return all(part.outcome in ("gemini", "cache") for part in self.parts)
+
+    def text(self) -> str:
+        """The questions as a numbered list."""
+        return "\n\n".join(f"{n}. {question}" for n, (question, _, _) in enumerate(self.questions, 1))
+
+    def provenance(self) -> str:
+        """One-line summary of each category's outcome, for logs."""
+        return ", ".join(f"{part.category}={part.outcome}({part.seconds:.2f}s)" for part in self.parts)
+
+
+class QuestionFanout:
+    """
+    Generates a question set as concurrent per-category Gemini calls under a deadline.
+
+    Args:
+        generate: Sends a prompt to Gemini with a timeout in seconds and returns its text
+        executor: Runs the per-category calls
+        question_cache: Cache consulted and filled per category, or None
+        fill: Returns up to n (question, source) pairs for a category without Gemini;
+            also called with the pseudo-category "general" and no technologies to top
+            up a set that is still short
+        deadline: Seconds to wait for the per-category calls
+        questions_per_set: Questions in a merged set
+    """
+
+    def __init__(self, generate: Callable[[str, float], str], executor: Executor,
+                 question_cache=None, fill: Optional[Callable[[str, List[str], int], List[Tuple[str, str]]]] = None,
+                 deadline: float = 8.0, questions_per_set: int = 5):
+        self.generate = generate
+        self.executor = executor
+        self.question_cache = question_cache
+        self.fill = fill or (lambda category, technologies, n: [])
+        self.deadline = deadline
+        self.questions_per_set = questions_per_set
+
+    def _call(self, category: str, technologies: List[str], count: int) -> Tuple[List[str], float]:
+        """Generate one category's questions; returns them with the time they arrived."""
+        started = time.perf_counter()
+        text = self.generate(build_category_prompt(category, technologies, count), self.deadline)
+        questions = parse_questions(text)
+        if questions and self.question_cache is not None:
+            # Cached even if the deadline has passed, so a late answer serves the next candidate
+            self.question_cache.put(technologies, "\n\n".join(f"{n}. {q}" for n, q in enumerate(questions, 1)),
+                                    latency=time.perf_counter() - started, namespace=part_namespace(category))
+        return questions, time.perf_counter()
+
+    def run(self, parts: Dict[str, List[str]]) -> FanoutResult:
+        """
+        Generate, merge and fill a question set for the given categories.
+
+        Returns as soon as enough categories have answered to fill the set
+        (one per question, or all of them if there are fewer), or at the
+        deadline, whichever is first. Calls still running are left to finish
+        and fill the cache.
+
+        Args:
+            parts: Category -> technologies, as from split_stack
+
+        Returns:
+            FanoutResult: Merged questions with per-category provenance
+        """
+        started = time.perf_counter()
+        # Ask each category for a spare question so duplicates can be dropped
+        per_part = math.ceil(self.questions_per_set / max(len(parts), 1)) + 1
+        quorum = min(len(parts), self.questions_per_set)
+
+        answers: Dict[str, Tuple[List[str], str]] = {}
+        seconds: Dict[str, float] = {}
+        futures = {}
+        for category, technologies in parts.items():
+            cached = (self.question_cache.get(technologies, namespace=part_namespace(category))
+                      if self.question_cache is not None else None)
+            if cached:
+                answers[category] = (parse_questions(cached), "cache")
+                seconds[category] = 0.0
+            else:
+                futures[self.executor.submit(self._call, category, technologies, per_part)] = category
+
+        answered = len(answers)
+        pending = set(futures)
+        while pending and answered < quorum:
+            remaining = started + self.deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                category = futures[future]
+                try:
+                    questions, finished = future.result()
+                except Exception as e:
+                    logger.warning(f"Question generation for {category} failed: {e}")
+                    answers[category] = ([], "error")
+                    seconds[category] = time.perf_counter() - started
+                    continue
+                answers[category] = (questions, "gemini" if questions else "empty")
+                seconds[category] = finished - started
+                answered += bool(questions)
+
+        elapsed = time.perf_counter() - started
+        for future in pending:
+            # Calls that haven't started yet free their worker; running ones still fill the cache
+            future.cancel()
+            answers[futures[future]] = ([], "timeout" if elapsed >= self.deadline else "late")
+            seconds[futures[future]] = elapsed
+
+        reports = []
+        answered_columns: List[List[Tuple[str, str, str]]] = []
+        for category, technologies in parts.items():
+            questions, outcome = answers[category]
+            FANOUT_PARTS.inc(outcome=outcome)
+            reports.append(PartReport(category, technologies, outcome, seconds[category]))
+            if outcome in ("gemini", "cache"):
+                answered_columns.append([(question, category, outcome) for question in questions])
+
+        # Gemini's answers go first, round-robin in the stack's category order; only then are
+        # the unanswered categories filled from the bank or templates, then general questions
+        merged: List[Tuple[str, str, str]] = []
+        seen: Set[str] = set()
+        self._merge(answered_columns, merged, seen)
+        if len(merged) < self.questions_per_set:
+            self._merge([[(question, category, source)
+                          for question, source in self.fill(category, technologies, per_part)]
+                         for category, technologies in parts.items()
+                         if answers[category][1] not in ("gemini", "cache")], merged, seen)
+        if len(merged) < self.questions_per_set:
+            self._merge([[(question, "general", source)
+                          for question, source in self.fill("general", [], self.questions_per_set)]], merged, seen)
+
+        FANOUT_SECONDS.observe(elapsed)
+        return FanoutResult(merged, reports, elapsed)
+
+    def _merge(self, columns: List[List[Tuple[str, str, str]]], merged: List[Tuple[str, str, str]],
+               seen: Set[str]) -> None:
+        """Append questions round-robin across columns, skipping duplicates, until the set is full."""
+        for depth in range(max((len(column) for column in columns), default=0)):
+            for column in columns:
+                if len(merged) >= self.questions_per_set:
+                    return
+                if depth < len(column):
+                    key = _dedupe_key(column[depth][0])
+                    if key not in seen:
+                        seen.add(key)
+                        merged.append(column[depth])
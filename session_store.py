@@ -0,0 +1,182 @@
+"""
+Write-behind persistence of in-progress candidate sessions for TalentScout
+
+The bot hands each stage transition to a SessionWriter, which only copies
+the candidate's details into a pending map keyed by session, so no SQLite
+work happens on the request path. A background thread flushes the map every
+flush_interval seconds as one batched transaction. Updates for a session
+that arrive between flushes replace each other, so a burst of turns costs
+one row write. close() stops the thread and writes whatever is still
+pending; get_engine() registers it to run at interpreter exit.
+
+If a batch fails, its sessions are retried one at a time, so a session that
+can't be saved doesn't hold back the rest of the batch. Only the failing
+sessions go back into the queue, and one that still fails after
+max_attempts saves is dropped and logged. While the database itself is
+unavailable (locked, read-only, out of disk), the whole batch is simply
+retried on the next flush.
+"""
+
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+from database import CandidateDatabase
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+SESSION_WRITES = REGISTRY.counter(
+    "talentscout_session_writes_total",
+    "Write-behind session updates by outcome (queued, coalesced, written, failed, dropped)", ("outcome",))
+
+
+class SessionWriter:
+    """
+    Coalescing background writer for in-progress sessions.
+
+    Args:
+        db: Database the sessions are saved to
+        flush_interval: Seconds between batched writes
+        max_batch: Most sessions written per transaction
+        max_attempts: Failed saves of a session, each on its own, before it is dropped
+    """
+
+    def __init__(self, db: CandidateDatabase, flush_interval: float = 0.5, max_batch: int = 500,
+                 max_attempts: int = 5):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        # session_id -> latest update, in first-queued order
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # session_id -> failed saves of that session on its own
+        self._attempts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # Serializes flushes from the writer thread and from flush()/close() callers
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, session_id: str, stage: str, candidate_info: Dict[str, Any],
+                conversation_history: Optional[List[Dict[str, str]]] = None) -> None:
+        """
+        Queue a session's current state for saving.
+
+        Args:
+            session_id: Identifies the conversation across updates
+            stage: Conversation stage the session is now in
+            candidate_info: Candidate details, copied so later edits don't leak into the write
+            conversation_history: Transcript to store with the candidate, if any
+        """
+        update = {
+            "session_id": session_id,
+            "stage": stage,
+            "candidate_info": dict(candidate_info, tech_stack=list(candidate_info.get("tech_stack") or [])),
+            "conversation_history": list(conversation_history) if conversation_history else None,
+        }
+        with self._lock:
+            previous = self._pending.get(session_id)
+            if previous is not None and update["conversation_history"] is None:
+                # A newer update without a transcript must not drop one still waiting to be written
+                update["conversation_history"] = previous["conversation_history"]
+            self._pending[session_id] = update
+        SESSION_WRITES.inc(outcome="coalesced" if previous is not None else "queued")
+
+    @property
+    def pending(self) -> int:
+        """Sessions waiting to be written."""
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write every pending update now, from the calling thread.
+
+        Returns:
+            int: Sessions written
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        return written
+                    batch = []
+                    for session_id in list(self._pending)[:self.max_batch]:
+                        batch.append(self._pending.pop(session_id))
+                try:
+                    self.db.save_sessions(batch)
+                except sqlite3.OperationalError as e:
+                    # Nothing can be saved right now; try the whole batch again next time
+                    logger.error(f"Saving {len(batch)} sessions failed ({e}); they will be retried")
+                    SESSION_WRITES.inc(len(batch), outcome="failed")
+                    self._requeue(batch)
+                    return written
+                except Exception:
+                    logger.exception(f"Saving {len(batch)} sessions failed; retrying them one at a time")
+                    return written + self._save_each(batch)
+                SESSION_WRITES.inc(len(batch), outcome="written")
+                written += len(batch)
+                self._saved(batch)
+
+    def _save_each(self, batch: List[Dict[str, Any]]) -> int:
+        """Save the sessions of a failed batch one at a time, re-queuing only those that fail."""
+        written = 0
+        for position, update in enumerate(batch):
+            try:
+                self.db.save_sessions([update])
+            except sqlite3.OperationalError as e:
+                logger.error(f"Saving sessions failed ({e}); {len(batch) - position} will be retried")
+                SESSION_WRITES.inc(len(batch) - position, outcome="failed")
+                self._requeue(batch[position:])
+                break
+            except Exception:
+                logger.exception(f"Saving session {update['session_id']} failed")
+                SESSION_WRITES.inc(outcome="failed")
+                self._requeue([update], count_attempt=True)
+            else:
+                SESSION_WRITES.inc(outcome="written")
+                written += 1
+                self._saved([update])
+        return written
+
+    def _saved(self, batch: List[Dict[str, Any]]) -> None:
+        if self._attempts:
+            with self._lock:
+                for update in batch:
+                    self._attempts.pop(update["session_id"], None)
+
+    def _requeue(self, updates: List[Dict[str, Any]], count_attempt: bool = False) -> None:
+        """Put failed updates back in the queue, dropping sessions that have failed max_attempts times."""
+        with self._lock:
+            for update in updates:
+                session_id = update["session_id"]
+                if count_attempt:
+                    attempts = self._attempts.get(session_id, 0) + 1
+                    if attempts >= self.max_attempts:
+                        self._attempts.pop(session_id, None)
+                        logger.error(f"Dropping the update for session {session_id} at stage "
+                                     f"{update['stage']} after {attempts} failed saves")
+                        SESSION_WRITES.inc(outcome="dropped")
+                        continue
+                    self._attempts[session_id] = attempts
+                newer = self._pending.get(session_id)
+                if newer is None:
+                    self._pending[session_id] = update
+                elif newer["conversation_history"] is None:
+                    # Keep the newer state, but not at the cost of the unsaved transcript
+                    newer["conversation_history"] = update["conversation_history"]
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the writer thread and write anything still pending."""
+        self._stopped.set()
+        self._thread.join(timeout)
+        self.flush()
+        if self._pending:
+            logger.error(f"{len(self._pending)} session updates could not be saved at shutdown")
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
@@ -0,0 +1,205 @@
+"""
+Technology keyword matching for TalentScout
+
+This module holds the tech taxonomy and compiles it once into a single
+trie-shaped regular expression. One scan over a message finds every
+technology with word-aware boundaries (so "go" doesn't match "good") and maps
+each hit to its canonical name and category.
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Tech stack categories for better question generation
+TECH_CATEGORIES = {
+    "languages": [
+        "python", "java", "javascript", "typescript", "c#", "c++", "ruby",
+        "go", "rust", "php", "swift", "kotlin", "scala", "perl", "haskell"
+    ],
+    "frontend": [
+        "react", "angular", "vue", "svelte", "html", "css", "sass", "less",
+        "bootstrap", "tailwind", "jquery", "webpack", "next.js", "gatsby"
+    ],
+    "backend": [
+        "node", "express", "django", "flask", "spring", "asp.net", "laravel",
+        "ruby on rails", "fastapi", "nestjs", "graphql", "rest", "soap"
+    ],
+    "databases": [
+        "sql", "mysql", "postgresql", "mongodb", "firebase", "oracle", "sqlite",
+        "redis", "elasticsearch", "dynamodb", "cassandra", "neo4j", "couchdb"
+    ],
+    "cloud": [
+        "aws", "azure", "gcp", "cloud", "docker", "kubernetes", "serverless",
+        "lambda", "ec2", "s3", "heroku", "netlify", "vercel"
+    ],
+    "mobile": [
+        "android", "ios", "react native", "flutter", "xamarin", "swift", "kotlin",
+        "objective-c", "mobile development"
+    ],
+    "devops": [
+        "jenkins", "github actions", "gitlab ci", "travis", "docker", "kubernetes",
+        "terraform", "ansible", "puppet", "chef", "ci/cd", "devops"
+    ],
+    "ai_ml": [
+        "machine learning", "deep learning", "ai", "tensorflow", "pytorch", "keras",
+        "scikit-learn", "nlp", "computer vision", "data science"
+    ],
+    "testing": [
+        "junit", "pytest", "jest", "mocha", "cypress", "selenium", "testing",
+        "tdd", "bdd", "qa"
+    ]
+}
+
+# Common spellings that should resolve to a taxonomy entry
+TECH_ALIASES = {
+    "golang": "go",
+    "js": "javascript",
+    "ts": "typescript",
+    "node.js": "node",
+    "nodejs": "node",
+    "react.js": "react",
+    "reactjs": "react",
+    "vue.js": "vue",
+    "vuejs": "vue",
+    "nextjs": "next.js",
+    "postgres": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "google cloud": "gcp",
+    "rails": "ruby on rails",
+    "sklearn": "scikit-learn",
+    "ml": "machine learning",
+}
+
+
+class TechMatch(NamedTuple):
+    """A technology found in a piece of text."""
+    canonical: str
+    category: str
+    start: int
+    end: int
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """
+    Build a regex alternation shaped like a prefix trie.
+
+    Shared prefixes are matched once, so scanning cost stays close to linear in
+    the text length even with thousands of terms. Greedy optional groups make
+    the longest term win ("react native" over "react").
+    """
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        alternatives = [
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not alternatives:
+            return ""
+        body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+class TechMatcher:
+    """
+    Compiled single-pass matcher over a tech taxonomy.
+
+    A technology listed under several categories (e.g. "docker") is assigned
+    to the first one in taxonomy order, which is the category used for
+    question generation.
+    """
+
+    def __init__(self, categories: Dict[str, List[str]], aliases: Optional[Dict[str, str]] = None):
+        self.categories = list(categories)
+        self._category_rank = {category: rank for rank, category in enumerate(self.categories)}
+
+        # canonical name -> primary category
+        self.canonical_category: Dict[str, str] = {}
+        for category, items in categories.items():
+            for item in items:
+                self.canonical_category.setdefault(self._normalize(item), category)
+
+        # every spelling (canonical or alias) -> canonical name
+        self._lookup: Dict[str, str] = {name: name for name in self.canonical_category}
+        for alias, canonical in (aliases or {}).items():
+            canonical = self._normalize(canonical)
+            if canonical in self.canonical_category:
+                self._lookup.setdefault(self._normalize(alias), canonical)
+
+        # Boundaries are "not a letter or digit" rather than \b so terms like c++ and c# still match
+        self._pattern = re.compile(
+            r"(?<![a-z0-9])(?:" + _trie_pattern(self._lookup) + r")(?![a-z0-9])",
+            re.IGNORECASE
+        )
+
+    @staticmethod
+    def _normalize(term: str) -> str:
+        return " ".join(term.lower().split())
+
+    def find(self, text: str) -> List[TechMatch]:
+        """Every technology occurrence in the text, in order of appearance."""
+        matches = []
+        for match in self._pattern.finditer(text):
+            canonical = self._lookup[self._normalize(match.group())]
+            matches.append(TechMatch(canonical, self.canonical_category[canonical], match.start(), match.end()))
+        return matches
+
+    def extract(self, text: str) -> List[str]:
+        """Distinct canonical technologies mentioned in the text, in order of first appearance."""
+        return list(dict.fromkeys(match.canonical for match in self.find(text)))
+
+    def canonicalize(self, tech: str) -> Optional[str]:
+        """Canonical name for a technology string, or None if it isn't in the taxonomy."""
+        normalized = self._normalize(tech)
+        if normalized in self._lookup:
+            return self._lookup[normalized]
+        matches = self.find(tech)
+        return matches[0].canonical if matches else None
+
+    def classify(self, tech: str) -> Optional[Tuple[str, str]]:
+        """
+        Resolve a free-form tech item to (canonical name, category).
+
+        When an item mentions several technologies, the one whose category
+        comes first in the taxonomy wins.
+        """
+        normalized = self._normalize(tech)
+        if normalized in self._lookup:
+            canonical = self._lookup[normalized]
+            return canonical, self.canonical_category[canonical]
+        matches = self.find(tech)
+        if not matches:
+            return None
+        best = min(matches, key=lambda match: self._category_rank[match.category])
+        return best.canonical, best.category
+
+    def categorize(self, tech_stack: List[str]) -> Dict[str, List[str]]:
+        """Group the items of a tech stack by category, dropping empty categories."""
+        categorized: Dict[str, List[str]] = {category: [] for category in self.categories}
+        for tech in tech_stack:
+            resolved = self.classify(tech)
+            if resolved:
+                categorized[resolved[1]].append(tech)
+        return {category: items for category, items in categorized.items() if items}
+
+
+_default_matcher: Optional[TechMatcher] = None
+_default_lock = threading.Lock()
+
+
+def get_tech_matcher() -> TechMatcher:
+    """Return the process-wide matcher for the built-in taxonomy, compiling it on first use."""
+    global _default_matcher
+    with _default_lock:
+        if _default_matcher is None:
+            _default_matcher = TechMatcher(TECH_CATEGORIES, TECH_ALIASES)
+        return _default_matcher
@@ -0,0 +1,61 @@
+import pytest
+
+from database import CandidateDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = CandidateDatabase(str(tmp_path / "candidates.db"))
+    yield database
+    database.close()
+
+
+def candidate(email, location="London", position="Backend Developer", tech_stack=("Python",)):
+    return {"name": "Ada Lovelace", "email": email, "phone": "555-0100", "experience": "5",
+            "position": position, "location": location, "tech_stack": list(tech_stack)}
+
+
+def counts(db, dimension):
+    return {row["value"]: row["candidates"] for row in db.candidate_counts(dimension)}
+
+
+def test_triggers_track_inserts_updates_and_deletes(db):
+    list(db.save_candidates_bulk([
+        candidate("a@example.com", tech_stack=["Python", "Django"]),
+        candidate("b@example.com", location=" london "),
+        candidate("c@example.com", location="Berlin", position="Data Engineer", tech_stack=["Spark"]),
+    ]))
+    assert counts(db, "location") == {"london": 2, "berlin": 1}
+    assert counts(db, "status") == {"new": 3}
+    assert {row["skill"]: row["candidates"] for row in db.top_skills_by_location("London")} == {
+        "python": 2, "django": 1}
+
+    with db.transaction() as cursor:
+        cursor.execute("UPDATE candidates SET status = 'interview', location = 'Berlin' "
+                       "WHERE email = 'a@example.com'")
+    assert counts(db, "location") == {"london": 1, "berlin": 2}
+    assert counts(db, "status") == {"new": 2, "interview": 1}
+    # The candidate's skills moved with them
+    assert {row["skill"]: row["candidates"] for row in db.top_skills_by_location("Berlin")} == {
+        "django": 1, "python": 1, "spark": 1}
+
+    # An upsert that adds a skill counts it once
+    list(db.save_candidates_bulk([candidate("c@example.com", location="Berlin", tech_stack=["Kafka"])]))
+    assert {row["skill"]: row["candidates"] for row in db.top_skills_by_location("Berlin")}["kafka"] == 1
+
+    with db.transaction() as cursor:
+        cursor.execute("DELETE FROM candidates WHERE email = 'b@example.com'")
+    assert counts(db, "location") == {"berlin": 2}
+    assert db.top_skills_by_location("London") == []
+    assert db.check_analytics() == []
+
+
+def test_check_and_rebuild_repair_drifted_counts(db):
+    list(db.save_candidates_bulk([candidate("a@example.com"), candidate("b@example.com")]))
+    with db.transaction() as cursor:
+        cursor.execute("UPDATE candidate_counts SET count = 7 WHERE dimension = 'location'")
+    assert db.check_analytics() == [("candidate_counts", ("location", "london"), 7, 2)]
+
+    db.rebuild_analytics()
+    assert db.check_analytics() == []
+    assert counts(db, "location") == {"london": 2}
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from batch_screen import BatchScreener, load_checkpoint, read_transcripts
+from database import CandidateDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = CandidateDatabase(str(tmp_path / "candidates.db"))
+    yield database
+    database.close()
+
+
+def candidate(email):
+    return {"name": "Ada Lovelace", "email": email, "phone": "555-0100", "experience": "5",
+            "position": "Backend Developer", "location": "London", "tech_stack": ["Python"]}
+
+
+def test_only_committed_results_are_checkpointed(db, tmp_path):
+    checkpoint_path = str(tmp_path / "checkpoint")
+    screener = BatchScreener(db, checkpoint_path)
+    screener._pending_results = [
+        {"id": "saved", "candidate": candidate("ada@example.com"), "stage": "closing"},
+        {"id": "no-email", "candidate": candidate(""), "stage": "contact_info"},
+        {"id": "replay-error", "error": "boom"},
+    ]
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        screener._flush(checkpoint)
+
+    assert load_checkpoint(checkpoint_path) == {"saved"}
+    assert (screener.saved, screener.failed) == (1, 2)
+    assert db.get_candidate_by_email("ada@example.com") is not None
+
+
+def test_restart_skips_only_checkpointed_transcripts(tmp_path):
+    transcripts = tmp_path / "transcripts.jsonl"
+    transcripts.write_text("".join(json.dumps({"id": transcript_id, "messages": ["hi"]}) + "\n"
+                                   for transcript_id in ("a", "b", "c")))
+    (tmp_path / "checkpoint").write_text("b\n")
+    done = load_checkpoint(str(tmp_path / "checkpoint"))
+    assert [transcript_id for transcript_id, _ in read_transcripts(str(transcripts), done)] == ["a", "c"]
+
+
+def test_worker_engine_uses_the_job_database_without_background_calls(tmp_path, monkeypatch):
+    from chatbot import create_engine
+
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.setenv("TALENTSCOUT_QUESTION_SOURCE", "upgrade")
+    path = str(tmp_path / "job.db")
+    engine = create_engine(path, persist_sessions=False, background_generation=False)
+    assert engine.candidate_db.db_path == path
+    assert engine.question_cache.db_path == path
+    assert engine.session_writer is None
+    assert engine.speculation is False
+    assert engine.question_source == "bank"
+
+
+def test_rescreen_replaces_the_stored_tech_stack(db, tmp_path):
+    db.save_candidate(dict(candidate("ada@example.com"), tech_stack=["Python", "Django", "Cobol"]))
+    checkpoint_path = str(tmp_path / "checkpoint")
+    screener = BatchScreener(db, checkpoint_path)
+    screener._pending_results = [
+        {"id": "rescreen", "candidate": dict(candidate("ada@example.com"), tech_stack=["Python", "Django"]),
+         "stage": "closing"},
+    ]
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        screener._flush(checkpoint)
+
+    assert db.get_candidate_by_email("ada@example.com")["tech_stack"] == ["Python", "Django"]
+    assert db.find_candidates_by_skills(any_of=["cobol"])["total"] == 0
+    assert db.find_candidates_by_skills(all_of=["python", "django"])["total"] == 1
+    assert db.check_analytics() == []
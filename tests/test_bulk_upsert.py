@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+
+from database import CandidateDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = CandidateDatabase(str(tmp_path / "candidates.db"))
+    yield database
+    database.close()
+
+
+def candidate(email, **fields):
+    return dict({"name": "Ada Lovelace", "email": email, "phone": "555-0100", "experience": "5",
+                 "position": "Backend Developer", "location": "London", "tech_stack": ["Python"]}, **fields)
+
+
+def test_outcomes_follow_input_order(db):
+    db.save_candidate(candidate("old@example.com"))
+    outcomes = list(db.save_candidates_bulk([
+        candidate("new@example.com"),
+        candidate(" old@example.com ", phone=""),
+        candidate(""),
+        candidate("new@example.com", tech_stack=["Django"]),
+    ], chunk_size=3))
+
+    assert [(outcome["email"], outcome["success"], outcome.get("action")) for outcome in outcomes] == [
+        ("new@example.com", True, "inserted"),
+        ("old@example.com", True, "updated"),
+        (None, False, None),
+        ("new@example.com", True, "updated"),
+    ]
+    assert outcomes[0]["candidate_id"] == outcomes[3]["candidate_id"]
+    assert outcomes[2]["error"] == "Candidate has no email"
+
+
+def test_upsert_merges_into_the_stored_row(db):
+    list(db.save_candidates_bulk([candidate("ada@example.com", tech_stack=["Python", "Django"])]))
+    list(db.save_candidates_bulk([candidate("ada@example.com", phone="", position="Staff Engineer",
+                                            tech_stack=["django", "Go"])]))
+
+    stored = db.get_candidate_by_email("ada@example.com")
+    assert stored["phone"] == "555-0100"
+    assert stored["position"] == "Staff Engineer"
+    assert {"Python", "Go"} <= set(stored["tech_stack"])
+    assert {row["skill"] for row in db.skill_counts()} >= {"python", "django", "go"}
+
+
+def test_a_failed_chunk_fails_only_its_own_rows(db):
+    with db.transaction() as cursor:
+        cursor.execute("CREATE TRIGGER reject_blocked BEFORE INSERT ON candidates "
+                       "WHEN new.email = 'blocked@example.com' BEGIN SELECT RAISE(ABORT, 'rejected'); END")
+    outcomes = list(db.save_candidates_bulk(
+        [candidate("a@example.com"), candidate("blocked@example.com"), candidate("c@example.com")], chunk_size=2))
+
+    assert [outcome["success"] for outcome in outcomes] == [False, False, True]
+    assert all("rejected" in outcome["error"] for outcome in outcomes[:2])
+    # The chunk rolled back as a whole
+    assert db.get_candidate_by_email("a@example.com") is None
+    assert db.get_candidate_by_email("c@example.com") is not None
+
+
+def test_bulk_save_inside_a_transaction_raises_instead_of_committing_around_it(db):
+    with db.transaction() as cursor:
+        cursor.execute("CREATE TRIGGER reject_all BEFORE INSERT ON candidates "
+                       "BEGIN SELECT RAISE(ABORT, 'rejected'); END")
+    with pytest.raises(sqlite3.Error):
+        with db.transaction():
+            list(db.save_candidates_bulk([candidate("a@example.com")]))
@@ -0,0 +1,72 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from candidate_matcher import CandidateIndex
+from database import CandidateDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = CandidateDatabase(str(tmp_path / "candidates.db"))
+    yield database
+    database.close()
+
+
+def candidate(email, tech_stack, experience="5", location="London"):
+    return {"name": "Ada Lovelace", "email": email, "phone": "555-0100", "experience": experience,
+            "position": "Backend Developer", "location": location, "tech_stack": tech_stack}
+
+
+def ranked(index, *args, **kwargs):
+    return [(match.candidate_id, round(match.score, 3)) for match in index.top_matches(*args, **kwargs)]
+
+
+def test_ranks_by_weighted_score_with_ties_to_earlier_applicants(db):
+    outcomes = list(db.save_candidates_bulk([
+        candidate("a@example.com", ["Python"]),
+        candidate("b@example.com", ["Python", "Django"]),
+        candidate("c@example.com", ["Django"]),
+        candidate("d@example.com", ["Python"]),
+        candidate("e@example.com", ["Rust"]),
+    ]))
+    a, b, c, d, _ = [outcome["candidate_id"] for outcome in outcomes]
+    index = CandidateIndex(db)
+
+    # Python is required (weight 2), Django nice to have (weight 1)
+    assert ranked(index, ["python"], ["Django"]) == [(b, 1.0), (a, 0.667), (d, 0.667), (c, 0.333)]
+    assert ranked(index, ["python"], ["Django"], k=2) == [(b, 1.0), (a, 0.667)]
+    assert ranked(index, ["python"], ["Django"], require_all=True) == [(b, 1.0), (a, 0.667), (d, 0.667)]
+    assert index.top_matches(["python"], ["Django"])[0].matched == ["python", "django"]
+
+
+def test_refresh_applies_saves_updates_and_deletes(db):
+    first = db.save_candidate(candidate("a@example.com", ["Python"]))["candidate_id"]
+    index = CandidateIndex(db)
+    assert ranked(index, ["Go"]) == []
+
+    second = list(db.save_candidates_bulk([candidate("b@example.com", ["Go"], location="Berlin")]))[0]["candidate_id"]
+    list(db.save_candidates_bulk([candidate("a@example.com", ["Go"])], replace_tech_stack=True))
+    assert index.refresh() == 2
+    assert ranked(index, ["Go"]) == [(first, 1.0), (second, 1.0)]
+    assert ranked(index, ["Go"], locations=["berlin"]) == [(second, 1.0)]
+    assert ranked(index, ["Python"]) == []
+
+    with db.transaction() as cursor:
+        cursor.execute("DELETE FROM candidates WHERE id = ?", (first,))
+    assert ranked(index, ["Go"]) == [(second, 1.0)]
+    assert index.refresh() == 0
+
+
+def test_out_of_order_id_reloads_the_index(db):
+    list(db.save_candidates_bulk([candidate("a@example.com", ["Python"]), candidate("b@example.com", ["Python"])]))
+    with db.transaction() as cursor:
+        cursor.execute("DELETE FROM candidates WHERE email = 'a@example.com'")
+    index = CandidateIndex(db)
+
+    # A restored row keeps its old, lower id
+    with db.transaction() as cursor:
+        cursor.execute("INSERT INTO candidates (id, email, experience, location, tech_stack) "
+                       "VALUES (1, 'a@example.com', '5', 'London', '[\"Python\"]')")
+        db._replace_skills(cursor, 1, '["Python"]')
+    assert [match.candidate_id for match in index.top_matches(["Python"])] == [1, 2]
@@ -0,0 +1,147 @@
+import json
+
+import pytest
+
+from gemini_client import CircuitBreaker, GeminiClient, GeminiError, extract_text
+
+
+class FakeResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, body=None, lines=(), error=None):
+        self.body = body
+        self.lines = lines
+        self.error = error
+        self.closed = False
+
+    def json(self):
+        return self.body
+
+    def iter_lines(self, decode_unicode=False):
+        for line in self.lines:
+            yield line
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+
+    def post(self, url, **kwargs):
+        return self.response
+
+
+def client_for(response, breaker):
+    client = GeminiClient("key", breaker=breaker, max_retries=0)
+    client.session = FakeSession(response)
+    return client
+
+
+def sse(text):
+    return "data: " + json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+
+def half_open_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    return breaker
+
+
+def test_extract_text_rejects_responses_without_candidates():
+    with pytest.raises(GeminiError, match="SAFETY"):
+        extract_text({"candidates": [], "promptFeedback": {"blockReason": "SAFETY"}})
+    with pytest.raises(GeminiError):
+        extract_text({})
+
+
+def test_blocked_prompt_raises_without_tripping_the_breaker():
+    breaker = half_open_breaker()
+    client = client_for(FakeResponse({"promptFeedback": {"blockReason": "SAFETY"}}), breaker)
+    with pytest.raises(GeminiError):
+        client.generate_content("prompt")
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_stream_records_success_only_after_a_clean_finish():
+    breaker = half_open_breaker()
+    client = client_for(FakeResponse(lines=[sse("Hello"), sse(" world")]), breaker)
+    assert "".join(client.stream_generate_content("prompt")) == "Hello world"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_stream_closed_early_frees_the_probe_without_closing_the_circuit():
+    breaker = half_open_breaker()
+    response = FakeResponse(lines=[sse("Hello"), sse(" world")])
+    stream = client_for(response, breaker).stream_generate_content("prompt")
+    assert next(stream) == "Hello"
+    stream.close()
+    assert response.closed
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.is_available()
+
+
+def test_unexpected_stream_error_is_not_recorded_as_success():
+    breaker = CircuitBreaker(failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    client = client_for(FakeResponse(lines=[sse("Hello")], error=RuntimeError("decoder bug")), breaker)
+    with pytest.raises(RuntimeError):
+        list(client.stream_generate_content("prompt"))
+    # Still one failure away from opening, as before the call
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_extract_text_rejects_candidates_without_text():
+    with pytest.raises(GeminiError, match="SAFETY"):
+        extract_text({"candidates": [{"finishReason": "SAFETY"}]})
+    with pytest.raises(GeminiError, match="MAX_TOKENS"):
+        extract_text({"candidates": [{"content": {"parts": [{"text": ""}]}, "finishReason": "MAX_TOKENS"}]})
+    # A stream chunk may carry no text while the answer is still coming
+    assert extract_text({"candidates": [{"content": {"parts": []}}]}, allow_empty=True) == ""
+
+
+def test_textless_stream_raises_instead_of_yielding_nothing():
+    breaker = CircuitBreaker()
+    response = FakeResponse(lines=["data: " + json.dumps({"candidates": [{"finishReason": "RECITATION"}]})])
+    with pytest.raises(GeminiError, match="RECITATION"):
+        list(client_for(response, breaker).stream_generate_content("prompt"))
+    with pytest.raises(GeminiError, match="without text"):
+        list(client_for(FakeResponse(lines=[]), breaker).stream_generate_content("prompt"))
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+class ErrorResponse(FakeResponse):
+    def __init__(self, status_code):
+        super().__init__()
+        self.status_code = status_code
+        self.text = "error"
+
+
+def test_rejected_key_opens_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=2)
+    client = client_for(ErrorResponse(403), breaker)
+    for _ in range(2):
+        with pytest.raises(GeminiError):
+            client.generate_content("prompt")
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_bad_request_leaves_the_breaker_alone():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    with pytest.raises(GeminiError):
+        client_for(ErrorResponse(400), breaker).generate_content("prompt")
+    # The earlier failure still counts
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    probing = half_open_breaker()
+    with pytest.raises(GeminiError):
+        client_for(ErrorResponse(400), probing).generate_content("prompt")
+    assert probing.is_available()
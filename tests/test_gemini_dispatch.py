@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from gemini_client import GeminiError
+from gemini_dispatch import GeminiDispatcher, TokenBucket
+
+
+class FakeClient:
+    available = True
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt, timeout=None):
+        with self.lock:
+            self.calls.append(prompt)
+        time.sleep(self.latency)
+        return f"answer to {prompt}"
+
+    def stream_generate_content(self, prompt, timeout=None):
+        with self.lock:
+            self.calls.append(prompt)
+        for word in ("one ", "two ", "three"):
+            time.sleep(self.latency)
+            yield word
+
+
+def run_concurrently(target, count):
+    results = [None] * count
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, target(i))) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return results
+
+
+def timed_call(dispatcher, prompt):
+    started = time.monotonic()
+    try:
+        return "ok", dispatcher.generate_content(prompt), time.monotonic() - started
+    except GeminiError as e:
+        return "failed", str(e), time.monotonic() - started
+
+
+def test_identical_calls_share_one_upstream_call():
+    client = FakeClient(latency=0.2)
+    dispatcher = GeminiDispatcher(client, requests_per_minute=600)
+    results = run_concurrently(lambda i: dispatcher.generate_content("same prompt"), 8)
+    assert results == ["answer to same prompt"] * 8
+    assert client.calls == ["same prompt"]
+
+
+def test_identical_streams_share_one_upstream_call():
+    client = FakeClient(latency=0.05)
+    dispatcher = GeminiDispatcher(client, requests_per_minute=600)
+    results = run_concurrently(lambda i: "".join(dispatcher.stream_generate_content("same prompt")), 5)
+    assert results == ["one two three"] * 5
+    assert client.calls == ["same prompt"]
+
+
+def test_queued_calls_fail_at_their_deadline_without_using_tokens():
+    client = FakeClient()
+    dispatcher = GeminiDispatcher(client, requests_per_minute=120, burst=1, max_queue_wait=1.0)
+    results = run_concurrently(lambda i: timed_call(dispatcher, f"prompt {i}"), 10)
+
+    succeeded = [result for result in results if result[0] == "ok"]
+    failed = [result for result in results if result[0] == "failed"]
+    # One call from the burst, then one every 0.5s until the 1s deadline
+    assert 2 <= len(succeeded) <= 3
+    assert len(client.calls) == len(succeeded)
+    assert all(seconds < 1.3 for _, _, seconds in failed)
+
+    # Expired calls didn't consume the bucket: a new call goes through within one refill interval
+    status, _, seconds = timed_call(dispatcher, "after the backlog")
+    assert status == "ok" and seconds < 0.8
+
+
+def test_expired_job_is_skipped_when_it_reaches_the_head_of_the_queue():
+    client = FakeClient(latency=0.5)
+    dispatcher = GeminiDispatcher(client, requests_per_minute=6000, max_concurrent=1, max_queue_wait=0.2)
+    results = run_concurrently(lambda i: timed_call(dispatcher, f"prompt {i}"), 3)
+    assert [status for status, _, _ in results].count("ok") == 1
+    # Only the call that was running reached the client
+    assert len(client.calls) == 1
+
+
+def test_token_bucket_refund_is_capped():
+    bucket = TokenBucket(rate=1.0, capacity=2)
+    assert bucket.try_acquire()
+    bucket.refund()
+    bucket.refund()
+    assert bucket.tokens == pytest.approx(2, abs=0.01)
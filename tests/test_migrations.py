@@ -0,0 +1,100 @@
+import json
+import sqlite3
+
+from database import CandidateDatabase
+
+# The candidates table as the original release created it, before any migration
+BASELINE_SCHEMA = """
+CREATE TABLE candidates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    email TEXT UNIQUE,
+    phone TEXT,
+    experience TEXT,
+    position TEXT,
+    location TEXT,
+    tech_stack TEXT,
+    application_time TIMESTAMP,
+    status TEXT DEFAULT 'new',
+    conversation_history TEXT,
+    notes TEXT
+)
+"""
+
+
+def make_baseline_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute(BASELINE_SCHEMA)
+    rows = [
+        ("Ada", "ada@example.com", "Backend Developer", "London", ["Python", "PostgreSQL"],
+         [{"role": "user", "content": "I scaled our Kafka consumers"}]),
+        ("Grace", "grace@example.com", "Data Engineer", "Berlin", ["Python", "Spark"], []),
+        ("Linus", "linus@example.com", "Backend Developer", "London", ["Go"], None),
+    ]
+    for name, email, position, location, tech_stack, history in rows:
+        conn.execute(
+            "INSERT INTO candidates (name, email, phone, experience, position, location, tech_stack, "
+            "application_time, conversation_history) VALUES (?, ?, '555-0100', '4', ?, ?, ?, "
+            "'2024-03-06 10:00:00', ?)",
+            (name, email, position, location, json.dumps(tech_stack),
+             None if history is None else json.dumps(history)))
+    conn.commit()
+    conn.close()
+
+
+def test_baseline_database_is_migrated_in_place(tmp_path):
+    path = str(tmp_path / "candidates.db")
+    make_baseline_db(path)
+    db = CandidateDatabase(path)
+    try:
+        assert db.schema_version == len(CandidateDatabase.MIGRATIONS)
+        ada = db.get_candidate_by_email("ada@example.com")
+        assert db.get_conversation_history(ada["id"]) == [
+            {"role": "user", "content": "I scaled our Kafka consumers"}]
+        assert db._connection().execute(
+            "SELECT COUNT(*) FROM candidates WHERE conversation_history IS NOT NULL").fetchone()[0] == 0
+
+        assert {row["email"] for row in db.find_candidates_by_skills(all_of=["python"])["candidates"]} == {
+            "ada@example.com", "grace@example.com"}
+        assert db.check_analytics() == []
+        assert {row["value"]: row["candidates"] for row in db.candidate_counts("location")} == {
+            "london": 2, "berlin": 1}
+
+        # Rows that predate the search index are added by the rebuild
+        assert db.search_candidates("kafka") == []
+        assert db.rebuild_search_index() == 3
+        assert [row["email"] for row in db.search_candidates("kafka")] == ["ada@example.com"]
+    finally:
+        db.close()
+
+
+def test_reopening_does_not_rerun_migrations(tmp_path):
+    path = str(tmp_path / "candidates.db")
+    CandidateDatabase(path).close()
+    calls = []
+
+    class Recording(CandidateDatabase):
+        def __getattribute__(self, name):
+            if name.startswith("_migrate_"):
+                calls.append(name)
+            return super().__getattribute__(name)
+
+    Recording(path).close()
+    assert calls == []
+
+
+def test_partially_migrated_database_resumes_from_its_version(tmp_path):
+    path = str(tmp_path / "candidates.db")
+    make_baseline_db(path)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE INDEX idx_candidates_time ON candidates (application_time, id)")
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    db = CandidateDatabase(path)
+    try:
+        assert db.schema_version == len(CandidateDatabase.MIGRATIONS)
+        assert db.skill_counts(skills=["python"])[0]["candidates"] == 2
+    finally:
+        db.close()
@@ -0,0 +1,33 @@
+import sqlite3
+
+import pytest
+
+from database import CandidateDatabase
+from question_bank import QuestionBank
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = CandidateDatabase(str(tmp_path / "question_bank.db"))
+    yield database
+    database.close()
+
+
+def test_add_counts_only_new_questions(db):
+    bank = QuestionBank(db=db)
+    assert bank.db_path == db.db_path
+    assert bank.add("python", "easy", ["What is a generator?", "What is a decorator?"]) == 2
+    assert bank.add("python", "easy", ["What is a generator?", "What is a context manager?"]) == 1
+    assert bank.counts() == {("python", "easy"): 3}
+
+
+def test_reads_reuse_the_database_connections(db, monkeypatch):
+    bank = QuestionBank(db=db)
+    bank.add("python", "easy", ["What is a generator?"])
+
+    def no_new_connections(*args, **kwargs):
+        raise AssertionError("the bank must read through the shared connection")
+
+    monkeypatch.setattr(sqlite3, "connect", no_new_connections)
+    assert bank._pool("python", "easy") == [(1, "What is a generator?")]
+    assert bank.counts() == {("python", "easy"): 1}
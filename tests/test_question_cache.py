@@ -0,0 +1,64 @@
+import threading
+
+from database import CandidateDatabase
+from question_cache import QuestionCache
+
+
+def test_cache_table_is_created_by_a_migration(tmp_path):
+    db = CandidateDatabase(str(tmp_path / "candidates.db"))
+    try:
+        assert db.schema_version == len(CandidateDatabase.MIGRATIONS)
+        assert db._connection().execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'question_cache'").fetchone()
+    finally:
+        db.close()
+
+
+def test_misses_are_remembered_without_hiding_new_sets(tmp_path):
+    cache = QuestionCache(str(tmp_path / "candidates.db"), min_variants=1)
+    loads = []
+    load = cache._load
+    cache._load = lambda key: loads.append(key) or load(key)
+
+    assert cache.get(["Python"]) is None
+    assert cache.get(["Python"]) is None
+    assert len(loads) == 1
+
+    cache.put(["Python"], "1. What is a generator?")
+    assert cache.get(["python"]) == "1. What is a generator?"
+    assert len(loads) == 1
+
+
+def test_concurrent_puts_keep_every_variant(tmp_path):
+    path = str(tmp_path / "candidates.db")
+    # Separate instances stand in for separate processes sharing the file
+    caches = [QuestionCache(path) for _ in range(3)]
+    for cache in caches:
+        cache.get(["Go"])
+    threads = [threading.Thread(target=cache.put, args=(["Go"], f"1. Question from writer {n}"))
+               for n, cache in enumerate(caches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reader = QuestionCache(path)
+    assert {reader.get(["Go"]) for _ in range(50)} == {f"1. Question from writer {n}" for n in range(3)}
+
+
+def test_stack_serves_hits_once_it_has_min_variants(tmp_path):
+    cache = QuestionCache(str(tmp_path / "candidates.db"), variants=3)
+    cache.put(["Rust"], "1. Ownership?")
+    cache.put(["Rust"], "1. Borrowing?")
+    assert cache.get(["Rust"]) is None
+    cache.put(["Rust"], "1. Lifetimes?")
+    assert cache.get(["Rust"]) in {"1. Ownership?", "1. Borrowing?", "1. Lifetimes?"}
+
+
+def test_contains_does_not_count_in_the_stats(tmp_path):
+    cache = QuestionCache(str(tmp_path / "candidates.db"), min_variants=1)
+    assert not cache.contains(["Python"])
+    cache.put(["Python"], "1. What is a generator?")
+    assert cache.contains(["python"])
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (0, 0)
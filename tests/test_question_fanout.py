@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from question_cache import QuestionCache
+from question_fanout import QuestionFanout, split_stack
+
+
+def numbered(topic, count=3):
+    return "\n".join(f"{n}. Explain how you would use {topic} in production, case {n}"
+                     for n in range(1, count + 1))
+
+
+def test_partial_sets_are_cached_apart_from_whole_stack_sets(tmp_path):
+    cache = QuestionCache(str(tmp_path / "cache.db"), min_variants=1)
+    calls = []
+
+    def generate(prompt, timeout):
+        calls.append(prompt)
+        return numbered("Python" if "Python" in prompt else "Django")
+
+    parts = split_stack({"languages": ["Python"], "backend": ["Django"]}, ["Python", "Django"])
+    with ThreadPoolExecutor(4) as executor:
+        fanout = QuestionFanout(generate, executor, question_cache=cache, deadline=5.0)
+        first = fanout.run(parts)
+        assert first.complete and len(first.questions) == 5
+        assert len(calls) == 2
+
+        # A candidate whose whole stack is one category's technologies must not get a partial set
+        assert cache.get(["Python"]) is None
+        assert cache.get(["Django"]) is None
+
+        # The next fan-out for the same categories is served from the cache without calls
+        second = fanout.run(parts)
+        assert [part.outcome for part in second.parts] == ["cache", "cache"]
+        assert len(calls) == 2
+
+    stats = cache.stats()
+    # Only the two whole-stack lookups above count toward the hit statistics
+    assert stats["hits"] == 0 and stats["misses"] == 2
@@ -0,0 +1,56 @@
+import pytest
+
+from database import CandidateDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = CandidateDatabase(str(tmp_path / "candidates.db"))
+    yield database
+    database.close()
+
+
+def candidate(n, tech_stack=("Python",)):
+    return {"name": f"Candidate {n}", "email": f"c{n}@example.com", "phone": "555-0100", "experience": "3",
+            "position": "Backend Developer", "location": "Berlin", "tech_stack": list(tech_stack)}
+
+
+def found(db, query):
+    return {row["email"] for row in db.search_candidates(query)}
+
+
+def test_triggers_keep_the_index_in_step_with_candidates(db):
+    candidate_id = db.save_candidate(candidate(1, ["Kubernetes"]),
+                                     [{"role": "user", "content": "I migrated our monolith"}])["candidate_id"]
+    assert found(db, "kubernetes") == {"c1@example.com"}
+    assert found(db, "migration") == {"c1@example.com"}
+
+    with db.transaction() as cursor:
+        cursor.execute("UPDATE candidates SET position = 'Platform Engineer' WHERE id = ?", (candidate_id,))
+    assert found(db, "platform") == {"c1@example.com"}
+    # Updating another column keeps the indexed transcript
+    assert found(db, "monolith") == {"c1@example.com"}
+
+    with db.transaction() as cursor:
+        cursor.execute("DELETE FROM candidates WHERE id = ?", (candidate_id,))
+    assert found(db, "kubernetes") == set()
+
+
+def test_incremental_rebuild_indexes_only_missing_rows(db):
+    list(db.save_candidates_bulk([candidate(n) for n in range(1, 11)]))
+    conn = db._connection()
+    with db.transaction() as cursor:
+        cursor.execute("DELETE FROM candidates_fts WHERE rowid IN (2, 5, 6, 9)")
+        # Marks a row between missing ones, which the rebuild must leave as it is
+        cursor.execute("UPDATE candidates_fts SET position = 'Untouched' WHERE rowid = 3")
+
+    batches = []
+    assert db.rebuild_search_index(batch_size=2, progress=batches.append) == 4
+    assert batches == [2, 4]
+    assert conn.execute("SELECT COUNT(*) FROM candidates_fts").fetchone()[0] == 10
+    assert found(db, "untouched") == {"c3@example.com"}
+    assert len(found(db, "python")) == 10
+
+    assert db.rebuild_search_index(batch_size=3) == 0
+    assert db.rebuild_search_index(batch_size=3, full=True) == 10
+    assert conn.execute("SELECT COUNT(*) FROM candidates_fts").fetchone()[0] == 10
@@ -0,0 +1,138 @@
+import sqlite3
+
+import pytest
+
+from database import CandidateDatabase
+from session_store import SessionWriter
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = CandidateDatabase(str(tmp_path / "candidates.db"))
+    yield database
+    database.close()
+
+
+def session(session_id, stage, email="ada@example.com", transcript=None):
+    return {"session_id": session_id, "stage": stage, "conversation_history": transcript,
+            "candidate_info": {"name": "Ada Lovelace", "email": email, "tech_stack": ["Python"]}}
+
+
+def fail_candidate_writes(db):
+    with db.transaction() as cursor:
+        cursor.execute("CREATE TRIGGER fail_candidates BEFORE INSERT ON candidates "
+                       "BEGIN SELECT RAISE(ABORT, 'candidate write failed'); END")
+
+
+def test_failed_candidate_upsert_rolls_back_the_session_rows(db):
+    fail_candidate_writes(db)
+    with pytest.raises(sqlite3.Error):
+        db.save_sessions([session("s1", "location")])
+    assert db._connection().execute("SELECT COUNT(*) FROM candidate_sessions").fetchone()[0] == 0
+
+
+def test_standalone_bulk_save_still_reports_failures(db):
+    fail_candidate_writes(db)
+    outcomes = db.save_candidates_bulk([session("s1", "closing")["candidate_info"]])
+    assert [outcome["success"] for outcome in outcomes] == [False]
+
+
+class FailingDatabase:
+    """Fails every write, queueing a newer update for the session mid-write like a live turn would."""
+
+    def __init__(self):
+        self.writer = None
+        self.attempts = 0
+
+    def save_sessions(self, sessions):
+        self.attempts += 1
+        self.writer.enqueue("s1", "closing", {"email": "ada@example.com", "tech_stack": ["Python"]})
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_failed_flush_requeues_newer_state_with_the_unsaved_transcript():
+    db = FailingDatabase()
+    writer = SessionWriter(db, flush_interval=3600)
+    db.writer = writer
+    try:
+        writer.enqueue("s1", "technical_questions", {"email": "ada@example.com"},
+                       [{"role": "user", "content": "hello"}])
+        assert writer.flush() == 0
+        assert db.attempts == 1
+        assert writer.pending == 1
+        pending = writer._pending["s1"]
+        assert pending["stage"] == "closing"
+        assert pending["conversation_history"] == [{"role": "user", "content": "hello"}]
+    finally:
+        writer._stopped.set()
+
+
+def test_flush_writes_sessions_and_candidates(db):
+    writer = SessionWriter(db, flush_interval=3600)
+    try:
+        writer.enqueue("s1", "location", {"name": "Ada Lovelace", "email": "ada@example.com"})
+        writer.enqueue("s1", "tech_stack", {"name": "Ada Lovelace", "email": "ada@example.com"})
+        assert writer.flush() == 1
+        assert writer.pending == 0
+        assert db.get_open_session("ada@example.com")["stage"] == "tech_stack"
+        assert db.get_candidate_by_email("ada@example.com") is not None
+    finally:
+        writer.close()
+
+
+def test_resume_at_technical_questions_does_not_call_gemini(tmp_path, monkeypatch):
+    from chatbot import TalentScoutBot, create_engine
+
+    class UnreachableClient:
+        available = True
+
+        def generate_content(self, *args, **kwargs):
+            raise AssertionError("resume must not wait on Gemini")
+
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    engine = create_engine(str(tmp_path / "candidates.db"), persist_sessions=False, background_generation=False)
+    engine.client = UnreachableClient()
+    bot = TalentScoutBot(engine)
+    bot.candidate_info.update(name="Ada", tech_stack=["Python", "Django"])
+    bot.current_stage = "technical_questions"
+
+    message = bot.resume_message()
+    assert message.startswith("Welcome back, Ada!")
+    assert "Python" in message
+
+
+def test_partial_sessions_keep_the_application_time(db):
+    db.save_sessions([session("s1", "experience")])
+    with db.transaction() as cursor:
+        cursor.execute("UPDATE candidates SET application_time = '2024-01-01 09:00:00'")
+
+    db.save_sessions([session("s1", "location"), session("s2", "position", email="grace@example.com")])
+    assert db.get_candidate_by_email("ada@example.com")["application_time"] == "2024-01-01 09:00:00"
+    assert db.get_candidate_by_email("grace@example.com")["application_time"] != "2024-01-01 09:00:00"
+
+    db.save_sessions([session("s1", "closing", transcript=[{"role": "user", "content": "bye"}])])
+    assert db.get_candidate_by_email("ada@example.com")["application_time"] > "2024-01-01 09:00:00"
+    assert db.check_analytics() == []
+
+
+def test_one_bad_session_does_not_hold_back_its_batch(db):
+    with db.transaction() as cursor:
+        cursor.execute("CREATE TRIGGER reject_bad BEFORE INSERT ON candidate_sessions "
+                       "WHEN new.session_id = 'bad' BEGIN SELECT RAISE(ABORT, 'bad row'); END")
+    writer = SessionWriter(db, flush_interval=3600, max_attempts=3)
+    try:
+        writer.enqueue("s1", "location", {"email": "ada@example.com"})
+        writer.enqueue("bad", "location", {"email": "bad@example.com"})
+        writer.enqueue("s2", "location", {"email": "grace@example.com"})
+        assert writer.flush() == 2
+        assert db.get_open_session("ada@example.com") is not None
+        assert db.get_open_session("grace@example.com") is not None
+        assert writer.pending == 1
+
+        assert writer.flush() == 0
+        assert writer.pending == 1
+        # Third failed attempt: the update is dropped rather than retried forever
+        assert writer.flush() == 0
+        assert writer.pending == 0
+    finally:
+        writer.close()
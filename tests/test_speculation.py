@@ -0,0 +1,66 @@
+import threading
+import time
+
+from chatbot import TalentScoutBot, create_engine, new_candidate_info
+
+
+class FakeClient:
+    available = True
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return "1. How do you structure a Go service?\n2. How do goroutines communicate?"
+
+
+def test_stack_prediction_runs_on_the_speculation_pool(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.setenv("TALENTSCOUT_QUESTION_BANK", str(tmp_path / "no_bank.db"))
+    engine = create_engine(str(tmp_path / "candidates.db"), persist_sessions=False)
+    engine.client = FakeClient()
+    engine.candidate_db.save_candidate(dict(new_candidate_info(), name="Ada", email="ada@example.com",
+                                            tech_stack=["Go", "PostgreSQL"]))
+
+    lookups = []
+    lookup = engine.candidate_db.get_candidate_by_email
+    release = threading.Event()
+
+    def slow_lookup(email):
+        lookups.append(threading.current_thread().name)
+        release.wait(5)
+        return lookup(email)
+
+    engine.candidate_db.get_candidate_by_email = slow_lookup
+    bot = TalentScoutBot(engine)
+    candidate_info = dict(new_candidate_info(), name="Ada", email="ada@example.com")
+
+    # Returns while the lookup is still blocked
+    reply = bot.process_message("Backend developer", [], candidate_info, "position")
+    assert bot.current_stage == "location" and reply
+    release.set()
+    for _ in range(50):
+        if bot.state.speculation is not None:
+            break
+        time.sleep(0.1)
+    assert lookups and lookups[0] != threading.current_thread().name
+    key, future = bot.state.speculation
+    assert key == "go,postgresql"
+    assert "goroutines" in future.result(5)
+    engine.speculation_pool.shutdown(wait=True)
+
+
+def test_speculation_check_is_not_counted_as_a_cache_lookup(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.setenv("TALENTSCOUT_QUESTION_BANK", str(tmp_path / "no_bank.db"))
+    engine = create_engine(str(tmp_path / "candidates.db"), persist_sessions=False)
+    engine.client = FakeClient()
+    for _ in range(engine.question_cache.min_variants):
+        engine.question_cache.put(["Go"], "1. How do goroutines communicate?")
+    bot = TalentScoutBot(engine)
+
+    assert bot.speculate_questions(["Go"]) is None
+    assert engine.client.prompts == []
+    assert engine.question_cache.stats()["hits"] == 0
+    engine.speculation_pool.shutdown(wait=True)
@@ -0,0 +1,10 @@
+from chatbot import TalentScoutBot, create_engine
+
+
+def test_comma_lists_split_on_the_word_and_only(tmp_path, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    engine = create_engine(str(tmp_path / "candidates.db"), persist_sessions=False, background_generation=False)
+    bot = TalentScoutBot(engine)
+
+    bot._extract_tech_stack("Python, pandas AND NumPy, Android/Kotlin and Go")
+    assert bot.candidate_info["tech_stack"] == ["python", "pandas", "numpy", "android", "kotlin", "go"]
@@ -0,0 +1,176 @@
+"""Compressed conversation transcript storage for TalentScout
+
+Transcripts are stored as newline-delimited JSON (one message per line),
+compressed with zstd when the optional `zstandard` package is installed and
+zlib otherwise. The codec is recorded next to each blob, so databases written
+with either codec stay readable.
+"""
+import json
+import zlib
+from collections.abc import Sequence
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+DEFAULT_CODEC = "zstd" if zstandard else "zlib"
+
+
+def encode_transcript(messages, codec=None):
+    """Compress a list of messages, returning (codec, blob, message_count)"""
+    codec = codec or DEFAULT_CODEC
+    payload = "".join(json.dumps(message, separators=(",", ":")) + "\n" for message in messages).encode()
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd transcripts need the zstandard package")
+        blob = zstandard.ZstdCompressor(level=6).compress(payload)
+    elif codec == "zlib":
+        blob = zlib.compress(payload, 6)
+    else:
+        raise ValueError(f"Unknown transcript codec: {codec}")
+    return codec, blob, len(messages)
+
+
+def _decompressor(codec):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("This transcript is zstd-compressed; install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().decompressobj()
+    if codec == "zlib":
+        return zlib.decompressobj()
+    raise ValueError(f"Unknown transcript codec: {codec}")
+
+
+def iter_transcript(codec, chunks):
+    """Yield messages from compressed transcript bytes supplied as an iterable of chunks
+
+    Only one decompressed line is held at a time beyond the current chunk, so
+    arbitrarily long transcripts can be walked in constant memory.
+    """
+    decompressor = _decompressor(codec)
+    pending = b""
+    for chunk in chunks:
+        pending += decompressor.decompress(chunk)
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line:
+                yield json.loads(line)
+    if hasattr(decompressor, "flush"):
+        pending += decompressor.flush()
+    if pending.strip():
+        yield json.loads(pending)
+
+
+def decode_transcript(codec, blob):
+    """Decompress a whole transcript into a list of messages"""
+    if blob is None:
+        return []
+    return list(iter_transcript(codec, [bytes(blob)]))
+
+
+def transcript_text(codec, blob):
+    """Message contents joined by newlines, as indexed for full-text search"""
+    return "\n".join(str(message.get("content", "")) for message in decode_transcript(codec, blob))
+
+
+class CandidateRecord(dict):
+    """Candidate row whose `conversation_history` is only decompressed on first access
+
+    Contact lookups never pay for the transcript. Reading the key (with [],
+    get() or `in`) loads it once and caches it in the dict.
+    """
+
+    LAZY_KEY = "conversation_history"
+
+    def __init__(self, row, loader):
+        super().__init__(row)
+        self._loader = loader
+
+    def __missing__(self, key):
+        if key != self.LAZY_KEY:
+            raise KeyError(key)
+        value = self._loader()
+        self[key] = value
+        return value
+
+    def get(self, key, default=None):
+        if key == self.LAZY_KEY:
+            return self[key]
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        return key == self.LAZY_KEY or super().__contains__(key)
+
+
+class MessageWindow(Sequence):
+    """Conversation message list that keeps only its newest messages in memory
+
+    Behaves like a read-only list of every message in the conversation, plus
+    append(). The newest `window` messages (up to `window + spill_batch`)
+    are kept as plain dicts. Older ones are spilled `spill_batch` at a time
+    into compressed blocks and decoded again only when indexed, so memory and
+    per-turn work stay bounded however long a session runs.
+    """
+
+    __slots__ = ("window", "spill_batch", "codec", "live", "blocks", "spilled")
+
+    def __init__(self, messages=(), window=40, spill_batch=20, codec=None):
+        self.window = window
+        self.spill_batch = spill_batch
+        self.codec = codec or DEFAULT_CODEC
+        self.live = []
+        # (codec, blob, message_count), oldest first
+        self.blocks = []
+        self.spilled = 0
+        for message in messages:
+            self.append(message)
+
+    def append(self, message):
+        self.live.append(message)
+        if len(self.live) > self.window + self.spill_batch:
+            batch, self.live = self.live[:self.spill_batch], self.live[self.spill_batch:]
+            self.blocks.append(encode_transcript(batch, self.codec))
+            self.spilled += len(batch)
+
+    def __len__(self):
+        return self.spilled + len(self.live)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self.between(start, stop)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("message index out of range")
+        if index >= self.spilled:
+            return self.live[index - self.spilled]
+        return self.between(index, index + 1)[0]
+
+    def __iter__(self):
+        for codec, blob, _ in self.blocks:
+            yield from iter_transcript(codec, [blob])
+        yield from list(self.live)
+
+    def between(self, start, stop):
+        """Messages [start, stop) as a list, decoding only the spilled blocks that overlap"""
+        messages = []
+        if start < self.spilled:
+            offset = 0
+            for codec, blob, count in self.blocks:
+                if offset + count > start and offset < stop:
+                    block = decode_transcript(codec, blob)
+                    messages.extend(block[max(start - offset, 0):stop - offset])
+                offset += count
+                if offset >= stop:
+                    break
+        if stop > self.spilled:
+            messages.extend(self.live[max(start - self.spilled, 0):stop - self.spilled])
+        return messages
+
+    def recent(self, count):
+        """The newest `count` messages"""
+        return self.between(max(len(self) - count, 0), len(self))